@@ -0,0 +1,103 @@
+"""
+    Compares the json codecs available to BitGoClient on synthetic
+    wallet and wallet transaction list payloads shaped like BitGo's
+    API responses.
+
+    Usage:
+        python benchmarks/bench_codec.py [--transactions N] [--repeat N]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from bitgo.codec import CODECS
+from bitgo.errors import BitGoClientException
+
+
+def fake_hash(seed):
+    return hashlib.sha256(str(seed).encode('utf-8')).hexdigest()
+
+
+def fake_address(rng):
+    return '2N' + ''.join(rng.choice('123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz')
+                          for _ in range(33))
+
+
+def wallet_payload(rng):
+    return {'id':fake_address(rng),
+            'label':'Payouts wallet',
+            'isActive':True,
+            'type':'safehd',
+            'balance':rng.randint(0,10 ** 10),
+            'confirmedBalance':rng.randint(0,10 ** 10),
+            'unconfirmedSends':0,
+            'unconfirmedReceives':rng.randint(0,10 ** 6),
+            'permissions':'admin,spend,view',
+            'admin':{'policy':{'id':fake_hash('policy'),'version':3,
+                               'rules':[{'id':'dailyLimit','type':'velocityLimit',
+                                         'action':{'type':'getApproval'},
+                                         'condition':{'amount':10 ** 8,'timeWindow':86400}}]}},
+            'private':{'keychains':[{'xpub':'xpub' + fake_hash(i) + fake_hash(i + 1)[:47],
+                                     'path':'/0/0'} for i in range(3)]},
+            'pendingApprovals':[]}
+
+
+def transactions_payload(rng,count):
+    transactions = []
+    for i in range(count):
+        outputs = [{'vout':vout,
+                    'value':rng.randint(546,10 ** 8),
+                    'account':fake_address(rng),
+                    'isMine':rng.random() < 0.5,
+                    'chain':rng.choice([0,1]),
+                    'chainIndex':rng.randint(0,5000)} for vout in range(rng.randint(1,3))]
+        transactions.append({'id':fake_hash(i),
+                             'date':'2015-08-0{d}T12:00:00.000Z'.format(d=1 + i % 9),
+                             'blockhash':fake_hash(-i),
+                             'height':370000 + i,
+                             'confirmations':rng.randint(0,1000),
+                             'fee':rng.randint(1000,50000),
+                             'pending':False,
+                             'instant':False,
+                             'entries':[{'account':o['account'],'value':o['value']} for o in outputs],
+                             'outputs':outputs,
+                             'inputs':[{'previousHash':fake_hash(i * 7 + n),
+                                        'previousOutputIndex':n} for n in range(rng.randint(1,4))]})
+    return {'transactions':transactions,'start':0,'count':count,'total':count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions',type=int,default=500)
+    parser.add_argument('--repeat',type=int,default=50)
+    options = parser.parse_args()
+
+    rng = random.Random(1)
+    payloads = {'wallet':wallet_payload(rng),
+                'transactions':transactions_payload(rng,options.transactions)}
+
+    print('{:<14}{:<8}{:>10}{:>14}{:>14}'.format('payload','codec','bytes','encode(us)','decode(us)'))
+    for payload_name,payload in payloads.items():
+        for codec_name,klazz in sorted(CODECS.items()):
+            try:
+                codec = klazz()
+            except BitGoClientException:
+                print('{:<14}{:<8}{:>10}'.format(payload_name,codec_name,'not installed'))
+                continue
+
+            body = codec.dumps(payload)
+            encode = min(timeit.repeat(lambda: codec.dumps(payload),number=options.repeat,repeat=3))
+            decode = min(timeit.repeat(lambda: codec.loads(body),number=options.repeat,repeat=3))
+            print('{:<14}{:<8}{:>10}{:>14.1f}{:>14.1f}'.format(payload_name,codec_name,len(body),
+                                                             encode / options.repeat * 1e6,
+                                                             decode / options.repeat * 1e6))
+
+
+if __name__ == '__main__':
+    main()
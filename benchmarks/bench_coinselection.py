@@ -0,0 +1,103 @@
+"""
+    Times CoinSelector's strategies over synthetic wallets of
+    several unspent value distributions and sizes, and reports the
+    quality of their selections: inputs spent, fee paid and how
+    often no change output was needed.
+
+    Usage:
+        python benchmarks/bench_coinselection.py [--sizes 1000,10000,100000]
+                                                 [--payments N] [--fee-rate N]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from bitgo.errors import InsufficientFunds
+from bitgo.wallet.coinselection import CoinSelector
+from bitgo.wallet.unspents import UnspentIndex
+
+
+def fake_hash(seed):
+    return hashlib.sha256(str(seed).encode('utf-8')).hexdigest()
+
+
+#Value distributions of the unspents, in satoshis
+DISTRIBUTIONS = {
+    #Payments received by a merchant, a few sats to a few btc
+    'lognormal':lambda rng: max(546,int(rng.lognormvariate(13,2))),
+    'uniform':lambda rng: rng.randint(546,10 ** 8),
+    #Mostly dust and tiny deposits, a few large consolidations
+    'dusty':lambda rng: (rng.randint(546,5000) if rng.random() < 0.9
+                         else rng.randint(10 ** 7,10 ** 9)),
+    #Exchange hot wallet refilled with round amounts
+    'round':lambda rng: rng.choice([10 ** 5,10 ** 6,5 * 10 ** 6,10 ** 7,10 ** 8]),
+}
+
+
+def build_index(rng,distribution,size):
+    index = UnspentIndex('bench',keep_details=False)
+    index.add_many((fake_hash(i),i % 4,distribution(rng),rng.randint(400000,400999),None)
+                   for i in range(size))
+    index.height = 401000
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes',default='1000,10000,100000')
+    parser.add_argument('--payments',type=int,default=50)
+    parser.add_argument('--fee-rate',type=int,default=20000)
+    options = parser.parse_args()
+
+    sizes = [int(size) for size in options.sizes.split(',')]
+    strategies = [CoinSelector.BRANCH_AND_BOUND,CoinSelector.KNAPSACK,
+                  CoinSelector.LARGEST_FIRST,CoinSelector.AUTO]
+
+    print('{:<10}{:>8}  {:<18}{:>10}{:>10}{:>8}{:>12}{:>10}'.format('values','utxos','strategy',
+                                                                  'p50(ms)','max(ms)','inputs',
+                                                                  'fee','no change'))
+    for distribution_name,distribution in sorted(DISTRIBUTIONS.items()):
+        for size in sizes:
+            rng = random.Random(size)
+            index = build_index(rng,distribution,size)
+            payments = [max(1000,int(rng.lognormvariate(14,1.5))) for _ in range(options.payments)]
+
+            for strategy in strategies:
+                selector = CoinSelector(fee_rate=options.fee_rate,seed=1)
+                timings = []
+                inputs = []
+                fees = []
+                changeless = 0
+                found = 0
+                for amount in payments:
+                    start = time.perf_counter()
+                    try:
+                        selection = selector.select(index,amount,strategy=strategy)
+                    except InsufficientFunds:
+                        timings.append(time.perf_counter() - start)
+                        continue
+                    timings.append(time.perf_counter() - start)
+                    found += 1
+                    inputs.append(len(selection))
+                    fees.append(selection.fee)
+                    changeless += selection.change == 0
+
+                if not found:
+                    print('{:<10}{:>8}  {:<18}{:>10}'.format(distribution_name,size,strategy,'no match'))
+                    continue
+
+                print('{:<10}{:>8}  {:<18}{:>10.2f}{:>10.2f}{:>8.1f}{:>12.0f}{:>9.0%}'.format(
+                      distribution_name,size,strategy,
+                      statistics.median(timings) * 1e3,max(timings) * 1e3,
+                      statistics.mean(inputs),statistics.mean(fees),changeless / found))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+    Times the signature hashes and signatures of a large P2SH 2 of 3
+    multisig consolidation transaction: hashes one input at a time and
+    batched by TransactionSigner, signatures in process and across its
+    process pool.Checks that every way gives the same results.
+
+    Usage:
+        python benchmarks/bench_signing.py [--inputs N] [--processes N]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from bitgo.errors import BitGoClientException
+from bitgo.signing import ECDSASigner,TransactionSigner
+from bitgo.transaction import Transaction
+
+
+def fake_hash(seed):
+    return hashlib.sha256(str(seed).encode('utf-8')).hexdigest()
+
+
+def redeem_script(i):
+    #OP_2 <pubkey> <pubkey> <pubkey> OP_3 OP_CHECKMULTISIG
+    pubkeys = [b'\x02' + hashlib.sha256('{i}-{k}'.format(i=i,k=k).encode('utf-8')).digest()
+               for k in range(3)]
+    return b'\x52' + b''.join(b'\x21' + pubkey for pubkey in pubkeys) + b'\x53\xae'
+
+
+def consolidation(inputs):
+    tx = Transaction()
+    for i in range(inputs):
+        tx.add_input(fake_hash(i),i % 4,value=100000)
+    tx.add_output(inputs * 100000 - 500000,'3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy')
+    return tx
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result,(time.perf_counter() - start) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--inputs',type=int,default=1000)
+    parser.add_argument('--processes',type=int,default=os.cpu_count() or 1)
+    options = parser.parse_args()
+
+    tx = consolidation(options.inputs)
+    scripts = [redeem_script(i) for i in range(options.inputs)]
+    print('{n} inputs, {s} bytes unsigned, {p} processes'.format(n=options.inputs,
+                                                                 s=tx.size(),
+                                                                 p=options.processes))
+
+    one_by_one,elapsed = timed(lambda: [tx.signature_hash(i,script) for i,script in enumerate(scripts)])
+    print('{:<34}{:>10.1f} ms'.format('sighash, one input at a time',elapsed))
+
+    in_process = TransactionSigner(processes=1)
+    batched,elapsed = timed(lambda: in_process.signature_hashes(tx,scripts))
+    print('{:<34}{:>10.1f} ms'.format('sighash, batched',elapsed))
+
+    if one_by_one != batched:
+        raise SystemExit('The signature hashes differ')
+
+    try:
+        signer = ECDSASigner()
+    except BitGoClientException as exc:
+        print('signing skipped: {e}'.format(e=exc))
+        return
+
+    key = hashlib.sha256(b'bench signing key').digest()
+    in_process.signer = signer
+    expected,elapsed = timed(lambda: in_process.sign(tx,key,scripts))
+    print('{:<34}{:>10.1f} ms'.format('sign, in process',elapsed))
+
+    with TransactionSigner(signer=signer,processes=options.processes,min_parallel_inputs=1) as pooled:
+        #The first call pays for starting the workers
+        _,startup = timed(lambda: pooled.sign(tx,key,scripts))
+        signatures,elapsed = timed(lambda: pooled.sign(tx,key,scripts))
+        print('{:<34}{:>10.1f} ms  (first call {s:.1f} ms)'.format('sign, process pool',elapsed,s=startup))
+
+    if signatures != expected:
+        raise SystemExit('The signatures differ')
+    print('results are identical')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,25 @@
 
-from bitgo.client import BitGoClient
+from bitgo.async_client import AsyncBitGoClient
+from bitgo.breaker import CircuitBreaker
+from bitgo.cache import ResponseCache,ETagCache
+from bitgo.codec import JSONCodec,OrjsonCodec,UjsonCodec,get_codec
+from bitgo.client import BitGoClient,build_session
+from bitgo.deadline import Deadline
 from bitgo.errors import (BitGoException,AccessTokenException,InvalidAccessToken,
                           BitGoClientException,InvalidClient,BitGoResourceException,
                           InvalidResourceEndpoint,InvalidResourceEndpointUrl,
                           InvalidResourceMethod,HttpError,BadRequest,Unauthorized,
-                          Forbidden,NotFound,NotAcceptable)
+                          Forbidden,NotFound,NotAcceptable,TooManyRequests,
+                          ProxyUnavailable,CircuitOpen,DeadlineExceeded,
+                          InsufficientFunds,InvalidTransaction)
+from bitgo.middleware import Middleware,TimingMiddleware,Histogram
+from bitgo.metrics import Metrics,MetricsMiddleware,PrometheusExporter,OTLPExporter
+from bitgo.proxy import ProxyPool
+from bitgo.ratelimit import TokenBucket,FileTokenBucket,RateLimiter
 from bitgo.resource import (BitGoResource,CreateMixin,ReadMixin,ListMixin,
                             UpdateMixin,DeleteMixin,CRUDMixin)
+from bitgo.retry import RetryPolicy
+from bitgo.singleflight import SingleFlight,AsyncSingleFlight
 from bitgo.token import BitGoAccessToken
+from bitgo.transport import Transport,RequestsTransport,HTTP2Transport
 from bitgo.version import VERSION
-from bitgo.walletshare import BitGoWalletShare
@@ -0,0 +1,519 @@
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from bitgo.client import BitGoClient
+from bitgo.deadline import Deadline
+from bitgo.errors import BitGoException,BitGoClientException,DeadlineExceeded
+from bitgo.middleware import track_timings
+
+__all__ = ['AsyncBitGoClient']
+
+
+class AsyncBitGoClient(BitGoClient):
+
+    """ Asyncio counterpart of BitGoClient.
+
+        It exposes the same request/get/post/put/delete surface,
+        but every call is a coroutine that needs to be awaited.
+        All requests go through one aiohttp connector, so thousands
+        of concurrent requests on the same event loop share a
+        bounded pool of kept alive connections.
+
+        Retries, caches, middlewares, metrics, proxy pools and circuit
+        breakers work like they do for BitGoClient.Middlewares only get
+        the 'total' and 'parse' timings, since stage timings are tracked
+        per thread and every request of the loop shares one.The session
+        and transport parameters are not taken, the aiohttp connector
+        is the client's pool.stream() is not supported.
+
+        The client has to be used with 'async with', or closed with
+        'await client.close()'.
+
+        Requires the optional 'aiohttp' package.
+
+        Example:
+            async with AsyncBitGoClient(env='prod') as client:
+                wallets = await asyncio.gather(*[client.get('wallet/' + wid,
+                                                            access_token=token)
+                                                 for wid in wallet_ids])
+    """
+
+    def __init__(self,env=None,user_agent=None,proxy=None,connector=None,
+                 limit=100,limit_per_host=0,keep_alive=True,retry=None,
+                 rate_limiter=None,cache=None,etag_cache=None,codec=None,
+                 middlewares=None,metrics=None,proxy_pool=None,circuit_breaker=None,
+                 timeout=BitGoClient.DEFAULT_TIMEOUT,single_flight=None):
+
+        """ Takes the same env, user_agent, proxy, keep_alive, retry,
+            rate_limiter, cache, etag_cache, codec, middlewares, metrics,
+            proxy_pool, circuit_breaker and timeout parameters as
+            BitGoClient.Waiting on the rate limiter or on a retry's
+            backoff does not block the event loop.
+
+            @param single_flight : Optional AsyncSingleFlight sharing one
+                                   request between identical GET requests
+                                   awaited at the same time.
+
+            @param connector : Optional aiohttp connector to send requests
+                               through.Pass the same connector to several
+                               clients to share one connection pool.A shared
+                               connector is not closed by close().
+
+            @param limit : Total number of simultaneous connections when
+                           the client builds its own connector.
+
+            @param limit_per_host : Simultaneous connections per host when
+                                    the client builds its own connector.
+                                    0 means no per host limit.
+        """
+
+        if aiohttp is None:
+            raise BitGoClientException('AsyncBitGoClient requires the aiohttp ' \
+                                       'package.Install it with: pip install aiohttp')
+
+        super(AsyncBitGoClient,self).__init__(env=env,
+                                              user_agent=user_agent,
+                                              proxy=proxy,
+                                              keep_alive=keep_alive,
+                                              retry=retry,
+                                              rate_limiter=rate_limiter,
+                                              cache=cache,
+                                              etag_cache=etag_cache,
+                                              codec=codec,
+                                              middlewares=middlewares,
+                                              metrics=metrics,
+                                              proxy_pool=proxy_pool,
+                                              circuit_breaker=circuit_breaker,
+                                              timeout=timeout,
+                                              single_flight=single_flight)
+
+        self._connector = connector
+        self._owns_connector = connector is None
+        self._connector_settings = {'limit':limit,
+                                    'limit_per_host':limit_per_host,
+                                    'force_close':not keep_alive}
+        self._aio_session = None
+
+    def __enter__(self):
+        #close() is a coroutine a plain 'with' can't await
+        raise TypeError("Use 'async with' with an AsyncBitGoClient")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self,exc_type,exc_value,traceback):
+        await self.close()
+
+    @property
+    def aio_session(self):
+
+        """ The aiohttp ClientSession every call is sent through.
+            It is built on first use so it binds to the running loop.
+        """
+
+        if self._closed:
+            raise BitGoClientException('Client has been closed,create a new ' \
+                                       'AsyncBitGoClient to send more requests')
+
+        if self._aio_session is None:
+            if self._connector is None:
+                self._connector = aiohttp.TCPConnector(**self._connector_settings)
+
+            self._aio_session = aiohttp.ClientSession(connector=self._connector,
+                                                      connector_owner=self._owns_connector)
+
+        return self._aio_session
+
+    async def close(self):
+
+        """ Tears down the aiohttp session and the connector owned
+            by this client.
+        """
+
+        if self._aio_session is not None:
+            await self._aio_session.close()
+        elif self._owns_connector and self._connector is not None:
+            await self._connector.close()
+
+        self._aio_session = None
+        self._connector = None
+        self._closed = True
+
+    def _client_timeout(self,deadline):
+
+        """ Returns the aiohttp timeout of a request out of the
+            client's (connect,read) timeout and the call's deadline.
+        """
+
+        connect,read = self._timeout or (None,None)
+        total = None if deadline is None else max(0.001,deadline.remaining())
+        return aiohttp.ClientTimeout(total=total,sock_connect=connect,sock_read=read)
+
+    async def _send_request(self,resource,method='get',params=None,access_token=None,
+                            extra_headers=None,deadline=None):
+
+        """
+            Internal private method for internal use only.
+            Returns a tuple with the http status code, the headers and
+            the raw body of the response.
+
+        """
+
+        method,url,headers,json_data = self._prepare_request(resource=resource,
+                                                             method=method,
+                                                             params=params,
+                                                             access_token=access_token)
+
+        if extra_headers:
+            headers = dict(headers,**extra_headers)
+
+        #aiohttp only takes a single proxy url per request
+        if self.proxy_pool is None:
+            route = None
+            proxy = None if self._proxies is None else self._proxies['http']
+        else:
+            token = self._resolve_token(access_token=access_token)
+            route = self.proxy_pool.select(token=token)
+            proxy = route.url
+
+        #GET and DELETE params are sent in the query string
+        query = params if method in ('get','delete') else None
+
+        start = time.perf_counter()
+        try:
+            async with self.aio_session.request(method.upper(),url,params=query,
+                                                data=json_data,headers=headers,
+                                                proxy=proxy,
+                                                timeout=self._client_timeout(deadline)) as response:
+                body = await response.read()
+        except (aiohttp.ClientProxyConnectionError,asyncio.TimeoutError):
+            if route is not None:
+                self.proxy_pool.record_failure(route,token=token)
+            raise
+        except BaseException:
+            if route is not None:
+                self.proxy_pool.release(route)
+            raise
+
+        if route is not None:
+            self.proxy_pool.record_success(route,time.perf_counter() - start,
+                                           token=token,status=response.status)
+
+        return response.status,response.headers,body
+
+    async def _send_attempt(self,resource,method,params,access_token,action=None,
+                            extra_headers=None,deadline=None):
+
+        """ Sends the request through the client's circuit breaker,
+            if any, recording its outcome.
+        """
+
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await self._send_request(resource=resource,method=method,params=params,
+                                            access_token=access_token,extra_headers=extra_headers,
+                                            deadline=deadline)
+
+        call = breaker.before_call(action)
+        start = time.perf_counter()
+        try:
+            status,headers,body = await self._send_request(resource=resource,method=method,
+                                                           params=params,access_token=access_token,
+                                                           extra_headers=extra_headers,
+                                                           deadline=deadline)
+        except (aiohttp.ClientError,asyncio.TimeoutError):
+            breaker.record(call,time.perf_counter() - start,failed=True)
+            raise
+        except BaseException:
+            breaker.release(call)
+            raise
+
+        breaker.record(call,time.perf_counter() - start,failed=breaker.is_failure(status))
+        return status,headers,body
+
+    async def _wait_rate_limiter(self,action,deadline):
+
+        """ Waits for the client's rate limiter without blocking the
+            loop, raising DeadlineExceeded right away if the wait would
+            go past the deadline.
+        """
+
+        delay = self.rate_limiter.reserve(action=action)
+        if deadline is not None and delay >= deadline.remaining():
+            self.rate_limiter.refund(action=action)
+            raise DeadlineExceeded('Waiting {d:.2f}s on the rate limiter would exceed '\
+                                   'the {s}s deadline of the call'.format(d=delay,s=deadline.seconds))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send_with_retry(self,resource,method,params,access_token,action=None,
+                               extra_headers=None,deadline=None):
+
+        """ Sends the request, retrying it for as long as the client's
+            retry policy allows.Once the policy gives up, the last
+            response is returned or the last aiohttp exception is raised.
+            Every attempt waits on the client's rate limiter first.
+
+            A BitGoException raised before the first attempt went out has
+            its sent attribute set to False, see BitGoClient.
+        """
+
+        attempt = 1
+        while True:
+            try:
+                if deadline is not None:
+                    deadline.check()
+                if self.rate_limiter is not None:
+                    await self._wait_rate_limiter(action=action,deadline=deadline)
+
+                status,headers,body = await self._send_attempt(resource=resource,
+                                                               method=method,
+                                                               params=params,
+                                                               access_token=access_token,
+                                                               action=action,
+                                                               extra_headers=extra_headers,
+                                                               deadline=deadline)
+            except BitGoException as exc:
+                if attempt == 1:
+                    exc.sent = False
+                raise
+            except (aiohttp.ClientError,asyncio.TimeoutError) as exc:
+                if self.retry is None:
+                    raise
+                delay = self.retry.on_exception(method=method,exc=exc,attempt=attempt)
+                if delay is None or (deadline is not None and delay >= deadline.remaining()):
+                    raise
+            else:
+                if self.retry is None:
+                    return status,headers,body
+                delay = self.retry.on_status(method=method,status=status,
+                                             headers=headers,attempt=attempt)
+                if delay is None or (deadline is not None and delay >= deadline.remaining()):
+                    return status,headers,body
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def request(self,url,method='get',params=None,access_token=None,action=None,
+                      deadline=None):
+
+        """ Sends a request to BitGo's API and handles any http errors
+            that might occur, mapping them to the same exceptions
+            raised by BitGoClient.request().
+
+            @param url : resource's url that will be used to build the full
+                              url combined with the client's endpoint.
+
+            @param method : Http method to use. Valid options are 'get','post',
+                            'put' or 'delete'.
+
+            @param params : A dictionary object containing params to send. The
+                            params will be converted to json before being sent
+
+            @param access_token : An access token can be provided with a string or
+                                an instance of a BitGoAccessToken object.
+
+            @param action : The resource action(ENDPOINT key) the request is
+                            sent for, if any.
+
+            @param deadline : Optional seconds(or a Deadline) the whole call
+                              needs to finish in.
+
+        """
+        deadline = Deadline.coerce(deadline)
+
+        cache = self.cache
+        if cache is None:
+            return await self._request(url=url,method=method,params=params,
+                                       access_token=access_token,action=action,
+                                       deadline=deadline)
+
+        if method.lower() == 'get':
+            key = cache.make_key(token=self._resolve_token(access_token=access_token),
+                                 method=method,url=url,params=params)
+            json_data = cache.get(key)
+            if json_data is cache.MISSING:
+                json_data = await self._request(url=url,method=method,params=params,
+                                                access_token=access_token,action=action,
+                                                deadline=deadline)
+                cache.set(key,json_data,action=action)
+            return json_data
+
+        #Any write makes cached reads of the same endpoint stale,
+        #whether it succeeded or not.
+        try:
+            return await self._request(url=url,method=method,params=params,
+                                       access_token=access_token,action=action,
+                                       deadline=deadline)
+        finally:
+            cache.invalidate(url)
+
+    async def _request(self,url,method,params,access_token,action,deadline=None):
+
+        single_flight = self.single_flight
+        if single_flight is not None and method.lower() == 'get':
+            key = single_flight.make_key(token=self._resolve_token(access_token=access_token),
+                                         url=url,params=params)
+            return await single_flight.do(key,
+                                          lambda: self._pipeline_request(url=url,method=method,
+                                                                         params=params,
+                                                                         access_token=access_token,
+                                                                         action=action,
+                                                                         deadline=deadline),
+                                          deadline=deadline)
+
+        return await self._pipeline_request(url=url,method=method,params=params,
+                                            access_token=access_token,action=action,
+                                            deadline=deadline)
+
+    def _begin_request(self,url,method,params,action):
+        context = super(AsyncBitGoClient,self)._begin_request(url=url,method=method,
+                                                              params=params,action=action)
+        #The loop's thread is shared by every request in flight
+        track_timings(None)
+        return context
+
+    async def _pipeline_request(self,url,method,params,access_token,action,deadline=None):
+
+        context = self._begin_request(url=url,method=method,params=params,action=action)
+        try:
+            json_data = await self._perform_request(url=url,method=method,params=params,
+                                                    access_token=access_token,action=action,
+                                                    context=context,deadline=deadline)
+        except Exception as exc:
+            self._end_request(context,exc=exc)
+            raise
+
+        self._end_request(context)
+        return json_data
+
+    async def _perform_request(self,url,method,params,access_token,action,context=None,
+                               deadline=None):
+
+        etag_key = etag_entry = extra_headers = None
+        if self.etag_cache is not None and method.lower() == 'get':
+            etag_key = self.etag_cache.make_key(token=self._resolve_token(access_token=access_token),
+                                                url=url,params=params)
+            etag_entry = self.etag_cache.get(etag_key)
+            extra_headers = self.etag_cache.conditional_headers(etag_entry)
+
+        status,headers,body = await self._checked_response(url=url,method=method,params=params,
+                                                           access_token=access_token,action=action,
+                                                           extra_headers=extra_headers,
+                                                           context=context,deadline=deadline)
+
+        if status == 304:
+            #Not Modified is only expected as the answer to
+            #a conditional request.
+            if etag_entry is None:
+                self._raise_http_error(http_code=304,json_data=None)
+            return self.etag_cache.not_modified(etag_entry)
+
+        start = time.perf_counter()
+        json_data = self._decode(body)
+        if context is not None:
+            context.timings['parse'] = time.perf_counter() - start
+
+        if etag_key is not None:
+            self.etag_cache.store(etag_key,headers,json_data)
+        return json_data
+
+    async def _checked_response(self,url,method,params,access_token,action,
+                                extra_headers=None,context=None,deadline=None):
+
+        """ Sends the request and returns its status, headers and body,
+            mapping any aiohttp exception and any 4xx/5xx response to a
+            BitGoException.
+        """
+
+        try:
+            status,headers,body = await self._send_with_retry(resource=url,
+                                                              method=method,
+                                                              params=params,
+                                                              access_token=access_token,
+                                                              action=action,
+                                                              extra_headers=extra_headers,
+                                                              deadline=deadline)
+
+        except aiohttp.ClientProxyConnectionError:
+            raise BitGoException('A proxy error has occured while using  '\
+                                 'the current proxy')
+
+        except aiohttp.ClientSSLError:
+            raise BitGoException('A SSL error has occured')
+
+        except aiohttp.ClientConnectionError:
+            raise BitGoException("A http connection error has occured while connecting "\
+                                 " to BitGo's. This is not a SSL or proxy error")
+
+        except asyncio.TimeoutError:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded('The {s}s deadline of the call was exceeded while '\
+                                       "waiting on BitGo's response".format(s=deadline.seconds))
+            raise BitGoException("A http timeout error has occured while connecting " \
+                                 " to BitGo's.")
+
+        except aiohttp.ClientError as exc:
+            raise BitGoException('An unknown aiohttp exception has occured:{exc}'.format(exc=exc))
+
+        if context is not None:
+            context.status_code = status
+
+        if status >= 400:
+            try:
+                json_data = self.codec.loads(body)
+            except ValueError:
+                json_data = None
+
+            self._raise_http_error(http_code=status,json_data=json_data)
+
+        return status,headers,body
+
+    def stream(self,*args,**kwargs):
+        raise BitGoClientException('AsyncBitGoClient can not stream responses, '\
+                                   'use request() or a BitGoClient')
+
+    async def get(self,url,access_token=None,deadline=None):
+
+        """ Sends a GET request with or without an access token"""
+
+        return await self.request(url=url,
+                                  method='get',
+                                  access_token=access_token,
+                                  deadline=deadline)
+
+    async def delete(self,url,access_token=None,deadline=None):
+
+        """ Sends a DELETE request with or without an access token"""
+
+        return await self.request(url=url,
+                                  method='delete',
+                                  access_token=access_token,
+                                  deadline=deadline)
+
+    async def post(self,url,data,access_token=None,deadline=None):
+
+        """ Sends a POST request with post's data and
+            with or without an access token"""
+
+        return await self.request(url=url,
+                                  method='post',
+                                  params=data,
+                                  access_token=access_token,
+                                  deadline=deadline)
+
+    async def put(self,url,data,access_token=None,deadline=None):
+
+        """ Sends a PUT request with put's data and
+            with or without an access token"""
+
+        return await self.request(url=url,
+                                  method='put',
+                                  params=data,
+                                  access_token=access_token,
+                                  deadline=deadline)
@@ -0,0 +1,268 @@
+import collections
+import threading
+import time
+
+from bitgo.errors import BitGoClientException,CircuitOpen
+
+__all__ = ['CircuitBreaker']
+
+
+class Circuit(object):
+
+    """ State of the circuit of one endpoint family."""
+
+    __slots__ = ('family','state','outcomes','failures','slow','opened_at',
+                 'probes','probe_successes','rejected','generation')
+
+    def __init__(self,family):
+        self.family = family
+        self.state = CircuitBreaker.CLOSED
+        #(timestamp,failed,slow) of the calls within the window
+        self.outcomes = collections.deque()
+        self.failures = 0
+        self.slow = 0
+        self.opened_at = None
+        #Probe calls on their way while half open
+        self.probes = 0
+        self.probe_successes = 0
+        self.rejected = 0
+        #Bumped every time the circuit opens, so the outcome of a call
+        #let through before can be told apart
+        self.generation = 0
+
+
+class CircuitCall(object):
+
+    """ A call let through by CircuitBreaker.before_call(), whose
+        outcome is handed back to record() or release().
+    """
+
+    __slots__ = ('circuit','generation','probe')
+
+    def __init__(self,circuit,generation,probe=False):
+        self.circuit = circuit
+        self.generation = generation
+        #Whether the call is one of the probes of a half open circuit
+        self.probe = probe
+
+
+class CircuitBreaker(object):
+
+    """
+        Fails calls fast while an endpoint family of BitGo's API is
+        degraded, instead of letting every worker wait on it.
+
+        Calls are grouped in families, by default the resource action
+        (the ENDPOINT key, e.g. 'LIST' or 'READ') passed along by
+        BitGoResource.request_resource(), like the buckets of a
+        RateLimiter.Requests with no action share the 'default' family.
+        Each family has a circuit:
+
+            closed : calls go through.Once at least min_calls calls were
+                     made in the last window seconds, the circuit opens
+                     if failure_rate of them failed(connection errors,
+                     timeouts or a failure_statuses response), or if
+                     slow_call_rate of them took slow_call_seconds or more.
+
+            open : every call raises CircuitOpen right away, for
+                   open_seconds.
+
+            half open : up to probes calls are let through.The circuit
+                        closes again once all of them succeed, and opens
+                        again as soon as one fails.Only the outcomes of
+                        these probes count, not the ones of calls let
+                        through before the circuit opened.
+
+        Example:
+            breaker = CircuitBreaker(failure_rate=0.5,slow_call_seconds=5)
+            client = BitGoClient(circuit_breaker=breaker)
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    FAILURE_STATUSES = frozenset([429,500,502,503,504])
+    DEFAULT_FAMILY = 'default'
+
+    def __init__(self,failure_rate=0.5,min_calls=20,window=30.0,
+                 slow_call_seconds=None,slow_call_rate=0.8,open_seconds=30.0,
+                 probes=3,failure_statuses=None,family=None):
+
+        """
+            @param failure_rate : Ratio of failed calls within the window
+                                  opening the circuit.
+
+            @param min_calls : Calls needed within the window before the
+                               circuit can open.
+
+            @param window : Seconds of calls the rates are computed over.
+
+            @param slow_call_seconds : Calls taking this many seconds or
+                                       more count as slow.None disables
+                                       the latency threshold.
+
+            @param slow_call_rate : Ratio of slow calls within the window
+                                    opening the circuit.
+
+            @param open_seconds : Seconds an open circuit fails calls
+                                  before going half open.
+
+            @param probes : Calls let through while half open.
+
+            @param failure_statuses : Http status codes counting as a
+                                      failure.Defaults to FAILURE_STATUSES.
+
+            @param family : Optional callable returning the family of a
+                            call out of its resource action, None for
+                            requests without one.
+        """
+
+        if not 0 < failure_rate <= 1 or not 0 < slow_call_rate <= 1:
+            raise BitGoClientException('failure_rate and slow_call_rate need '\
+                                       'to be between 0 and 1')
+
+        self.failure_rate = failure_rate
+        self.min_calls = max(1,min_calls)
+        self.window = window
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.probes = max(1,probes)
+        self.failure_statuses = frozenset(failure_statuses or self.FAILURE_STATUSES)
+        self.family = family or self.default_family
+
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default_family(cls,action):
+        return action or cls.DEFAULT_FAMILY
+
+    def circuit(self,action=None):
+        family = self.family(action)
+        circuit = self._circuits.get(family,None)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.setdefault(family,Circuit(family))
+        return circuit
+
+    def before_call(self,action=None):
+
+        """ Returns the CircuitCall of a call for a resource action,
+            raising CircuitOpen when the call is not let through.Every
+            call let through needs to be followed by record() or
+            release().
+        """
+
+        circuit = self.circuit(action)
+        if circuit.state == self.CLOSED:
+            return CircuitCall(circuit,circuit.generation)
+
+        with self._lock:
+            if circuit.state == self.OPEN:
+                remaining = circuit.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    circuit.rejected += 1
+                    raise CircuitOpen("The circuit of BitGo's '{f}' endpoints is open, "\
+                                      "retry in {s:.1f} seconds".format(f=circuit.family,s=remaining))
+                circuit.state = self.HALF_OPEN
+                circuit.probes = 0
+                circuit.probe_successes = 0
+
+            if circuit.state == self.HALF_OPEN:
+                if circuit.probes >= self.probes:
+                    circuit.rejected += 1
+                    raise CircuitOpen("The circuit of BitGo's '{f}' endpoints is half open "\
+                                      "and waiting on its probe calls".format(f=circuit.family))
+                circuit.probes += 1
+                return CircuitCall(circuit,circuit.generation,probe=True)
+
+            return CircuitCall(circuit,circuit.generation)
+
+    def is_failure(self,status_code):
+        return status_code in self.failure_statuses
+
+    def record(self,call,seconds,failed):
+
+        """ Records the outcome of a call let through by before_call()."""
+
+        now = time.monotonic()
+        slow = self.slow_call_seconds is not None and seconds >= self.slow_call_seconds
+        circuit = call.circuit
+
+        with self._lock:
+            if call.generation != circuit.generation:
+                #A call let through before the circuit last opened
+                return
+
+            if circuit.state == self.HALF_OPEN:
+                if not call.probe:
+                    return
+                if failed or slow:
+                    self._open(circuit,now)
+                    return
+
+                circuit.probe_successes += 1
+                if circuit.probe_successes >= self.probes:
+                    circuit.state = self.CLOSED
+                    circuit.outcomes.clear()
+                    circuit.failures = circuit.slow = 0
+                return
+
+            outcomes = circuit.outcomes
+            outcomes.append((now,failed,slow))
+            circuit.failures += failed
+            circuit.slow += slow
+
+            #Drop the calls that fell out of the window
+            while outcomes and outcomes[0][0] < now - self.window:
+                _,old_failed,old_slow = outcomes.popleft()
+                circuit.failures -= old_failed
+                circuit.slow -= old_slow
+
+            calls = len(outcomes)
+            if calls >= self.min_calls and (circuit.failures >= self.failure_rate * calls or
+                                            circuit.slow >= self.slow_call_rate * calls):
+                self._open(circuit,now)
+
+    def release(self,call):
+
+        """ Gives back the probe slot of a call let through by
+            before_call() that ended without an outcome to record.
+        """
+
+        circuit = call.circuit
+        with self._lock:
+            if (call.probe and call.generation == circuit.generation and
+                    circuit.state == self.HALF_OPEN and circuit.probes > 0):
+                circuit.probes -= 1
+
+    def _open(self,circuit,now):
+        circuit.state = self.OPEN
+        circuit.opened_at = now
+        circuit.generation += 1
+        circuit.outcomes.clear()
+        circuit.failures = circuit.slow = 0
+
+    def reset(self):
+        with self._lock:
+            self._circuits = {}
+
+    def stats(self):
+
+        """ Returns the state of every circuit keyed by family:
+                'state' = 'closed','open' or 'half_open'
+                'calls' = calls within the window
+                'failures' = failed calls within the window
+                'slow' = slow calls within the window
+                'rejected' = calls failed fast so far
+        """
+
+        with self._lock:
+            return {family:{'state':circuit.state,
+                            'calls':len(circuit.outcomes),
+                            'failures':circuit.failures,
+                            'slow':circuit.slow,
+                            'rejected':circuit.rejected}
+                    for family,circuit in self._circuits.items()}
@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+__all__ = ['ResponseCache','ETagCache']
+
+
+class ResponseCache(object):
+
+    """ Bounded LRU cache for the decoded json of GET requests sent
+        by BitGoClient.
+
+        Entries are keyed by the access token, http method, mapped
+        endpoint url and params, so different users never share a
+        response.Each entry expires after the TTL of the resource
+        action it was requested for(the ENDPOINT key), falling back
+        to default_ttl.Whenever a PUT, POST or DELETE is sent to an
+        endpoint, every cached entry under that endpoint or above it
+        (e.g. the 'wallet' list when 'wallet/:id' changes) is dropped.
+
+        Cached json is shared between callers and must be treated as
+        read only.
+
+        Example:
+            cache = ResponseCache(maxsize=5000,default_ttl=10,
+                                  ttls={'READ':60,'LIST':5})
+            client = BitGoClient(cache=cache)
+    """
+
+    MISSING = object()
+
+    def __init__(self,maxsize=1024,default_ttl=30.0,ttls=None):
+
+        """
+            @param maxsize : Maximum number of responses kept.The least
+                             recently used response is evicted first.
+
+            @param default_ttl : Seconds a response stays fresh when its
+                                 action has no ttl of its own.
+
+            @param ttls : A dictionary mapping resource actions to their
+                          own ttl in seconds.A ttl of 0 disables caching
+                          for that action.
+        """
+
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits':0,'misses':0,'evictions':0,
+                       'expirations':0,'invalidations':0}
+
+    @staticmethod
+    def _normalize(url):
+        return url.split('?',1)[0].strip('/')
+
+    def make_key(self,token,method,url,params=None):
+
+        """ Builds the cache key of a request."""
+
+        params_key = json.dumps(params,sort_keys=True,default=str) if params else ''
+        return (token,method.lower(),self._normalize(url),params_key)
+
+    def ttl_for(self,action=None):
+        return self.ttls.get(action,self.default_ttl)
+
+    def get(self,key):
+
+        """ Returns the cached json for key or MISSING."""
+
+        with self._lock:
+            entry = self._entries.get(key,None)
+            if entry is None:
+                self._stats['misses'] += 1
+                return self.MISSING
+
+            expires,value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return self.MISSING
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self,key,value,action=None):
+
+        """ Caches value under key for the ttl of action."""
+
+        ttl = self.ttl_for(action=action)
+        if not ttl or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl,value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self,url):
+
+        """ Drops every entry whose endpoint is url, below url or above
+            url, for every access token.
+        """
+
+        path = self._normalize(url)
+        with self._lock:
+            stale = [key for key in self._entries
+                     if self._related(key[2],path)]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+
+    @staticmethod
+    def _related(cached,path):
+        if cached == path or not cached or not path:
+            return True
+        return path.startswith(cached + '/') or cached.startswith(path + '/')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+
+        """ Returns a snapshot of the hits, misses, evictions,
+            expirations and invalidations counters along with the
+            current size.
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            return stats
+
+
+class ETagCache(object):
+
+    """ Remembers the ETag and Last-Modified validators of GET
+        responses along with their decoded json, so BitGoClient can
+        send If-None-Match/If-Modified-Since headers when requesting
+        the same url again.On a 304 Not Modified the stored json is
+        returned, skipping both the body download and json parsing.
+
+        Entries are keyed by access token, url and params, and the
+        least recently used entry is evicted past maxsize.Stored json
+        is shared between callers and must be treated as read only.
+
+        Example:
+            client = BitGoClient(etag_cache=ETagCache(maxsize=1000))
+    """
+
+    def __init__(self,maxsize=1024):
+
+        """
+            @param maxsize : Maximum number of responses kept.
+        """
+
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'not_modified':0,'modified':0,'evictions':0}
+
+    def make_key(self,token,url,params=None):
+
+        """ Builds the cache key of a GET request."""
+
+        params_key = json.dumps(params,sort_keys=True,default=str) if params else ''
+        return (token,url,params_key)
+
+    def get(self,key):
+
+        """ Returns the (etag,last_modified,json) entry for key or None."""
+
+        with self._lock:
+            entry = self._entries.get(key,None)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def conditional_headers(self,entry):
+
+        """ Returns the conditional request headers for an entry."""
+
+        headers = {}
+        if entry is not None:
+            etag,last_modified,_ = entry
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def not_modified(self,entry):
+
+        """ Returns the stored json of an entry after a 304 response."""
+
+        with self._lock:
+            self._stats['not_modified'] += 1
+        return entry[2]
+
+    def store(self,key,response_headers,json_data):
+
+        """ Keeps json_data for key if the response carried an
+            ETag or Last-Modified validator.
+        """
+
+        etag = response_headers.get('ETag',None)
+        last_modified = response_headers.get('Last-Modified',None)
+
+        with self._lock:
+            self._stats['modified'] += 1
+            if not etag and not last_modified:
+                self._entries.pop(key,None)
+                return
+
+            self._entries[key] = (etag,last_modified,json_data)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+
+        """ Returns a snapshot of the not_modified(304), modified and
+            evictions counters along with the current size.
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            return stats
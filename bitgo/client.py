@@ -1,14 +1,54 @@
-import json
+import threading
+import time
+
 import requests
 
+from bitgo.codec import get_codec
+from bitgo.deadline import Deadline
 from bitgo.errors import (BitGoException,BitGoClientException,
                           InvalidAccessToken,HttpError,
                           BadRequest,Unauthorized,Forbidden,
-                          NotFound,NotAcceptable)
+                          NotFound,NotAcceptable,TooManyRequests,
+                          DeadlineExceeded)
+from bitgo.metrics import MetricsMiddleware
+from bitgo.middleware import (RequestContext,TimedHTTPAdapter,current_timings,
+                              record_timing,track_timings)
+from bitgo.stream import JSONItemStream
 from bitgo.token import BitGoAccessToken
+from bitgo.transport import RequestsTransport
 from bitgo.version import VERSION
 
-__all__ = ['BitGoClient']
+__all__ = ['BitGoClient','build_session']
+
+
+def build_session(pool_connections=10,pool_maxsize=10,pool_block=False):
+
+    """ Builds a requests Session backed by a pooled HTTPAdapter so
+        connections to BitGo's API are kept alive and reused between
+        requests instead of paying a new TCP+TLS handshake every time.
+
+        A session built here can be passed to several BitGoClient
+        instances through the 'session' parameter to share one pool.
+
+        @param pool_connections : Number of host pools to cache.
+
+        @param pool_maxsize : Maximum number of connections kept alive
+                              per host.
+
+        @param pool_block : If True, requests will block when every
+                            connection of a host pool is in use instead
+                            of opening a new throwaway connection.
+    """
+
+    adapter = TimedHTTPAdapter(pool_connections=pool_connections,
+                               pool_maxsize=pool_maxsize,
+                               pool_block=pool_block)
+
+    session = requests.Session()
+    session.mount('https://',adapter)
+    session.mount('http://',adapter)
+    return session
+
 
 class BitGoClient(object):
 
@@ -24,7 +64,27 @@ class BitGoClient(object):
     ENVIRONMENT = {'test':'https://test.bitgo.com/api/v1',
                    'prod':'https://bitgo.com/api/v1'}
 
-    def __init__(self,env=None,user_agent=None,proxy=None):
+    #Map for 4xx errors to a specific
+    # BitGo's HttpError exception
+    HTTP_EXCEPTIONS = {400:BadRequest,
+                       401:Unauthorized,
+                       403:Forbidden,
+                       404:NotFound,
+                       406:NotAcceptable,
+                       429:TooManyRequests}
+
+    #(connect,read) seconds waited on BitGo by default
+    DEFAULT_TIMEOUT = (10.0,60.0)
+
+    #Number of access tokens whose request headers are kept prebuilt
+    HEADER_CACHE_SIZE = 256
+
+    def __init__(self,env=None,user_agent=None,proxy=None,session=None,
+                 pool_connections=10,pool_maxsize=10,pool_block=False,
+                 keep_alive=True,retry=None,rate_limiter=None,
+                 cache=None,etag_cache=None,codec=None,middlewares=None,
+                 metrics=None,proxy_pool=None,circuit_breaker=None,
+                 timeout=DEFAULT_TIMEOUT,single_flight=None,transport=None):
 
         """ Default environment will be set to 'test', if you want to use
             a different environment, you can pass a new supported environment
@@ -53,16 +113,217 @@ class BitGoClient(object):
 
                             It is important to remember that access tokens
                             are bound to 1 ip.
+
+            @param session : Optional requests Session to send requests
+                             through.Pass the same session(see build_session())
+                             to several clients to share one connection pool.
+                             A shared session is not closed by close(), its
+                             owner is responsible for closing it.
+
+            @param pool_connections : Number of host pools to cache when the
+                                      client builds its own session.
+
+            @param pool_maxsize : Maximum number of kept alive connections
+                                  per host when the client builds its own
+                                  session.
+
+            @param pool_block : If True, block when the pool of a host is
+                                exhausted instead of opening extra connections.
+
+            @param keep_alive : If False, a 'Connection: close' header is sent
+                                so every connection is dropped after its request.
+
+            @param retry : Optional RetryPolicy deciding whether connection
+                           errors,timeouts and 5xx/429 responses are retried.
+                           By default every failure is raised right away.
+
+            @param rate_limiter : Optional RateLimiter every request waits on
+                                  before being sent, so the client stays within
+                                  BitGo's per token rate limits.
+
+            @param cache : Optional ResponseCache keeping the json of GET
+                           requests for a while, which is invalidated when
+                           a PUT,POST or DELETE touches the same endpoint.
+
+            @param etag_cache : Optional ETagCache used to send conditional
+                                GET requests(If-None-Match/If-Modified-Since)
+                                and reuse the stored json on a 304 response.
+
+            @param codec : The json codec encoding request bodies and decoding
+                           responses.Either a JSONCodec instance or a codec
+                           name('json','orjson','ujson' or 'fastest').By
+                           default the standard library json module is
+                           used(see get_codec()).
+
+            @param middlewares : Optional list of Middleware instances whose
+                                 before_send,after_receive and on_error hooks
+                                 are called for every request, e.g. a
+                                 TimingMiddleware.
+
+            @param metrics : Optional Metrics instance counting requests,
+                             errors and latencies per action, method and
+                             status, for PrometheusExporter or OTLPExporter.
+                             Resource calls made with this client are
+                             recorded too.
+
+            @param proxy_pool : Optional ProxyPool spreading requests over
+                                several proxies, with every access token
+                                pinned to one of them.Can't be combined
+                                with proxy.
+
+            @param circuit_breaker : Optional CircuitBreaker failing requests
+                                     fast with CircuitOpen while an endpoint
+                                     family keeps failing or answering slowly.
+
+            @param timeout : Seconds to wait for BitGo, either a (connect,read)
+                             tuple or a single number used for both.connect
+                             bounds opening a connection and read every wait
+                             for data from the socket.None waits forever.
+                             A call's deadline shortens both when less time
+                             is left.
+
+            @param single_flight : Optional SingleFlight sharing one request
+                                   between identical GET requests(same access
+                                   token, url and params) sent at the same
+                                   time by several threads.
+
+            @param transport : Optional Transport sending the requests, e.g.
+                               an HTTP2Transport multiplexing concurrent
+                               requests over one connection.By default they
+                               go through the client's requests session.Like
+                               a shared session, a transport passed in is not
+                               closed by close().
         """
 
         self.endpoint = env or self.ENVIRONMENT['test']
-        self.user_agent = user_agent or self.USER_AGENT
 
+        #Headers and proxies only change through the user_agent,
+        #keep_alive and proxy setters, so they are built there once
+        #instead of on every request.
+        self._user_agent = user_agent or self.USER_AGENT
+        self._keep_alive = keep_alive
+        self._header_lock = threading.Lock()
+        self._rebuild_headers()
+
+        if proxy and proxy_pool is not None:
+            raise BitGoClientException('Pass either a proxy or a proxy_pool, not both')
+
+        self.proxy = proxy
+        self.proxy_pool = proxy_pool
+        self.circuit_breaker = circuit_breaker
+        self.timeout = timeout
+        self.single_flight = single_flight
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.etag_cache = etag_cache
+        self.codec = get_codec(codec)
+        self.middlewares = list(middlewares or [])
+        self.metrics = metrics
+        if metrics is not None:
+            self.middlewares.append(MetricsMiddleware(metrics))
+
+        #The pool is built lazily on first use, so subclasses sending
+        #requests through another transport never open one.
+        self._session = session
+        self._owns_session = session is None
+        self._pool_settings = {'pool_connections':pool_connections,
+                               'pool_maxsize':pool_maxsize,
+                               'pool_block':pool_block}
+        self._transport = transport
+        self._owns_transport = transport is None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+    @property
+    def session(self):
+
+        """ The requests Session every call is sent through."""
+
+        if self._closed:
+            raise BitGoClientException('Client has been closed,create a new ' \
+                                       'BitGoClient to send more requests')
+
+        if self._session is None:
+            self._session = build_session(**self._pool_settings)
+
+        return self._session
+
+    @property
+    def transport(self):
+
+        """ The Transport every request is sent through."""
+
+        if self._closed:
+            raise BitGoClientException('Client has been closed,create a new ' \
+                                       'BitGoClient to send more requests')
+
+        if self._transport is None:
+            self._transport = RequestsTransport(self.session)
+
+        return self._transport
+
+    def close(self):
+
+        """ Tears down the connection pool owned by this client.
+            Sessions and transports passed in by the caller are left
+            open since they might be shared with other clients.
+        """
+
+        if self._owns_session and self._session is not None:
+            self._session.close()
+
+        if self._owns_transport:
+            self._transport = None
+
+        self._session = None
+        self._closed = True
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self,timeout):
+        if timeout is not None and not isinstance(timeout,tuple):
+            timeout = (timeout,timeout)
+        self._timeout = timeout
+
+    @property
+    def user_agent(self):
+        return self._user_agent
+
+    @user_agent.setter
+    def user_agent(self,user_agent):
+        self._user_agent = user_agent or self.USER_AGENT
+        self._rebuild_headers()
+
+    @property
+    def keep_alive(self):
+        return self._keep_alive
+
+    @keep_alive.setter
+    def keep_alive(self,keep_alive):
+        self._keep_alive = keep_alive
+        self._rebuild_headers()
+
+    @property
+    def proxy(self):
+        return self._proxy
+
+    @proxy.setter
+    def proxy(self,proxy):
         if proxy:
             #Validate proxy before assigning it
             self._validate_proxy(proxy=proxy)
 
-        self.proxy = proxy
+        self._proxy = proxy
+        self._proxies = self._build_proxy(proxy=proxy)
 
     def _validate_proxy(self,proxy):
 
@@ -109,12 +370,14 @@ class BitGoClient(object):
 
         """ Function used to change proxy when needed. Make sure to passed
             a valid dictionary containing the right proxy configuration keys.
-            Atleast, an 'ip' and 'port' key should be supplied
+            Atleast, an 'ip' and 'port' key should be supplied.
+            Changes made in place to the proxy dict are not picked
+            up, always go through set_proxy().
         """
 
         #Validate the proxy and make sure it is the correct format
         self._validate_proxy(proxy=proxy)
-        #set proxy
+        #set proxy, which also rebuilds the proxies sent with every request
         self.proxy = proxy
 
     def _build_url(self,uri):
@@ -128,69 +391,308 @@ class BitGoClient(object):
             return '{endpoint}/{resource}'.format(endpoint=self.endpoint,
                                                   resource=uri)
 
-    def _send_request(self,resource,method='get',params=None,access_token=None):
+    def _resolve_token(self,access_token):
 
+        """ Returns the raw token string out of a str or a
+            BitGoAccessToken instance, or None when no access
+            token was given.Anything else raises InvalidAccessToken.
         """
-            Internal private method for internal use only.
-            All params will be converted to json before sending,
-            and headers will be updated with a 'Content-Type: application/json'
-            on every request, as well as with an access token if provided
 
-       """
+        if not access_token:
+            return None
+
+        if isinstance(access_token,BitGoAccessToken):
+            return access_token.token
+        elif isinstance(access_token,str):
+            return access_token
+        else:
+            raise InvalidAccessToken('access_token is not a valid str' \
+                                     ' or a BitGoAccessToken instance')
+
+    def _rebuild_headers(self):
+
+        """ Builds the headers shared by every request, with the
+            User-Agent and Content-Type, and drops the headers cached
+            per access token, which were built out of the old ones.
+        """
+
+        headers = {'Content-type':'application/json',
+                   'User-Agent':self._user_agent}
+
+        if not self._keep_alive:
+            headers['Connection'] = 'close'
+
+        self._base_headers = headers
+        self._token_headers = {}
+
+    def _build_headers(self,token):
+
+        """ Returns the http headers sent on every request, which
+            include the User-Agent, Content-Type and the Authorization
+            header when a token is given.
+
+            Headers are cached per token and shared between requests,
+            so the returned dict must not be modified.
+        """
+
+        if not token:
+            return self._base_headers
+
+        token_headers = self._token_headers
+        headers = token_headers.get(token,None)
+        if headers is None:
+            headers = dict(self._base_headers)
+            headers['Authorization'] = 'Bearer {token}'.format(token=token)
+
+            with self._header_lock:
+                #Evict the oldest token once the cache is full
+                if len(token_headers) >= self.HEADER_CACHE_SIZE:
+                    token_headers.pop(next(iter(token_headers)),None)
+                token_headers[token] = headers
+
+        return headers
 
-        http_method = {'get':requests.get,
-                       'post':requests.post,
-                       'put':requests.put,
-                       'delete':requests.delete}
+    def _prepare_request(self,resource,method,params,access_token):
 
-        #lookup http method to use
-        request = http_method.get(method.lower(),None)
+        """ Validates the http method and returns a tuple with the
+            lowercased method, the full url, the headers and the json
+            encoded body(None for GET and DELETE requests).
+        """
+
+        method = method.lower()
 
         #Makes sure a valid method was passed. If not raise a BitGoException.
-        if request is None:
+        if method not in ('get','post','put','delete'):
             raise BitGoClientException('Invalid http method,only acceptable methods' \
                                  ' are GET,POST,PUT, or DELETE')
 
         #Setup access token by seeing if access_token is a BitGoAccessToken
         #instance. If it is not check if access_token is a string else raise
         # InvalidAccessToken exception.
-        if access_token:
-            if isinstance(access_token,BitGoAccessToken):
-                token = access_token.token
-            elif isinstance(access_token,str):
-                token = access_token
-            else:
-                raise InvalidAccessToken('access_token is not a valid str' \
-                                         ' or a BitGoAccessToken instance')
-        else:
-            token = None
+        token = self._resolve_token(access_token=access_token)
 
-        #Sets http headers with User-Agent and Content-Type
-        headers = {'Content-type':'application/json',
-                   'User-Agent':self.user_agent}
-
-        #If a token was provided , then update token in headers.
-        if token:
-            headers.update({'Authorization': 'Bearer {token}'.format(token=token)})
+        headers = self._build_headers(token=token)
 
         #build the url
         url = self._build_url(uri=resource)
 
-        #build the proxy configurations
-        proxy = self.proxy if self.proxy is None else self._build_proxy(proxy=self.proxy)
+        #If there are any params then convert it to json
+        if method not in ('delete','get') and params and isinstance(params,dict):
+            json_data = self.codec.dumps(params)
+        else:
+            json_data = None
+
+        return method,url,headers,json_data
+
+    def _send_request(self,resource,method='get',params=None,access_token=None,
+                      extra_headers=None,stream=False,deadline=None):
+
+        """
+            Internal private method for internal use only.
+            All params will be converted to json before sending,
+            and headers will be updated with a 'Content-Type: application/json'
+            on every request, as well as with an access token if provided
+
+       """
+
+        method,url,headers,json_data = self._prepare_request(resource=resource,
+                                                             method=method,
+                                                             params=params,
+                                                             access_token=access_token)
 
-        if method.lower() in ['delete','get']:
-            return request(url,headers=headers,proxies=proxy)
+        if extra_headers:
+            headers = dict(headers,**extra_headers)
+
+        #GET and DELETE params are sent in the query string
+        query = params if method in ('get','delete') else None
+
+        timeout = self._timeout if deadline is None else deadline.timeout(self._timeout)
+
+        timings = current_timings()
+        if timings is None and self.proxy_pool is None:
+            return self.transport.request(method,url,params=query,data=json_data,
+                                          headers=headers,proxies=self._proxies,
+                                          stream=stream,timeout=timeout)
+
+        if self.proxy_pool is None:
+            route = None
+            proxy = self._proxies
         else:
-            #If there are any params then convert it to json
-            if params and isinstance(params,dict):
-                json_data = json.dumps(params)
+            token = self._resolve_token(access_token=access_token)
+            route = self.proxy_pool.select(token=token)
+            proxy = route.proxies
+
+        opened = 0.0 if timings is None else timings.get('connect',0.0) + timings.get('tls',0.0)
+        start = time.perf_counter()
+        try:
+            response = self.transport.request(method,url,params=query,data=json_data,
+                                              headers=headers,proxies=proxy,
+                                              stream=stream,timeout=timeout)
+        except requests.exceptions.RequestException as exc:
+            if route is not None:
+                if self.proxy_pool.is_failure(exc):
+                    self.proxy_pool.record_failure(route,token=token)
+                else:
+                    self.proxy_pool.release(route)
+            raise
+        except BaseException:
+            if route is not None:
+                self.proxy_pool.release(route)
+            raise
+        sent = time.perf_counter() - start
+
+        if route is not None:
+            self.proxy_pool.record_success(route,response.elapsed.total_seconds(),
+                                           token=token,status=response.status_code)
+
+        if timings is None:
+            return response
+
+        #response.elapsed spans from sending the request until the
+        #headers arrived, opening a new connection included.
+        elapsed = response.elapsed.total_seconds()
+        opened = timings.get('connect',0.0) + timings.get('tls',0.0) - opened
+        record_timing('server',max(0.0,elapsed - opened))
+        record_timing('transfer',max(0.0,sent - elapsed))
+        return response
+
+    def _send_attempt(self,resource,method,params,access_token,action=None,
+                      extra_headers=None,stream=False,deadline=None):
+
+        """ Sends the request through the client's circuit breaker,
+            if any, recording its outcome.
+        """
+
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return self._send_request(resource=resource,method=method,params=params,
+                                      access_token=access_token,extra_headers=extra_headers,
+                                      stream=stream,deadline=deadline)
+
+        call = breaker.before_call(action)
+        start = time.perf_counter()
+        try:
+            response = self._send_request(resource=resource,method=method,params=params,
+                                          access_token=access_token,extra_headers=extra_headers,
+                                          stream=stream,deadline=deadline)
+        except requests.exceptions.RequestException:
+            breaker.record(call,time.perf_counter() - start,failed=True)
+            raise
+        except BaseException:
+            breaker.release(call)
+            raise
+
+        breaker.record(call,response.elapsed.total_seconds(),
+                       failed=breaker.is_failure(response.status_code))
+        return response
+
+    def _wait_rate_limiter(self,action,deadline):
+
+        """ Waits for the client's rate limiter, raising DeadlineExceeded
+            right away if the wait would go past the deadline.
+        """
+
+        if deadline is None:
+            self.rate_limiter.acquire(action=action)
+            return
+
+        delay = self.rate_limiter.reserve(action=action)
+        if delay >= deadline.remaining():
+            #The request is not sent, so it doesn't use up the quota
+            self.rate_limiter.refund(action=action)
+            raise DeadlineExceeded('Waiting {d:.2f}s on the rate limiter would exceed '\
+                                   'the {s}s deadline of the call'.format(d=delay,s=deadline.seconds))
+        if delay > 0:
+            time.sleep(delay)
+
+    def _send_with_retry(self,resource,method,params,access_token,action=None,
+                         extra_headers=None,stream=False,deadline=None):
+
+        """ Sends the request, retrying it for as long as the client's
+            retry policy allows.Once the policy gives up, the last
+            response is returned or the last requests exception is raised.
+            Every attempt waits on the client's rate limiter first.
+
+            With a deadline, no attempt is sent once it has passed and
+            no retry is made if its backoff would outlast it.
+
+            A BitGoException raised before the first attempt went out,
+            e.g. by the deadline, the rate limiter, the circuit breaker or
+            the proxy pool, has its sent attribute set to False.Failures of
+            the transport are requests exceptions.
+        """
+
+        attempt = 1
+        while True:
+            try:
+                if deadline is not None:
+                    deadline.check()
+                if self.rate_limiter is not None:
+                    self._wait_rate_limiter(action=action,deadline=deadline)
+
+                response = self._send_attempt(resource=resource,
+                                              method=method,
+                                              params=params,
+                                              access_token=access_token,
+                                              action=action,
+                                              extra_headers=extra_headers,
+                                              stream=stream,
+                                              deadline=deadline)
+            except BitGoException as exc:
+                if attempt == 1:
+                    exc.sent = False
+                raise
+            except requests.exceptions.RequestException as exc:
+                if self.retry is None:
+                    raise
+                delay = self.retry.on_exception(method=method,exc=exc,attempt=attempt)
+                if delay is None or (deadline is not None and delay >= deadline.remaining()):
+                    raise
             else:
-                json_data = None
+                if self.retry is None:
+                    return response
+                delay = self.retry.on_response(method=method,response=response,attempt=attempt)
+                if delay is None or (deadline is not None and delay >= deadline.remaining()):
+                    return response
+                #Release the connection back to the pool before waiting
+                response.close()
+
+            self.retry.sleep(delay)
+            attempt += 1
+
+    def _raise_http_error(self,http_code,json_data):
 
-            return request(url,data=json_data,headers=headers,proxies=proxy)
+        """ Raises the BitGo HttpError subclass mapped to a 4xx
+            http status code, or a general HttpError for any other
+            error status code.
 
-    def request(self,url,method='get',params=None,access_token=None):
+            @param http_code : The http status code returned.
+
+            @param json_data : The decoded response body or None
+                               if it could not be decoded.
+        """
+
+        client_exception = self.HTTP_EXCEPTIONS.get(http_code,None)
+
+        if client_exception:
+            error = ''
+            if isinstance(json_data,dict) and 'error' in json_data:
+                error = json_data['error']
+
+            exc = client_exception("BitGo API call failed.Response returned a "\
+                                   "{code} http status code with "\
+                                   "error: {error}".format(code=http_code,error=error))
+        else:
+            #Unknown http status code was returned. Something is very wrong.
+            #Raise a general BitgoException addressing this anomaly.
+            exc = HttpError('BitGo returned a {code} http status. '\
+                            'This is definitely an anomaly'.format(code=http_code))
+
+        exc.status_code = http_code
+        raise exc
+
+    def request(self,url,method='get',params=None,access_token=None,action=None,
+                deadline=None):
 
         """ Sends a request to BitGo's API and handles any http errors
             that might occur.
@@ -217,12 +719,178 @@ class BitGoClient(object):
             @param access_token : An access token can be provided with a string or
                                 an instance of a BitGoAccessToken object.
 
+            @param action : The resource action(ENDPOINT key) the request is
+                            sent for, if any.Used to pick the rate limiter's
+                            bucket for this endpoint family.
+
+            @param deadline : Optional seconds(or a Deadline) the whole call,
+                              retries and rate limiting included, needs to
+                              finish in.Raises DeadlineExceeded once it passed.
+
         """
+        deadline = Deadline.coerce(deadline)
+
+        cache = self.cache
+        if cache is None:
+            return self._request(url=url,method=method,params=params,
+                                 access_token=access_token,action=action,
+                                 deadline=deadline)
+
+        if method.lower() == 'get':
+            key = cache.make_key(token=self._resolve_token(access_token=access_token),
+                                 method=method,url=url,params=params)
+            json_data = cache.get(key)
+            if json_data is cache.MISSING:
+                json_data = self._request(url=url,method=method,params=params,
+                                          access_token=access_token,action=action,
+                                          deadline=deadline)
+                cache.set(key,json_data,action=action)
+            return json_data
+
+        #Any write makes cached reads of the same endpoint stale,
+        #whether it succeeded or not.
         try:
-            response = self._send_request(resource=url,
-                                          method=method,
-                                          params=params,
-                                          access_token=access_token)
+            return self._request(url=url,method=method,params=params,
+                                 access_token=access_token,action=action,
+                                 deadline=deadline)
+        finally:
+            cache.invalidate(url)
+
+    def _begin_request(self,url,method,params,action):
+
+        """ Starts the middleware pipeline of a request, returning its
+            RequestContext, or None when the client has no middlewares.
+        """
+
+        if not self.middlewares:
+            return None
+
+        context = RequestContext(method=method,url=url,action=action,params=params)
+        for middleware in self.middlewares:
+            middleware.before_send(context)
+
+        track_timings(context.timings)
+        return context
+
+    def _end_request(self,context,exc=None):
+
+        """ Ends the middleware pipeline of a request, calling either
+            after_receive or on_error on every middleware.
+        """
+
+        if context is None:
+            return
+
+        track_timings(None)
+        context.timings['total'] = time.perf_counter() - context.started
+
+        if exc is None:
+            for middleware in self.middlewares:
+                middleware.after_receive(context)
+        else:
+            context.error = exc
+            for middleware in self.middlewares:
+                middleware.on_error(context,exc)
+
+    def _request(self,url,method,params,access_token,action,deadline=None):
+
+        """ Sends the request through the middleware pipeline and maps
+            any failure to a BitGoException.Identical GET requests in
+            flight share one request through the client's SingleFlight.
+        """
+
+        single_flight = self.single_flight
+        if single_flight is not None and method.lower() == 'get':
+            key = single_flight.make_key(token=self._resolve_token(access_token=access_token),
+                                         url=url,params=params)
+            return single_flight.do(key,
+                                    lambda: self._pipeline_request(url=url,method=method,params=params,
+                                                                   access_token=access_token,
+                                                                   action=action,deadline=deadline),
+                                    deadline=deadline)
+
+        return self._pipeline_request(url=url,method=method,params=params,
+                                      access_token=access_token,action=action,
+                                      deadline=deadline)
+
+    def _pipeline_request(self,url,method,params,access_token,action,deadline=None):
+
+        context = self._begin_request(url=url,method=method,params=params,action=action)
+        try:
+            json_data = self._perform_request(url=url,method=method,params=params,
+                                              access_token=access_token,action=action,
+                                              context=context,deadline=deadline)
+        except Exception as exc:
+            self._end_request(context,exc=exc)
+            raise
+
+        self._end_request(context)
+        return json_data
+
+    def _perform_request(self,url,method,params,access_token,action,context=None,
+                         deadline=None):
+
+        etag_key = etag_entry = extra_headers = None
+        if self.etag_cache is not None and method.lower() == 'get':
+            etag_key = self.etag_cache.make_key(token=self._resolve_token(access_token=access_token),
+                                                url=url,params=params)
+            etag_entry = self.etag_cache.get(etag_key)
+            extra_headers = self.etag_cache.conditional_headers(etag_entry)
+
+        response = self._checked_response(url=url,method=method,params=params,
+                                          access_token=access_token,action=action,
+                                          extra_headers=extra_headers,context=context,
+                                          deadline=deadline)
+
+        if response.status_code == 304:
+            #Not Modified is only expected as the answer to
+            #a conditional request.
+            if etag_entry is None:
+                self._raise_http_error(http_code=304,json_data=None)
+            return self.etag_cache.not_modified(etag_entry)
+
+        start = time.perf_counter()
+        json_data = self._decode(response.content)
+        if context is not None:
+            context.timings['parse'] = time.perf_counter() - start
+
+        if etag_key is not None:
+            self.etag_cache.store(etag_key,response.headers,json_data)
+        return json_data
+
+    def _decode(self,content):
+
+        """ Decodes the body of a successful response, None when it
+            is empty, raising BitGoException when it is not valid json.
+        """
+
+        if not content:
+            return None
+
+        try:
+            return self.codec.loads(content)
+        except ValueError:
+            raise BitGoException("BitGo's response is not valid json")
+
+    def _checked_response(self,url,method,params,access_token,action,
+                          extra_headers=None,stream=False,context=None,deadline=None):
+
+        """ Sends the request and returns its response, mapping any
+            requests exception and any 4xx/5xx response to a BitGoException.
+        """
+
+        try:
+            response = self._send_with_retry(resource=url,
+                                             method=method,
+                                             params=params,
+                                             access_token=access_token,
+                                             action=action,
+                                             extra_headers=extra_headers,
+                                             stream=stream,
+                                             deadline=deadline)
+            if context is not None:
+                context.status_code = response.status_code
+
             #Lets make sure to raise a requests exception for
             #any client error or server error response.
             #This means any 4xx(client) or 5xx(server) http status code.
@@ -242,61 +910,98 @@ class BitGoClient(object):
                                  " to BitGo's. This is not a SSL or proxy error")
 
         except requests.exceptions.Timeout:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded('The {s}s deadline of the call was exceeded while '\
+                                       "waiting on BitGo's response".format(s=deadline.seconds))
             raise BitGoException("A http timeout error has occured while connecting " \
                                  " to BitGo's.")
 
         except requests.exceptions.HTTPError:
-            #Map for 4xx errors to a specific
-            # BitGo's HttpError exception
-            http_exceptions = {400:BadRequest,
-                               401:Unauthorized,
-                               403:Forbidden,
-                               404:NotFound,
-                               406:NotAcceptable}
-
-            http_code = response.status_code
-            #Check if we have here a client error status code,
-            #AKA 4xx error
-            is_client_error = http_exceptions.get(http_code,False)
-
-            if is_client_error:
-                client_exception = http_exceptions.get(http_code)
-                error = '' if 'error' not in response.json() else response.json()['error']
-
-                raise client_exception("BitGo API call failed.Response returned a "\
-                                       "{code} http status code with "\
-                                       "error: {error}".format(code=http_code,error=error))
-            else:
-                #Unknown http status code was returned. Something is very wrong.
-                #Raise a general BitgoException addressing this anomaly.
-                raise HttpError('BitGo returned a {code} http status. '\
-                                     'This is definitely an anomaly'.format(code=http_code))
+            try:
+                json_data = self.codec.loads(response.content)
+            except ValueError:
+                json_data = None
+
+            self._raise_http_error(http_code=response.status_code,
+                                   json_data=json_data)
 
         except requests.exceptions.RequestException as exc:
             #Re-raise any other requests exception as a BitGoException
-            raise BitGoException('An unknown requests exception has occured:{exc}'.format(exc))
+            raise BitGoException('An unknown requests exception has occured:{exc}'.format(exc=exc))
 
         else:
-           return response.json()
+            return response
+
+    def stream(self,url,key=None,method='get',params=None,access_token=None,
+               action=None,chunk_size=65536,deadline=None):
 
-    def get(self,url,access_token=None):
+        """ Sends a request and decodes its json response incrementally,
+            returning a JSONItemStream that yields the items of the array
+            stored under 'key' as they arrive off the socket.Only one item
+            is held in memory at a time, which keeps memory flat for very
+            large list responses.The other top level keys are available
+            in the stream's 'metadata' once it is exhausted.
+
+            Responses are never cached when streamed.
+
+            @param key : The top level key holding the array to stream,
+                         e.g. 'transactions'.None if the whole body is
+                         a json array.
+
+            @param chunk_size : Number of bytes read from the socket at once.
+
+            The other params are the same as request()'s.The deadline
+            bounds the wait for the response headers and every later
+            read of the body.
+        """
+
+        deadline = Deadline.coerce(deadline)
+
+        context = self._begin_request(url=url,method=method,params=params,action=action)
+        try:
+            response = self._checked_response(url=url,method=method,params=params,
+                                              access_token=access_token,action=action,
+                                              stream=True,context=context,
+                                              deadline=deadline)
+        except Exception as exc:
+            self._end_request(context,exc=exc)
+            raise
+
+        #Streamed bodies are timed up to their response headers
+        self._end_request(context)
+
+        def chunks():
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    yield chunk
+            except requests.exceptions.RequestException as exc:
+                raise BitGoException('A http error has occured while streaming '\
+                                     "BitGo's response:{exc}".format(exc=exc))
+            finally:
+                response.close()
+
+        return JSONItemStream(chunks(),key=key,encoding=response.encoding or 'utf-8')
+
+    def get(self,url,access_token=None,deadline=None):
 
         """ Sends a GET request with or without an access token"""
 
         return self.request(url=url,
                             method='get',
-                            access_token=access_token)
+                            access_token=access_token,
+                            deadline=deadline)
 
-    def delete(self,url,access_token=None):
+    def delete(self,url,access_token=None,deadline=None):
 
         """ Sends a DELETE request with or without an access token"""
 
         return self.request(url=url,
                             method='delete',
-                            access_token=access_token)
+                            access_token=access_token,
+                            deadline=deadline)
 
 
-    def post(self,url,data,access_token=None):
+    def post(self,url,data,access_token=None,deadline=None):
 
         """ Sends a POST request with post's data and
             with or without an access token"""
@@ -304,9 +1009,10 @@ class BitGoClient(object):
         return self.request(url=url,
                             method='post',
                             params=data,
-                            access_token=access_token)
+                            access_token=access_token,
+                            deadline=deadline)
 
-    def put(self,url,data,access_token=None):
+    def put(self,url,data,access_token=None,deadline=None):
 
         """ Sends a PUT request with put's data and
             with or without an access token"""
@@ -314,6 +1020,7 @@ class BitGoClient(object):
         return self.request(url=url,
                             method='put',
                             params=data,
-                            access_token=access_token)
+                            access_token=access_token,
+                            deadline=deadline)
 
 
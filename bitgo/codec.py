@@ -0,0 +1,137 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+from bitgo.errors import BitGoClientException
+
+__all__ = ['JSONCodec','OrjsonCodec','UjsonCodec','get_codec']
+
+
+class JSONCodec(object):
+
+    """
+        Encodes request bodies and decodes response bodies for
+        BitGoClient using the standard library json module.
+
+        Codecs work on bytes both ways, so the body sent and the
+        body received never go through an extra str round trip.
+        Subclasses plug in faster json backends.
+
+    """
+
+    name = 'json'
+
+    def dumps(self,obj):
+
+        """ Returns obj encoded as utf-8 json bytes."""
+
+        return json.dumps(obj,separators=(',',':')).encode('utf-8')
+
+    def loads(self,data):
+
+        """ Decodes json from bytes or a str, raising ValueError
+            on invalid json.
+        """
+
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+
+    """ Codec backed by the optional 'orjson' package.Params orjson
+        can't encode(e.g. a Decimal or an int above 64 bits) are
+        encoded by the standard library instead.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise BitGoClientException('OrjsonCodec requires the orjson package.'\
+                                       'Install it with: pip install orjson')
+
+    def dumps(self,obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return super(OrjsonCodec,self).dumps(obj)
+
+    def loads(self,data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+
+    """ Codec backed by the optional 'ujson' package, falling back
+        to the standard library for params ujson can't encode.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise BitGoClientException('UjsonCodec requires the ujson package.'\
+                                       'Install it with: pip install ujson')
+
+    def dumps(self,obj):
+        try:
+            return ujson.dumps(obj,ensure_ascii=False).encode('utf-8')
+        except TypeError:
+            return super(UjsonCodec,self).dumps(obj)
+
+    def loads(self,data):
+        return ujson.loads(data)
+
+
+#Name picking the fastest installed backend
+FASTEST = 'fastest'
+
+CODECS = {'json':JSONCodec,
+          'orjson':OrjsonCodec,
+          'ujson':UjsonCodec}
+
+
+def get_codec(codec=None):
+
+    """
+        Returns a codec instance.
+
+        @param codec : None picks the standard library.A name('json',
+                       'orjson' or 'ujson') picks that backend, and a
+                       JSONCodec instance is returned as is.'fastest'
+                       picks the fastest installed backend, preferring
+                       orjson, then ujson, then the standard library.
+
+                       The faster backends are opt in since they don't
+                       decode exactly like the standard library, e.g.
+                       orjson rejects NaN and turns integers above 64
+                       bits into floats.
+
+    """
+
+    if isinstance(codec,JSONCodec):
+        return codec
+
+    if codec is None:
+        return JSONCodec()
+
+    if codec == FASTEST:
+        if orjson is not None:
+            return OrjsonCodec()
+        if ujson is not None:
+            return UjsonCodec()
+        return JSONCodec()
+
+    klazz = CODECS.get(codec,None)
+    if klazz is None:
+        raise BitGoClientException('Unknown json codec:{c}.Valid codecs are '\
+                                   '{names}'.format(c=codec,names=', '.join(sorted(CODECS) + [FASTEST])))
+    return klazz()
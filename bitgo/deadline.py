@@ -0,0 +1,72 @@
+import time
+
+from bitgo.errors import DeadlineExceeded
+
+__all__ = ['Deadline']
+
+
+class Deadline(object):
+
+    """
+        Time budget for a call, which might send several requests
+        (retries, pages of a list or a batch of ids).
+
+        Every call taking a 'deadline' accepts either a number of
+        seconds, counted from the moment the call is made, or a
+        Deadline instance so several calls share the same budget.
+
+        Example:
+            deadline = Deadline(30)
+            wallet = BitGoWallet.get(client,token,wallet_id,deadline=deadline)
+            for key in BitGoKeychains.iter_all(client,token,deadline=deadline):
+                ...
+    """
+
+    __slots__ = ('seconds','expires')
+
+    def __init__(self,seconds):
+
+        """
+            @param seconds : Seconds from now until the deadline.
+        """
+
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    @classmethod
+    def coerce(cls,deadline):
+
+        """ Returns deadline as a Deadline instance, or None when
+            deadline is None.
+        """
+
+        if deadline is None or isinstance(deadline,Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+
+        """ Raises DeadlineExceeded once the deadline has passed."""
+
+        if self.expired():
+            raise DeadlineExceeded('The {s}s deadline of the call was exceeded'.format(s=self.seconds))
+
+    def timeout(self,timeout):
+
+        """ Returns a (connect,read) requests timeout no longer than
+            the remaining time, out of the client's default timeout.
+        """
+
+        remaining = max(0.001,self.remaining())
+        if timeout is None:
+            return (remaining,remaining)
+
+        connect,read = timeout
+        return (remaining if connect is None else min(connect,remaining),
+                remaining if read is None else min(read,remaining))
@@ -0,0 +1,128 @@
+from urllib.parse import urlencode
+
+from bitgo.errors import (InvalidResourceEndpoint,InvalidResourceEndpointUrl,
+                          InvalidResourceMethod)
+
+__all__ = ['EndpointTemplate','compile_endpoints']
+
+
+class EndpointTemplate(object):
+
+    """
+        A resource action's endpoint url compiled once into a format
+        string, so building the url of a request is a single format()
+        call instead of splitting and re-joining the url every time.
+
+        Every url fragment starting with a colon(:) is a placeholder,
+        filled in order by positional args, or by name through keyword
+        arguments, e.g. 'wallet/:walletId/tx/:txId' has the 'walletId'
+        and 'txId' placeholders.
+
+    """
+
+    __slots__ = ('action','url','method','names','_format')
+
+    HTTP_METHODS = ('POST','GET','DELETE','PUT')
+
+    def __init__(self,action,url,method):
+
+        """
+            Validates an ENDPOINT entry and compiles its url.
+
+            @param action : The ENDPOINT key of the entry.
+
+            @param url : The endpoint url, e.g. 'wallet/:id'
+
+            @param method : The http(s) method used to request the url.
+
+        """
+
+        if not isinstance(url,str):
+            raise InvalidResourceEndpointUrl('Invalid resource endpoint url for'\
+                                          ' resource action:{a}'.format(a=action))
+
+        if not isinstance(method,str) or method.upper() not in self.HTTP_METHODS:
+            raise InvalidResourceMethod('HTTP method is invalid'\
+                                        ' for resource action:{a}'.format(a=action))
+
+        self.action = action
+        self.url = url
+        self.method = method
+
+        names = []
+        fragments = []
+        for fragment in url.split('/'):
+            if fragment.startswith(':'):
+                fragments.append('{%d}' % len(names))
+                names.append(fragment[1:])
+            else:
+                fragments.append(fragment.replace('{','{{').replace('}','}}'))
+
+        template = '/' + '/'.join(fragments)
+        if template.startswith('//'):
+            template = template[1:]
+
+        self.names = tuple(names)
+        self._format = template.format
+
+    def build(self,*args,query=None,**named):
+
+        """
+            Returns the url with every placeholder replaced.
+
+            @param *args : Values for the placeholders, in order.
+
+            @param query : Optional dictionary appended to the url as
+                           its query string.
+
+            @param **named : Values for the placeholders not filled by
+                             *args, by placeholder name.
+
+        """
+
+        if named:
+            args = list(args)
+            for name in self.names[len(args):]:
+                if name not in named:
+                    break
+                args.append(named.pop(name))
+
+        if len(args) != len(self.names) or named:
+            raise InvalidResourceEndpointUrl('Args does not match exact mutable ' \
+                                             'fragments.' \
+                                            'ENDPOINT could not be mapped')
+
+        url = self._format(*args)
+        if query:
+            url = '{url}?{query}'.format(url=url,query=urlencode(query,doseq=True))
+        return url
+
+    def __repr__(self):
+        return '<EndpointTemplate {a}: {m} {u}>'.format(a=self.action,
+                                                        m=self.method,
+                                                        u=self.url)
+
+
+def compile_endpoints(endpoints):
+
+    """
+        Compiles every entry of a resource's ENDPOINT dictionary into
+        an EndpointTemplate, raising InvalidResourceEndpoint for any
+        entry that is not a 2 item tuple.
+
+    """
+
+    if not isinstance(endpoints,dict):
+        raise InvalidResourceEndpoint('Found the ENDPOINT class variable, but '\
+                                      'it is not a valid dictionary')
+
+    templates = {}
+    for action,entry in endpoints.items():
+        if not isinstance(entry,(tuple,list)) or len(entry) != 2:
+            raise InvalidResourceEndpoint('ENDPOINT entry for resource action:{a} '\
+                                          'must be a 2 item tuple with an endpoint '\
+                                          'url and an http(s) method'.format(a=action))
+
+        templates[action] = EndpointTemplate(action,entry[0],entry[1])
+
+    return templates
@@ -2,12 +2,17 @@
 __all__ = ['BitGoException','AccessTokenException','InvalidAccessToken',
            'BitGoClientException','InvalidClient','BitGoResourceException',
            'InvalidResourceEndpoint','InvalidResourceEndpointUrl','InvalidResourceMethod',
-           'HttpError','BadRequest','Unauthorized','Forbidden','NotFound','NotAcceptable']
+           'HttpError','BadRequest','Unauthorized','Forbidden','NotFound','NotAcceptable',
+           'TooManyRequests','ProxyUnavailable','CircuitOpen',
+           'DeadlineExceeded','InsufficientFunds','InvalidTransaction']
 
 
 class BitGoException(Exception):
     """General BitGo's Exception"""
-    pass
+
+    #False when the client raised it before the request was sent
+    #to BitGo, None when it is not known
+    sent = None
 
 
 class AccessTokenException(BitGoException):
@@ -32,6 +37,26 @@ class InvalidClient(BitGoClientException):
     pass
 
 
+class ProxyUnavailable(BitGoClientException):
+    """ Raised when no proxy of a ProxyPool can
+        take a request, or the proxy an access
+        token is pinned to is down. """
+    pass
+
+
+class CircuitOpen(BitGoClientException):
+    """ Raised without sending the request when
+        the CircuitBreaker circuit of its endpoint
+        family is open. """
+    pass
+
+
+class DeadlineExceeded(BitGoClientException):
+    """ Raised when a call could not finish
+        before its deadline. """
+    pass
+
+
 class BitGoResourceException(BitGoException):
     """ BitGo's exceptions related to anything
         regarding a resource """
@@ -68,10 +93,30 @@ class InvalidResourceMethod(BitGoResourceException):
     pass
 
 
+class InsufficientFunds(BitGoResourceException):
+
+    """
+        Raised when a wallet's unspent outputs can't cover
+        an amount along with the fees of spending them
+    """
+    pass
+
+
+class InvalidTransaction(BitGoException):
+
+    """
+        Raised when a raw transaction can't be deserialized,
+        or a transaction being built is not valid
+    """
+    pass
+
+
 class HttpError(BitGoException):
     """ General Http error raised when interacting
         with BitGo's API"""
-    pass
+
+    #Http status code BitGo returned, when known
+    status_code = None
 
 
 class BadRequest(HttpError):
@@ -98,3 +143,7 @@ class NotAcceptable(HttpError):
     """HTTP 406: Not Acceptable"""
     pass
 
+
+class TooManyRequests(HttpError):
+    """HTTP 429: Too Many Requests"""
+    pass
@@ -1,8 +1,8 @@
 
 from bitgo.client import BitGoClient
 from bitgo.errors import BitGoResourceException
-from bitgo.resource import (BitGoresource,CreateMixin,
-                            ReadMixn,UpdateMixin,ListMixin)
+from bitgo.resource import (BitGoResource,CreateMixin,
+                            ReadMixin,UpdateMixin,ListMixin)
 
 __all__ = ['BitGoKeychains']
 
@@ -13,13 +13,19 @@ class BitGoKeychains(BitGoResource,
                      UpdateMixin,
                      ListMixin):
 
+    __slots__ = ()
+
+    ENDPOINT = {'LIST':('keychain','GET')}
+    LIST_KEY = 'keychains'
 
     def is_valid(self,params):
         pass
 
     @classmethod
-    def list(cls,client,access_token,skip=0,limit=100):
-        super(BitGoKeyChains,cls).list()
+    def list(cls,client,access_token,skip=0,limit=100,deadline=None):
+        return super(BitGoKeychains,cls).list(client,access_token,
+                                              skip=skip,limit=limit,
+                                              deadline=deadline)
 
     def create(self,params):
         pass
@@ -0,0 +1,383 @@
+import bisect
+import threading
+import time
+import weakref
+
+import requests
+
+from bitgo.errors import BitGoClientException
+from bitgo.middleware import Histogram,Middleware
+
+__all__ = ['Metrics','MetricsMiddleware','PrometheusExporter','OTLPExporter']
+
+
+class _ShardOwner(object):
+
+    """ Token kept in a thread's locals, collected when it exits."""
+
+    __slots__ = ('__weakref__',)
+
+
+def _merge_shard(into,shard):
+
+    """ Adds the counters and histograms of shard to the ones of
+        into.Histograms of into are replaced, never updated in place.
+    """
+
+    counters,histograms = into
+    #dict() copies are atomic, so the owning thread can keep recording
+    for key,value in dict(shard[0]).items():
+        counters[key] = counters.get(key,0) + value
+
+    for key,(counts,total,count) in dict(shard[1]).items():
+        counts = list(counts)
+        merged = histograms.get(key,None)
+        if merged is None:
+            histograms[key] = (counts,total,count)
+        else:
+            histograms[key] = ([a + b for a,b in zip(merged[0],counts)],
+                               merged[1] + total,merged[2] + count)
+
+
+class Metrics(object):
+
+    """
+        In-memory counters and latency histograms for BitGo calls.
+
+        Recording never takes a lock: every thread records into its
+        own shard of plain dictionaries, and shards are only merged
+        when the metrics are collected by an exporter.The only lock
+        is taken once per thread, when its shard is created, and once
+        more when the thread exits and its shard is folded into the
+        one of the finished threads, so short lived threads(e.g. of a
+        ThreadPoolExecutor) don't leave their shards behind.
+
+        Passing a Metrics instance to BitGoClient(metrics=...) records:
+
+            bitgo_client_requests_total{action,method,status}
+            bitgo_client_errors_total{action,method,exception}
+            bitgo_client_request_duration_seconds{action,method}
+            bitgo_resource_requests_total{resource,action,outcome}
+            bitgo_resource_request_duration_seconds{resource,action}
+
+        'status' is the http status code('none' if no response was
+        received), 'exception' the BitGoException class name(e.g.
+        'NotFound') and 'outcome' is 'ok' or the exception class name.
+    """
+
+    COUNTER = 'counter'
+    HISTOGRAM = 'histogram'
+
+    DEFINITIONS = {'bitgo_client_requests_total':
+                        (COUNTER,'Requests sent to the BitGo API.'),
+                   'bitgo_client_errors_total':
+                        (COUNTER,'Requests to the BitGo API that raised an exception.'),
+                   'bitgo_client_request_duration_seconds':
+                        (HISTOGRAM,'Latency of requests to the BitGo API.'),
+                   'bitgo_resource_requests_total':
+                        (COUNTER,'BitGoResource.request_resource() calls.'),
+                   'bitgo_resource_request_duration_seconds':
+                        (HISTOGRAM,'Latency of BitGoResource.request_resource() calls.')}
+
+    def __init__(self,buckets=None):
+
+        """
+            @param buckets : Histogram bucket upper bounds in seconds.
+        """
+
+        self.buckets = tuple(sorted(buckets or Histogram.DEFAULT_BUCKETS))
+        self.started = time.time()
+
+        self._local = threading.local()
+        self._shards = []
+        #Counters and histograms of the threads that exited
+        self._finished = ({},{})
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local,'shard',None)
+        if shard is None:
+            shard = ({},{})
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+
+            #The owner is only referenced by the thread's locals, which
+            #are dropped when the thread exits
+            owner = self._local.owner = _ShardOwner()
+            finalizer = weakref.finalize(owner,Metrics._fold,weakref.ref(self),shard)
+            finalizer.atexit = False
+        return shard
+
+    @staticmethod
+    def _fold(metrics_ref,shard):
+
+        """ Merges the shard of a thread that exited into the
+            finished shard and forgets it.
+        """
+
+        metrics = metrics_ref()
+        if metrics is None:
+            return
+
+        with metrics._lock:
+            _merge_shard(metrics._finished,shard)
+            metrics._shards.remove(shard)
+
+    def inc(self,name,labels,value=1):
+
+        """ Adds value to the counter 'name' with the given labels,
+            a tuple of (label,value) pairs.
+        """
+
+        counters = self._shard()[0]
+        key = (name,labels)
+        counters[key] = counters.get(key,0) + value
+
+    def observe(self,name,labels,seconds):
+
+        """ Observes seconds in the histogram 'name' with the given labels."""
+
+        histograms = self._shard()[1]
+        key = (name,labels)
+        histogram = histograms.get(key,None)
+        if histogram is None:
+            histogram = histograms[key] = [[0] * (len(self.buckets) + 1),0.0,0]
+
+        histogram[0][bisect.bisect_left(self.buckets,seconds)] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+    def collect(self):
+
+        """
+            Merges every thread's shard and returns a tuple of two
+            dictionaries keyed by (name,labels):
+                counters = {key:value}
+                histograms = {key:(bucket_counts,sum,count)} with per
+                             bucket(not cumulative) counts, the last one
+                             counting observations above every bound.
+        """
+
+        counters = {}
+        histograms = {}
+        with self._lock:
+            _merge_shard((counters,histograms),self._finished)
+            shards = list(self._shards)
+
+        for shard in shards:
+            _merge_shard((counters,histograms),shard)
+
+        return counters,histograms
+
+    def record_request(self,action,method,status,seconds,exc=None):
+
+        """ Records one request sent by BitGoClient."""
+
+        action = str(action) if action is not None else 'none'
+        method = method.upper()
+
+        self.inc('bitgo_client_requests_total',
+                 (('action',action),('method',method),
+                  ('status',str(status) if status is not None else 'none')))
+        self.observe('bitgo_client_request_duration_seconds',
+                     (('action',action),('method',method)),seconds)
+
+        if exc is not None:
+            self.inc('bitgo_client_errors_total',
+                     (('action',action),('method',method),
+                      ('exception',type(exc).__name__)))
+
+    def record_resource(self,resource,action,seconds,exc=None):
+
+        """ Records one BitGoResource.request_resource() call."""
+
+        outcome = 'ok' if exc is None else type(exc).__name__
+        self.inc('bitgo_resource_requests_total',
+                 (('resource',resource),('action',str(action)),('outcome',outcome)))
+        self.observe('bitgo_resource_request_duration_seconds',
+                     (('resource',resource),('action',str(action))),seconds)
+
+
+class MetricsMiddleware(Middleware):
+
+    """ Middleware recording every request of a BitGoClient into
+        a Metrics instance.BitGoClient(metrics=...) installs one.
+    """
+
+    def __init__(self,metrics):
+        self.metrics = metrics
+
+    def after_receive(self,context):
+        self.metrics.record_request(action=context.action,
+                                    method=context.method,
+                                    status=context.status_code,
+                                    seconds=context.timings['total'])
+
+    def on_error(self,context,exc):
+        self.metrics.record_request(action=context.action,
+                                    method=context.method,
+                                    status=context.status_code,
+                                    seconds=context.timings['total'],
+                                    exc=exc)
+
+
+class PrometheusExporter(object):
+
+    """
+        Renders a Metrics instance in the Prometheus text exposition
+        format(version 0.0.4), to be served from a /metrics endpoint.
+
+        Example:
+            exporter = PrometheusExporter(metrics)
+            body = exporter.render()
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self,metrics):
+        self.metrics = metrics
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\','\\\\').replace('\n','\\n').replace('"','\\"')
+
+    def _labels(self,labels,extra=()):
+        pairs = tuple(labels) + tuple(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join('{k}="{v}"'.format(k=k,v=self._escape(v)) for k,v in pairs) + '}'
+
+    @staticmethod
+    def _number(value):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(float(value)) if isinstance(value,float) else str(value)
+
+    def render(self):
+
+        """ Returns the metrics as Prometheus text."""
+
+        counters,histograms = self.metrics.collect()
+        lines = []
+
+        for name,(kind,description) in sorted(Metrics.DEFINITIONS.items()):
+            source = counters if kind == Metrics.COUNTER else histograms
+            samples = sorted((key[1],value) for key,value in source.items() if key[0] == name)
+            if not samples:
+                continue
+
+            lines.append('# HELP {n} {d}'.format(n=name,d=description))
+            lines.append('# TYPE {n} {k}'.format(n=name,k=kind))
+
+            for labels,value in samples:
+                if kind == Metrics.COUNTER:
+                    lines.append('{n}{l} {v}'.format(n=name,l=self._labels(labels),v=value))
+                    continue
+
+                counts,total,count = value
+                cumulative = 0
+                for bound,bucket_count in zip(self.metrics.buckets + (float('inf'),),counts):
+                    cumulative += bucket_count
+                    lines.append('{n}_bucket{l} {v}'.format(n=name,
+                                                           l=self._labels(labels,(('le',self._number(bound)),)),
+                                                           v=cumulative))
+                lines.append('{n}_sum{l} {v}'.format(n=name,l=self._labels(labels),v=self._number(total)))
+                lines.append('{n}_count{l} {v}'.format(n=name,l=self._labels(labels),v=count))
+
+        return '\n'.join(lines) + '\n'
+
+
+class OTLPExporter(object):
+
+    """
+        Exports a Metrics instance to an OpenTelemetry collector with
+        the OTLP/HTTP json protocol.Counters are exported as cumulative
+        monotonic sums and histograms as cumulative explicit bucket
+        histograms.
+
+        Example:
+            exporter = OTLPExporter(metrics,endpoint='http://localhost:4318/v1/metrics')
+            exporter.export()
+    """
+
+    CUMULATIVE = 2
+
+    def __init__(self,metrics,endpoint='http://localhost:4318/v1/metrics',
+                 service_name='bitgo-client',headers=None,timeout=10):
+
+        """
+            @param endpoint : The collector's OTLP/HTTP metrics url.
+
+            @param service_name : The service.name resource attribute.
+
+            @param headers : Extra http headers, e.g. for authentication.
+
+            @param timeout : Seconds to wait for the collector.
+        """
+
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+
+    @staticmethod
+    def _attributes(labels):
+        return [{'key':k,'value':{'stringValue':str(v)}} for k,v in labels]
+
+    def payload(self):
+
+        """ Returns the OTLP ExportMetricsServiceRequest as a dictionary."""
+
+        counters,histograms = self.metrics.collect()
+        start = str(int(self.metrics.started * 1e9))
+        now = str(int(time.time() * 1e9))
+
+        metrics = []
+        for name,(kind,description) in sorted(Metrics.DEFINITIONS.items()):
+            if kind == Metrics.COUNTER:
+                points = [{'attributes':self._attributes(key[1]),
+                           'startTimeUnixNano':start,
+                           'timeUnixNano':now,
+                           'asInt':str(value)}
+                          for key,value in counters.items() if key[0] == name]
+                if points:
+                    metrics.append({'name':name,'description':description,'unit':'1',
+                                    'sum':{'dataPoints':points,
+                                           'aggregationTemporality':self.CUMULATIVE,
+                                           'isMonotonic':True}})
+            else:
+                points = [{'attributes':self._attributes(key[1]),
+                           'startTimeUnixNano':start,
+                           'timeUnixNano':now,
+                           'count':str(count),
+                           'sum':total,
+                           'bucketCounts':[str(c) for c in counts],
+                           'explicitBounds':list(self.metrics.buckets)}
+                          for key,(counts,total,count) in histograms.items() if key[0] == name]
+                if points:
+                    metrics.append({'name':name,'description':description,'unit':'s',
+                                    'histogram':{'dataPoints':points,
+                                                 'aggregationTemporality':self.CUMULATIVE}})
+
+        return {'resourceMetrics':[{'resource':{'attributes':self._attributes((('service.name',self.service_name),))},
+                                    'scopeMetrics':[{'scope':{'name':'bitgo'},
+                                                     'metrics':metrics}]}]}
+
+    def export(self):
+
+        """ Posts the metrics to the collector, raising a
+            BitGoClientException if the collector rejects them.
+        """
+
+        headers = {'Content-Type':'application/json'}
+        headers.update(self.headers)
+
+        try:
+            response = requests.post(self.endpoint,json=self.payload(),
+                                     headers=headers,timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            raise BitGoClientException('Could not export metrics to the OTLP '\
+                                       'collector:{exc}'.format(exc=exc))
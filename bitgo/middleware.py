@@ -0,0 +1,258 @@
+import bisect
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import HTTPConnection,HTTPSConnection
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool,HTTPSConnectionPool
+
+__all__ = ['RequestContext','Middleware','Histogram','TimingMiddleware',
+           'TimedHTTPAdapter']
+
+#Timings of the request being sent by the current thread, if any.
+_local = threading.local()
+
+
+def track_timings(timings):
+
+    """ Makes the current thread record stage timings into the
+        timings dictionary, or stop recording them when None.
+    """
+
+    _local.timings = timings
+
+
+def current_timings():
+
+    """ Returns the timings dictionary the current thread records
+        into, or None.
+    """
+
+    return getattr(_local,'timings',None)
+
+
+def record_timing(stage,seconds):
+
+    """ Adds seconds to a stage of the request being sent by the
+        current thread, if its timings are being recorded.
+    """
+
+    timings = getattr(_local,'timings',None)
+    if timings is not None:
+        timings[stage] = timings.get(stage,0.0) + seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+
+    """ urllib3 connection recording how long opening the socket
+        (name resolution and tcp connect) took.
+    """
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super(TimedHTTPConnection,self)._new_conn()
+        finally:
+            record_timing('connect',time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+
+    """ urllib3 connection recording the socket opening and the
+        TLS handshake separately.
+    """
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super(TimedHTTPSConnection,self)._new_conn()
+        finally:
+            self._connect_seconds = time.perf_counter() - start
+            record_timing('connect',self._connect_seconds)
+
+    def connect(self):
+        self._connect_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            return super(TimedHTTPSConnection,self).connect()
+        finally:
+            record_timing('tls',time.perf_counter() - start - self._connect_seconds)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+
+    """ HTTPAdapter whose direct(non proxied) connections report
+        their connect and TLS handshake timings to the request
+        being sent by the current thread.
+    """
+
+    def init_poolmanager(self,*args,**kwargs):
+        super(TimedHTTPAdapter,self).init_poolmanager(*args,**kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http':TimedHTTPConnectionPool,
+                                                   'https':TimedHTTPSConnectionPool}
+
+
+class RequestContext(object):
+
+    """
+        State of one BitGoClient request handed to every middleware.
+
+        timings holds the seconds spent in each stage of the request:
+            'connect' = name resolution and tcp connect, only when a
+                        new connection had to be opened
+            'tls' = TLS handshake of a new https connection
+            'server' = from the request being sent until the response
+                       headers arrived(server time plus network latency)
+            'transfer' = downloading the response body
+            'parse' = decoding the response json
+            'total' = the whole request, including retries
+    """
+
+    __slots__ = ('method','url','action','params','started','timings',
+                 'status_code','error','extra')
+
+    def __init__(self,method,url,action=None,params=None):
+        self.method = method.lower()
+        self.url = url
+        self.action = action
+        self.params = params
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.status_code = None
+        self.error = None
+        #Free form storage for middlewares
+        self.extra = {}
+
+
+class Middleware(object):
+
+    """
+        Base class for BitGoClient middlewares.A client calls the hooks
+        of its middlewares, in order, for every request:
+
+            before_send(context) : right before the request is sent.
+
+            after_receive(context) : once the response was received and
+                                     decoded, with context.status_code
+                                     and context.timings filled in.
+
+            on_error(context,exc) : when the request fails with the
+                                    BitGoException exc, right before
+                                    it is raised.
+    """
+
+    def before_send(self,context):
+        pass
+
+    def after_receive(self,context):
+        pass
+
+    def on_error(self,context,exc):
+        pass
+
+
+class Histogram(object):
+
+    """ Thread safe histogram counting observations into fixed,
+        cumulative upper bound buckets(in seconds by default).
+    """
+
+    DEFAULT_BUCKETS = (0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0)
+
+    def __init__(self,buckets=None):
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self,value):
+        index = bisect.bisect_left(self.buckets,value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+
+        """ Returns the count, sum and the cumulative count of every
+            bucket upper bound, with float('inf') as the last bound.
+        """
+
+        with self._lock:
+            counts = list(self._counts)
+            total,count = self._sum,self._count
+
+        cumulative = []
+        running = 0
+        for bound,bucket_count in zip(self.buckets + (float('inf'),),counts):
+            running += bucket_count
+            cumulative.append((bound,running))
+
+        return {'count':count,'sum':total,'buckets':cumulative}
+
+
+class TimingMiddleware(Middleware):
+
+    """
+        Middleware observing the stage timings of every request into
+        in-memory histograms, per resource action and stage.Requests
+        sent without an action are recorded under the action None.
+
+        Example:
+            timing = TimingMiddleware(callback=lambda ctx: log(ctx.timings))
+            client = BitGoClient(middlewares=[timing])
+            ...
+            timing.snapshot()[('READ','server')]['count']
+    """
+
+    def __init__(self,callback=None,buckets=None):
+
+        """
+            @param callback : Optional callable called with the
+                              RequestContext of every finished request,
+                              whether it succeeded or failed.
+
+            @param buckets : Histogram bucket upper bounds in seconds.
+        """
+
+        self.callback = callback
+        self.buckets = buckets
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self,action,stage):
+        key = (action,stage)
+        histogram = self.histograms.get(key,None)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key,Histogram(buckets=self.buckets))
+        return histogram
+
+    def _observe(self,context):
+        for stage,seconds in context.timings.items():
+            self.histogram(context.action,stage).observe(seconds)
+
+        if self.callback is not None:
+            self.callback(context)
+
+    def after_receive(self,context):
+        self._observe(context)
+
+    def on_error(self,context,exc):
+        self._observe(context)
+
+    def snapshot(self):
+
+        """ Returns every histogram snapshot keyed by (action,stage)."""
+
+        return {key:histogram.snapshot()
+                for key,histogram in list(self.histograms.items())}
@@ -1,12 +1,17 @@
 from bitgo.client import BitGoClient
 from bitgo.errors import BitGoResourceException
 from bitgo.resource import (BitGoResource,CRUDMixin,ListMixin)
+from bitgo.signing import TransactionSigner
+from bitgo.wallet.coinselection import CoinSelector
+from bitgo.wallet.transaction import sign_selection
 
 
 __all__ = ['BitGoPendingApprovals']
 
 class BitGoPendingApprovals(BitGoResource,CRUDMixin,ListMixin):
 
+    __slots__ = ()
+
     def id(self):
         pass
 
@@ -40,8 +45,42 @@ class BitGoPendingApprovals(BitGoResource,CRUDMixin,ListMixin):
     def populate_wallet(self):
         pass
 
-    def recreate_and_sign_transaction(self,params):
-        pass
+    def recreate_and_sign_transaction(self,index,keys,signer=None,selector=None,
+                                      change_address=None):
+
+        """
+            Builds again the transaction of a pending transaction
+            request, out of the wallet's current unspents, and returns it
+            signed with the user keys, ready to approve.The unspents it
+            spends are left in the index.
+
+            @param index : The wallet's UnspentIndex, keeping the details
+                           of the unspents.
+
+            @param keys : The user key, or a callable returning the key
+                          of an Unspent, see sign_selection().
+
+            @param signer : TransactionSigner signing the inputs.Defaults
+                            to one closed once the transaction is signed.
+
+            @param selector : CoinSelector picking the unspents spent.
+
+            @param change_address : Address the change is sent to.
+        """
+
+        try:
+            recipients = self['info']['transactionRequest']['recipients']
+        except (AttributeError,KeyError,TypeError):
+            raise BitGoResourceException('The pending approval is not a transaction request')
+
+        selector = selector or CoinSelector()
+        amount = sum(recipient['amount'] for recipient in recipients)
+        selection = selector.select(index,amount,outputs=len(recipients))
+
+        if signer is not None:
+            return sign_selection(signer,selection,recipients,keys,change_address)
+        with TransactionSigner() as signer:
+            return sign_selection(signer,selection,recipients,keys,change_address)
 
     def construct_approval_tx(self,params):
         pass
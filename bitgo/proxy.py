@@ -0,0 +1,334 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+from bitgo.errors import BitGoClientException,ProxyUnavailable
+
+__all__ = ['ProxyPool']
+
+
+class ProxyState(object):
+
+    """ Health of one proxy in a ProxyPool."""
+
+    __slots__ = ('proxy','name','url','proxies','latency','failures','opened_at',
+                 'probing','probed_at','requests','errors')
+
+    def __init__(self,proxy,url):
+        self.proxy = proxy
+        #ip:port, leaving out any credentials
+        self.name = '{ip}:{port}'.format(ip=proxy['ip'],port=proxy['port'])
+        self.url = url
+        #Proxies dict in the format requests expects
+        self.proxies = {'http':url,'https':url}
+        #Exponentially weighted moving average of response times
+        self.latency = None
+        #Consecutive failures
+        self.failures = 0
+        #When the circuit was opened, None while it is closed
+        self.opened_at = None
+        #Whether a half open probe request is on its way, and since when
+        self.probing = False
+        self.probed_at = None
+        self.requests = 0
+        self.errors = 0
+
+
+class ProxyPool(object):
+
+    """
+        Spreads requests over several proxies, keeping track of the
+        health of each one.
+
+        A proxy failing failure_threshold requests in a row, with a
+        proxy error or a timeout, has its circuit opened: it does not
+        get any request for cooldown seconds.After that, a single
+        probe request is let through, and its outcome closes the
+        circuit again or keeps it open for another cooldown.A probe
+        ending any other way(e.g. an SSL error or a cancelled call),
+        or whose outcome is not recorded within cooldown seconds, lets
+        the next request probe instead.
+
+        New access tokens get a proxy picked by the pool's strategy:
+            'round_robin' = every available proxy in turn
+            'least_latency' = the available proxy with the lowest
+                              average response time, untried proxies
+                              first
+
+        Since BitGo binds access tokens to one ip, a token is pinned to
+        the proxy picked for its first request, so the requests it sends
+        at the same time all go through the same ip.The pin is kept once
+        a request through the proxy got a 2xx response, and dropped if
+        the first response was an error(e.g. a 401 of a token bound to
+        another ip) or the proxy failed.Requests for a token whose kept
+        proxy is down raise ProxyUnavailable instead of being routed
+        through another ip.The max_pins most recently used tokens are
+        remembered.
+
+        Example:
+            pool = ProxyPool([{'ip':'10.0.0.1','port':3128},
+                              {'ip':'10.0.0.2','port':3128}],
+                             strategy='least_latency')
+            client = BitGoClient(proxy_pool=pool)
+    """
+
+    ROUND_ROBIN = 'round_robin'
+    LEAST_LATENCY = 'least_latency'
+    STRATEGIES = (ROUND_ROBIN,LEAST_LATENCY)
+
+    #requests exceptions counting as a failure of the proxy
+    FAILURE_EXCEPTIONS = (requests.exceptions.ProxyError,
+                          requests.exceptions.Timeout)
+
+    def __init__(self,proxies,strategy=ROUND_ROBIN,failure_threshold=3,
+                 cooldown=30.0,latency_decay=0.3,max_pins=10000):
+
+        """
+            @param proxies : List of proxy dicts, each one with 'ip' and
+                             'port' keys and optional 'username' and
+                             'password' keys, like BitGoClient's proxy.
+
+            @param strategy : 'round_robin' or 'least_latency'.
+
+            @param failure_threshold : Consecutive failures opening the
+                                       circuit of a proxy.
+
+            @param cooldown : Seconds an open circuit waits before a
+                              probe request is let through.
+
+            @param latency_decay : Weight of the newest response time in
+                                   the average latency of a proxy.
+
+            @param max_pins : Number of access tokens whose proxy is
+                              remembered, least recently used first out.
+        """
+
+        if not proxies:
+            raise BitGoClientException('ProxyPool requires at least one proxy')
+
+        if strategy not in self.STRATEGIES:
+            raise BitGoClientException('Invalid proxy strategy:{s}.Valid strategies '\
+                                       'are {names}'.format(s=strategy,names=', '.join(self.STRATEGIES)))
+
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_decay = latency_decay
+        self.max_pins = max_pins
+
+        self._states = [ProxyState(proxy=proxy,url=self.build_url(proxy)) for proxy in proxies]
+        #token:(ProxyState,kept) where kept is False until a 2xx response
+        self._pins = OrderedDict()
+        self._cycle = itertools.cycle(range(len(self._states)))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_url(proxy):
+
+        """ Returns the proxy url of a proxy dict."""
+
+        if not isinstance(proxy,dict) or 'ip' not in proxy or 'port' not in proxy:
+            raise BitGoClientException('Missing ip or port key in proxy dict')
+
+        if 'username' in proxy and 'password' in proxy:
+            return 'http://{username}:{password}@{ip}:{port}'.format(**proxy)
+        return 'http://{ip}:{port}'.format(ip=proxy['ip'],port=proxy['port'])
+
+    def _can_take(self,state,now):
+
+        """ Returns whether state can take a request."""
+
+        if state.opened_at is None:
+            return True
+
+        if now - state.opened_at < self.cooldown:
+            return False
+
+        #A probe whose outcome never came is given up after a cooldown
+        return not state.probing or now - state.probed_at >= self.cooldown
+
+    def _available(self,state,now):
+
+        """ Returns whether state can take a request, turning an open
+            circuit whose cooldown is over into a half open one.
+        """
+
+        if not self._can_take(state,now):
+            return False
+
+        if state.opened_at is not None:
+            state.probing = True
+            state.probed_at = now
+        return True
+
+    def _pick(self,now):
+        if self.strategy == self.ROUND_ROBIN:
+            for _ in range(len(self._states)):
+                state = self._states[next(self._cycle)]
+                if self._available(state,now):
+                    return state
+            return None
+
+        candidates = [state for state in self._states if self._can_take(state,now)]
+        if not candidates:
+            return None
+
+        state = min(candidates,key=lambda s: -1.0 if s.latency is None else s.latency)
+        self._available(state,now)
+        return state
+
+    def select(self,token=None):
+
+        """ Returns the ProxyState the next request for token should
+            be sent through, raising ProxyUnavailable when there is none.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            pin = self._pins.get(token,None) if token else None
+            if pin is not None:
+                state,kept = pin
+                self._pins.move_to_end(token)
+                if self._available(state,now):
+                    return state
+                if kept:
+                    raise ProxyUnavailable('The proxy {name} the access token is pinned to '\
+                                           'is down'.format(name=state.name))
+
+            state = self._pick(now)
+            if state is not None and token:
+                self._pin(token,state,kept=False)
+
+        if state is None:
+            raise ProxyUnavailable('Every proxy in the pool is down')
+        return state
+
+    def _pin(self,token,state,kept):
+        self._pins[token] = (state,kept)
+        self._pins.move_to_end(token)
+        while len(self._pins) > self.max_pins:
+            self._pins.popitem(last=False)
+
+    def _unpin_unkept(self,token,state):
+
+        """ Drops the pin of token to state unless it was kept."""
+
+        if token and self._pins.get(token,None) == (state,False):
+            del self._pins[token]
+
+    def pin(self,token,proxy):
+
+        """ Pins token to one of the pool's proxy dicts, e.g. the one
+            the token was created from.
+        """
+
+        for state in self._states:
+            if state.proxy == proxy:
+                with self._lock:
+                    self._pin(token,state,kept=True)
+                return
+
+        raise BitGoClientException('The proxy is not part of the pool')
+
+    def unpin(self,token):
+        with self._lock:
+            self._pins.pop(token,None)
+
+    def record_success(self,state,seconds,token=None,status=200):
+
+        """ Records a response received through state in seconds.
+            token is kept pinned to state if the response's http
+            status code is a 2xx.
+        """
+
+        with self._lock:
+            state.requests += 1
+            state.failures = 0
+            state.opened_at = None
+            state.probing = False
+            if state.latency is None:
+                state.latency = seconds
+            else:
+                state.latency += self.latency_decay * (seconds - state.latency)
+
+            if not token:
+                return
+            if 200 <= status < 300:
+                pin = self._pins.get(token,None)
+                if pin is None or not pin[1]:
+                    self._pin(token,state,kept=True)
+            else:
+                self._unpin_unkept(token,state)
+
+    def record_failure(self,state,token=None):
+
+        """ Records a proxy error or timeout of a request sent
+            through state, opening its circuit when needed.
+        """
+
+        with self._lock:
+            self._unpin_unkept(token,state)
+            state.requests += 1
+            state.errors += 1
+            state.failures += 1
+            if state.probing or state.failures >= self.failure_threshold:
+                state.opened_at = time.monotonic()
+            state.probing = False
+
+    def release(self,state):
+
+        """ Records a request sent through state that ended without
+            telling whether the proxy works, e.g. with an SSL error or
+            a cancelled call, so another request can probe it.
+        """
+
+        with self._lock:
+            state.probing = False
+
+    def is_failure(self,exc):
+        return isinstance(exc,self.FAILURE_EXCEPTIONS)
+
+    def check_health(self,url,timeout=5.0):
+
+        """ Sends a GET request to url through every proxy, recording
+            the outcomes, and returns whether each proxy is up keyed
+            by 'ip:port'.
+        """
+
+        health = {}
+        for state in self._states:
+            start = time.perf_counter()
+            try:
+                requests.get(url,proxies=state.proxies,timeout=timeout).close()
+            except requests.exceptions.RequestException:
+                self.record_failure(state)
+                health[state.name] = False
+            else:
+                self.record_success(state,time.perf_counter() - start)
+                health[state.name] = True
+        return health
+
+    def stats(self):
+
+        """ Returns the health of every proxy keyed by 'ip:port':
+                'up' = whether its circuit is closed
+                'latency' = its average response time in seconds
+                'requests' = requests sent through it
+                'errors' = proxy errors and timeouts
+                'tokens' = access tokens pinned to it
+        """
+
+        with self._lock:
+            pinned = {}
+            for state,_ in self._pins.values():
+                pinned[state.name] = pinned.get(state.name,0) + 1
+
+            return {state.name:{'up':state.opened_at is None,
+                               'latency':state.latency,
+                               'requests':state.requests,
+                               'errors':state.errors,
+                               'tokens':pinned.get(state.name,0)}
+                    for state in self._states}
@@ -0,0 +1,188 @@
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from bitgo.errors import BitGoClientException
+
+__all__ = ['TokenBucket','FileTokenBucket','RateLimiter']
+
+
+class TokenBucket(object):
+
+    """ Thread safe token bucket refilling 'rate' tokens per second
+        up to 'capacity' tokens.
+
+        Tokens are handed out by reservation: reserve() always takes
+        the tokens, letting the balance go negative, and returns how
+        long the caller has to wait before its reservation is due.
+        Concurrent callers are therefore queued at exactly 'rate'
+        requests per second instead of all waking up at once, and
+        async callers can wait with asyncio.sleep() instead of
+        blocking the event loop.
+    """
+
+    def __init__(self,rate,capacity=None):
+
+        """
+            @param rate : Tokens added per second.
+
+            @param capacity : Maximum tokens the bucket holds, which is
+                              the largest burst allowed.Defaults to rate.
+        """
+
+        if rate <= 0:
+            raise BitGoClientException('Token bucket rate must be greater than 0')
+
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self,tokens,updated,now):
+        return min(self.capacity,tokens + (now - updated) * self.rate)
+
+    def reserve(self,tokens=1):
+
+        """ Takes 'tokens' out of the bucket and returns the seconds
+            to wait until they are actually available.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            #Refunds(negative tokens) can't fill it past capacity either
+            self._tokens = min(self.capacity,self._refill(self._tokens,self._updated,now) - tokens)
+            self._updated = now
+            balance = self._tokens
+
+        return 0.0 if balance >= 0 else -balance / self.rate
+
+    def refund(self,tokens=1):
+
+        """ Puts back 'tokens' reserved for a request that won't be
+            sent after all.
+        """
+
+        self.reserve(tokens=-tokens)
+
+    def acquire(self,tokens=1):
+
+        """ Blocks until 'tokens' are available."""
+
+        delay = self.reserve(tokens=tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FileTokenBucket(TokenBucket):
+
+    """ Token bucket whose state lives in a small file guarded by an
+        exclusive flock, so several worker processes on one host share
+        the same quota.Every process needs to use the same path, rate
+        and capacity.Only available on platforms providing fcntl.
+    """
+
+    STATE = struct.Struct('<dd')
+
+    def __init__(self,path,rate,capacity=None):
+
+        """
+            @param path : File holding the shared bucket state.It is
+                          created with a full bucket if missing.
+        """
+
+        if fcntl is None:
+            raise BitGoClientException('FileTokenBucket requires fcntl, which '\
+                                       'is not available on this platform')
+
+        super(FileTokenBucket,self).__init__(rate=rate,capacity=capacity)
+        self.path = path
+
+    def reserve(self,tokens=1):
+
+        fd = os.open(self.path,os.O_RDWR | os.O_CREAT,0o600)
+        try:
+            fcntl.flock(fd,fcntl.LOCK_EX)
+            #Wall clock time is used since monotonic clocks
+            #are not comparable across processes.
+            now = time.time()
+
+            data = os.pread(fd,self.STATE.size,0)
+            if len(data) == self.STATE.size:
+                balance,updated = self.STATE.unpack(data)
+                balance = self._refill(balance,updated,now)
+            else:
+                balance = self.capacity
+
+            balance = min(self.capacity,balance - tokens)
+            os.pwrite(fd,self.STATE.pack(balance,now),0)
+        finally:
+            os.close(fd)
+
+        return 0.0 if balance >= 0 else -balance / self.rate
+
+
+class RateLimiter(object):
+
+    """ Holds the token buckets a BitGoClient draws from before sending
+        each request.Buckets are picked per endpoint family, that is
+        the resource action(the ENDPOINT key, e.g. 'LIST' or 'READ')
+        passed along by BitGoResource.request_resource().Requests with
+        no action, or an action without its own bucket, draw from the
+        default bucket.
+
+        Example:
+            limiter = RateLimiter(default=TokenBucket(rate=10,capacity=20),
+                                  buckets={'LIST':TokenBucket(rate=2)})
+            client = BitGoClient(rate_limiter=limiter)
+    """
+
+    def __init__(self,default=None,buckets=None):
+
+        """
+            @param default : Bucket used for any request without a
+                             bucket of its own.None leaves them unlimited.
+
+            @param buckets : A dictionary mapping resource actions to
+                             their own bucket.
+        """
+
+        self.default = default
+        self.buckets = dict(buckets or {})
+
+    def get_bucket(self,action=None):
+        return self.buckets.get(action,self.default)
+
+    def reserve(self,action=None,tokens=1):
+
+        """ Reserves tokens from the action's bucket and returns the
+            seconds to wait before sending the request.
+        """
+
+        bucket = self.get_bucket(action=action)
+        if bucket is None:
+            return 0.0
+        return bucket.reserve(tokens=tokens)
+
+    def refund(self,action=None,tokens=1):
+
+        """ Puts back tokens reserved from the action's bucket."""
+
+        bucket = self.get_bucket(action=action)
+        if bucket is not None:
+            bucket.refund(tokens=tokens)
+
+    def acquire(self,action=None,tokens=1):
+
+        """ Blocks until the action's bucket allows another request."""
+
+        delay = self.reserve(action=action,tokens=tokens)
+        if delay > 0:
+            time.sleep(delay)
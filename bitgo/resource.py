@@ -1,9 +1,13 @@
-import json
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from bitgo.client import BitGoClient
-from bitgo.errors import (InvalidAccessToken,InvalidClient,
-                          BitGoResourceException,InvalidResourceEndpoint,
-                          InvalidResourceEndpointUrl,InvalidResourceMethod)
+from bitgo.deadline import Deadline
+from bitgo.endpoint import compile_endpoints
+from bitgo.errors import (BitGoException,InvalidAccessToken,InvalidClient,
+                          BitGoResourceException,InvalidResourceEndpoint)
+from bitgo.token import BitGoAccessToken
 
 __all__ = ['BitGoResource','CreateMixin','ReadMixin',
            'ListMixin','UpdateMixin','DeleteMixin',
@@ -66,10 +70,24 @@ class BitGoResource(object):
         Correct:wallet
         Incorrect:/api/v1/wallet
 
+
+        Instances are slotted and keep a reference to the decoded json
+        they were built from, without copying it.Properties are looked
+        up straight in that json.Keys listed in SUBRESOURCES are turned
+        into resources of the mapped class on first access only, for a
+        dict value or for every dict of a list value, and then reused.
+
+        Example:
+            SUBRESOURCES = {'outputs':BitGoResource,
+                            'entries':BitGoResource}
+
     """
+    __slots__ = ('_client','_access_token','_properties','_children')
+
     ENDPOINT = None
+    SUBRESOURCES = {}
 
-    def __init__(self,client,access_token,properties={}):
+    def __init__(self,client,access_token,properties=None):
 
         """
             Validates requirements and sets internal properties
@@ -81,36 +99,78 @@ class BitGoResource(object):
                                 a string or a BitGoAccessToken instance.
 
             @param properties : A dictionary representing the internal
-                                properties for a BitGoResource.These
-                                properties will be set to the current
-                                instance via calling setattr().
+                                properties for a BitGoResource.The
+                                dictionary is referenced, not copied,
+                                so it should not be modified afterwards.
 
         """
         #validate client and access_token
         self.validate_requirements(client=client,access_token=access_token)
 
-        #sets the internal properties directly by adding to the internal
-        #attritube dict to avoid triggering setattr
         self._client = client
         self._access_token = access_token
-
-        self._properties = {}
-
-        for key in properties:
-            self._properties[key] = properties[key]
+        self._properties = {} if properties is None else properties
+        self._children = None
 
     def __getitem__(self,k):
         try:
             return self._properties[k]
         except KeyError:
-            raise AttributeError
+            raise AttributeError(k)
 
     def __getattr__(self,k):
 
+        #Only called once regular attribute lookup failed.Private
+        #and dunder names are never properties, which also avoids
+        #recursing while the slots are not set yet(e.g. unpickling).
+        if k.startswith('_'):
+            raise AttributeError(k)
+
+        children = self._children
+        if children is not None and k in children:
+            return children[k]
+
         try:
-            return getattr(self,k)
-        except AttributeError:
-            return self._properties[k]
+            value = self._properties[k]
+        except KeyError:
+            raise AttributeError("'{name}' resource has no property '{k}'".format(name=type(self).__name__,
+                                                                                 k=k))
+
+        klazz = self.SUBRESOURCES.get(k,None)
+        if klazz is None:
+            return value
+
+        child = self._build_subresource(klazz,value)
+        if children is None:
+            self._children = children = {}
+        children[k] = child
+        return child
+
+    def __contains__(self,k):
+        return k in self._properties
+
+    def _build_subresource(self,klazz,value):
+
+        """
+            Builds the klazz resource(s) out of a nested json value,
+            sharing this resource's client and access token.
+
+        """
+
+        if isinstance(value,dict):
+            return klazz(self._client,self._access_token,value)
+        elif isinstance(value,list):
+            return [klazz(self._client,self._access_token,item)
+                    if isinstance(item,dict) else item
+                    for item in value]
+        return value
+
+    @property
+    def properties(self):
+
+        """ The decoded json this resource was built from."""
+
+        return self._properties
 
     @classmethod
     def validate_access_token(cls,access_token):
@@ -159,7 +219,7 @@ class BitGoResource(object):
     def client(self,value):
         #Raise an InvalidClient if value isn't an
         #instance of BitGoClient or a subclass.
-        self._validate_client(client=client)
+        self.validate_client(client=value)
         self._client = value
 
     @property
@@ -170,64 +230,67 @@ class BitGoResource(object):
     def access_token(self,value):
         #Raise an InvalidAccessToken if value
         #isn't a valid access token that we can use
-        self._validate_access_token(access_token=access_token)
+        self.validate_access_token(access_token=value)
         self._access_token = value
 
+    def __init_subclass__(cls,**kwargs):
+
+        """
+            Compiles the ENDPOINT of every subclass once, at class
+            creation, so requests never have to validate or parse
+            the endpoint urls again.
+
+        """
+
+        super().__init_subclass__(**kwargs)
+
+        if isinstance(cls.__dict__.get('ENDPOINT',None),dict):
+            cls._compile_endpoints()
+
     @classmethod
-    def endpoint(cls,action,*args):
+    def _compile_endpoints(cls):
+        cls._endpoint_templates = compile_endpoints(cls.ENDPOINT)
+        cls._endpoint_source = cls.ENDPOINT
+        return cls._endpoint_templates
 
-        """ Returns the endpoint url to BitGo's API for the current
-            resource class.All subclasses should specify a ENDPOINT
-            representing the endpoint.
+    @classmethod
+    def get_endpoint_template(cls,action):
 
-            @param *args:Args will be used for mapping to the ENDPOINT's url.
-                         map_to_url() will replace args for any possible mutable
-                         fragment.
         """
+            Returns the compiled EndpointTemplate of a resource action.
+            The templates are compiled again only if ENDPOINT was
+            replaced after the class was created.
 
-        def map_to_url(endpoint,*args):
+        """
 
-            """
-                Map additional arguments, to the resource's ENDPOINT.
-                The ENDPOINT will be split by '/' into individual
-                components. Every component will then be checked
-                to see if it contains a colon":".If found, then the
-                first item in args will be replaced with that component.
-                Thus, giving a simple mechanism to map additional url
-                fragments to the ENDPOINT.
+        templates = cls.__dict__.get('_endpoint_templates',None)
+        if templates is None or cls.__dict__.get('_endpoint_source',None) is not cls.ENDPOINT:
+            cls.check_endpoint_exists()
+            templates = cls._compile_endpoints()
 
-                Note:Currently, if the number of args does not match
-                the number of possible mappings, then an InvalidEndpoint
-                will be raised.
-            """
+        template = templates.get(action,None)
+        if template is None:
+            raise InvalidResourceEndpoint('Cannot find resource method'\
+                                        ' for resource action:{a}'.format(a=action))
+        return template
 
-            fragments = endpoint.split('/')
-            mutable_fragments = [f for f in fragments if f.startswith(':')]
-            if len(args) != len(mutable_fragments):
-                #Todo:Allow for args to contain more than the required arguments,
-                #instead of raising an InvalidEndpoint exception.
+    @classmethod
+    def endpoint(cls,action,*args,query=None,**named):
 
-                raise InvalidResourceEndpointUrl('Args does not match exact mutable ' \
-                                                 'fragments.' \
-                                                'ENDPOINT could not be mapped')
+        """ Returns the endpoint url to BitGo's API for the current
+            resource class.All subclasses should specify a ENDPOINT
+            representing the endpoint.
 
-            args_list = list(args)
+            @param *args:Args will be used for mapping to the ENDPOINT's url,
+                         replacing every ':' url fragment in order.
 
-            has_mappings = lambda f,keys :keys.pop(0) if f.startswith(':') else f
-            #Loop through all the url fragments and check to see if fragment starts with
-            # a colon(:), if it does then replace the fragment by popping the first
-            # key on the args_list.
-            mapped_endpoint = "".join(['/{}'.format(has_mappings(f,args_list))
-                                       for f in fragments])
+            @param query : Optional dictionary appended as the query string.
 
-            if mapped_endpoint.startswith('//'):
-                return mapped_endpoint[1:len(mapped_endpoint)]
-            else:
-                return mapped_endpoint
+            @param **named : Values for ':' url fragments by name, for
+                             the fragments not filled by *args.
+        """
 
-        cls.check_endpoint_exists()
-        endpoint,_ = cls.get_action_endpoint(action=action)
-        return map_to_url(endpoint,*args)
+        return cls.get_endpoint_template(action).build(*args,query=query,**named)
 
     @classmethod
     def check_endpoint_exists(cls):
@@ -259,28 +322,36 @@ class BitGoResource(object):
             with a resource action.This tuple contains
             a url endpoint to the resource, and the http(s)
             method to use for requesting the resource.
-            for the requested resource action.It verifies
-            that a valid http(s) method is passed, and
-            that the endpoint is a str type and nothing else.
+            for the requested resource action.The entry
+            is validated when the ENDPOINT is compiled.
 
         """
 
-        endpoint,method = cls.ENDPOINT.get(action,None)
-        if endpoint is None:
-            raise InvalidResourceEndpoint('Cannot find resource method'\
-                                        ' for resource action:{a}'.format(a=action))
-        if not isinstance(endpoint,str):
-            raise InvalidResourceEndpointUrl('Invalid resource endpoint url for'\
-                                          ' resource action:{a}'.format(a=action))
+        template = cls.get_endpoint_template(action)
+        return template.url,template.method
 
-        if method.upper() not in ['POST','GET','DELETE','PUT']:
-            raise InvalidResourceMethod('HTTP method is invalid'\
-                                        ' for resource action:{a}'.format(a=action))
+    @classmethod
+    def _map_request(cls,action,args,kwargs):
 
-        return endpoint,method
+        """
+            Returns the http method and the mapped url of a resource
+            action.Url fragments not given through args are taken by
+            name out of the request data in kwargs.
+
+        """
+
+        template = cls.get_endpoint_template(action)
+
+        named = {}
+        for name in template.names[len(args):]:
+            if name in kwargs:
+                named[name] = kwargs.pop(name)
+
+        return template.method,template.build(*args,**named)
 
     @classmethod
-    def request_resource(cls,action,client,access_token,return_json=False,*args,**kwargs):
+    def request_resource(cls,action,client,access_token,return_json=False,*args,
+                         deadline=None,**kwargs):
 
         """
             Main method for requesting BitGo resources.This method
@@ -304,32 +375,109 @@ class BitGoResource(object):
             @param access_token : An access token can be a str representing
                                   an access token or a BitGoAccessToken instance.
 
-            @param return_json : If True, then it will use the json response
+            @param return_json : If True, the decoded json response is returned
+                                 as is.Otherwise, it will use the json response
                                  data to create a new BitGoResource instance by
                                  calling from_json() method and passing the json
                                  data as an argument.
 
 
-            @param *args: Extra arguments will mapped to the ENDPOINT by calling
-                          map_to_url() inside the class method endpoint().
+            @param *args: Extra arguments will be mapped to the ENDPOINT's url
+                          fragments by its compiled EndpointTemplate.
 
             @param **kwargs: Anything passed to kwargs
-                             will be used as request data.
+                             will be used as request data, except for
+                             values named after a ':' url fragment that
+                             was not filled by *args.
+
+            @param deadline : Optional seconds(or a Deadline) the call
+                              needs to finish in, see BitGoClient.request().
+                              Keyword only, so it is never sent as data.
 
         """
 
-        _, method =cls.get_action_endpoint(action=action)
-        endpoint_mapped = cls.endpoint(action=action,*args)
+        metrics = getattr(client,'metrics',None)
+        if metrics is None:
+            return cls._request_resource(action,client,access_token,return_json,
+                                         args,kwargs,deadline)
+
+        start = time.perf_counter()
+        try:
+            resource = cls._request_resource(action,client,access_token,return_json,
+                                             args,kwargs,deadline)
+        except BitGoException as exc:
+            metrics.record_resource(cls.__name__,action,time.perf_counter() - start,exc=exc)
+            raise
+
+        metrics.record_resource(cls.__name__,action,time.perf_counter() - start)
+        return resource
+
+    @classmethod
+    def _request_resource(cls,action,client,access_token,return_json,args,kwargs,
+                          deadline=None):
+
+        method,endpoint_mapped = cls._map_request(action,args,kwargs)
 
         response = client.request(url=endpoint_mapped,
                                     method=method,
                                     params=kwargs,
-                                    access_token=access_token)
+                                    access_token=access_token,
+                                    action=action,
+                                    deadline=deadline)
+
+        if return_json:
+            return response
+
+        return cls.from_json(client=client,
+                             access_token=access_token,
+                             json_data=response)
+
+    @classmethod
+    async def async_request_resource(cls,action,client,access_token,return_json=False,*args,
+                                     deadline=None,**kwargs):
+
+        """
+            Coroutine version of request_resource() taking the same
+            parameters.The client needs to be an AsyncBitGoClient
+            instance so the request can be awaited.
+
+        """
+
+        metrics = getattr(client,'metrics',None)
+        if metrics is None:
+            return await cls._async_request_resource(action,client,access_token,
+                                                     return_json,args,kwargs,deadline)
+
+        start = time.perf_counter()
+        try:
+            resource = await cls._async_request_resource(action,client,access_token,
+                                                         return_json,args,kwargs,deadline)
+        except BitGoException as exc:
+            metrics.record_resource(cls.__name__,action,time.perf_counter() - start,exc=exc)
+            raise
+
+        metrics.record_resource(cls.__name__,action,time.perf_counter() - start)
+        return resource
+
+    @classmethod
+    async def _async_request_resource(cls,action,client,access_token,return_json,args,kwargs,
+                                      deadline=None):
+
+        method,endpoint_mapped = cls._map_request(action,args,kwargs)
+
+        response = await client.request(url=endpoint_mapped,
+                                        method=method,
+                                        params=kwargs,
+                                        access_token=access_token,
+                                        action=action,
+                                        deadline=deadline)
+
+        if return_json:
+            return response
 
         return cls.from_json(client=client,
                              access_token=access_token,
-                             json_data=response,
-                             action=action)
+                             json_data=response)
 
     @classmethod
     def from_json(cls,client,access_token,json_data,klazz_resource=None):
@@ -346,10 +494,10 @@ class BitGoResource(object):
             @param access_token : This can be a token represented in
                                 a string or a BitGoAccessToken instance.
 
-            @param json_data :  A str or dict that will be the internal
+            @param json_data :  A str, bytes or dict that will be the internal
                                 properties for the new resource built.
-                                These properties. If it is a str then
-                                it needs to be a proper json string.
+                                These properties. If it is a str or bytes
+                                then it needs to be a proper json document.
 
             @param klazz_resource : A compliant BitGoResource class or
                                     subclass for constructing an instance.
@@ -358,18 +506,22 @@ class BitGoResource(object):
                                     for constructing an instance.
 
         """
-        if isinstance(json_data,str):
+        if isinstance(json_data,(str,bytes)):
+            #Decode with the client's codec, avoiding a bytes to
+            #str round trip for bytes input.
+            cls.validate_client(client=client)
             try:
-                json_data = json.loads(json_data)
+                json_data = client.codec.loads(json_data)
             except ValueError:
                 raise BitGoResourceException('Could not load json_data into json. ' \
                                             'Failed creating BitGoResource from json.')
-        elif isinstance(json_data,dict):
+
+        if isinstance(json_data,dict):
             #If a class was passed to klazz_resource then use it
             if klazz_resource:
-                #However,lets first check that it is a valid BitGoResource instance
-                #or a subclassing instance
-                if not isinstance(klazz_resource,BitGoResource):
+                #However,lets first check that it is a valid BitGoResource class
+                #or a subclass
+                if not (isinstance(klazz_resource,type) and issubclass(klazz_resource,BitGoResource)):
                     raise BitGoResourceException('klazz_resource is not a valid instance '\
                                                  'of BitGoResource or a subclass of it')
 
@@ -391,16 +543,23 @@ class CreateMixin(object):
         A generic mixin used for creating a new BitGoResource.
     """
 
+    __slots__ = ()
+
     @classmethod
-    def create(cls,client,access_token,*args,**kwargs):
+    def create(cls,client,access_token,*args,deadline=None,**kwargs):
 
         cls.validate_requirements(client=client,access_token=access_token)
 
-        return cls.request_resource(action='CREATE',
-                                    client=client,
-                                    access_token=access_token,
-                                    *args,
-                                    **kwargs)
+        return cls.request_resource('CREATE',client,access_token,False,
+                                    *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    async def async_create(cls,client,access_token,*args,deadline=None,**kwargs):
+
+        cls.validate_requirements(client=client,access_token=access_token)
+
+        return await cls.async_request_resource('CREATE',client,access_token,False,
+                                                *args,deadline=deadline,**kwargs)
 
 
 class ReadMixin(object):
@@ -410,21 +569,98 @@ class ReadMixin(object):
         by id.
     """
 
+    __slots__ = ()
+
     @classmethod
-    def get(cls,client,access_token,resource_id,*args,**kwargs):
+    def get(cls,client,access_token,resource_id,*args,deadline=None,**kwargs):
 
         cls.validate_requirements(client=client,access_token=access_token)
 
         #Creates a new list and add id to the end of the list
-        #to avoid any problems building the url when calling
-        #map_to_url().Thus,having the id of the resource at the
-        #end of the url
-        args = list(args).append(resource_id)
-        return cls.request_resource(action='READ',
-                                    client=client,
-                                    access_token=access_token,
-                                    *args,
-                                    **kwargs)
+        #to avoid any problems building the url from the
+        #ENDPOINT's template.Thus,having the id of the resource
+        #at the end of the url
+        args = list(args) + [resource_id]
+        return cls.request_resource('READ',client,access_token,False,
+                                    *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    async def async_get(cls,client,access_token,resource_id,*args,deadline=None,**kwargs):
+
+        cls.validate_requirements(client=client,access_token=access_token)
+
+        args = list(args) + [resource_id]
+        return await cls.async_request_resource('READ',client,access_token,False,
+                                                *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    def get_many(cls,client,access_token,resource_ids,concurrency=8,*args,
+                 deadline=None,**kwargs):
+
+        """
+            Gets several BitGoResources by id at once, fanning the
+            requests out over a bounded thread pool that shares the
+            client's connection pool.
+
+            A failing id does not abort the batch.The returned list
+            keeps the same order as resource_ids, and holds either the
+            resource built through from_json() or the BitGoException
+            raised while requesting that id.
+
+            @param resource_ids : An iterable of resource ids.
+
+            @param concurrency : Maximum number of requests in flight.
+                                 Keep it at or below the client's pool_maxsize
+                                 so every thread gets a kept alive connection.
+
+            @param deadline : Optional seconds(or a Deadline) for the whole
+                              batch.Ids still waiting once it passed get a
+                              DeadlineExceeded.
+        """
+
+        cls.validate_requirements(client=client,access_token=access_token)
+        deadline = Deadline.coerce(deadline)
+
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return []
+
+        def fetch(resource_id):
+            try:
+                return cls.get(client,access_token,resource_id,*args,
+                               deadline=deadline,**kwargs)
+            except BitGoException as exc:
+                return exc
+
+        workers = max(1,min(concurrency,len(resource_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fetch,resource_ids))
+
+    @classmethod
+    async def async_get_many(cls,client,access_token,resource_ids,concurrency=100,*args,
+                             deadline=None,**kwargs):
+
+        """
+            Coroutine version of get_many() for an AsyncBitGoClient.
+            At most 'concurrency' requests are in flight at once on
+            the running event loop.
+        """
+
+        cls.validate_requirements(client=client,access_token=access_token)
+        deadline = Deadline.coerce(deadline)
+
+        semaphore = asyncio.Semaphore(max(1,concurrency))
+
+        async def fetch(resource_id):
+            async with semaphore:
+                try:
+                    return await cls.async_get(client,access_token,resource_id,*args,
+                                               deadline=deadline,**kwargs)
+                except BitGoException as exc:
+                    return exc
+
+        return list(await asyncio.gather(*[fetch(resource_id)
+                                           for resource_id in resource_ids]))
 
 
 class ListMixin(object):
@@ -433,18 +669,170 @@ class ListMixin(object):
         A generic mixin used for listing all of the same
         BitGoResources.
 
+        LIST_KEY is the key of the response holding the page
+        of items(e.g. 'wallets' or 'keychains'), and is required
+        by iter_all().Pages are requested with skip/limit params,
+        unless PAGINATION_CURSOR is set to a 2 item tuple with
+        the request param and the response key used for cursor
+        paging, e.g. ('prevId','nextBatchPrevId').
+
     """
 
+    __slots__ = ()
+
+    LIST_KEY = None
+    PAGE_SIZE = 100
+    PAGINATION_CURSOR = None
+
     @classmethod
-    def list(cls,client,access_token,*args,**kwargs):
+    def list(cls,client,access_token,*args,deadline=None,**kwargs):
 
         cls.validate_requirements(client=client,access_token=access_token)
 
-        return cls.request_resource(action='LIST',
-                                    client=client,
-                                    access_token=access_token,
-                                    *args,
-                                    **kwargs)
+        return cls.request_resource('LIST',client,access_token,False,
+                                    *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    async def async_list(cls,client,access_token,*args,deadline=None,**kwargs):
+
+        cls.validate_requirements(client=client,access_token=access_token)
+
+        return await cls.async_request_resource('LIST',client,access_token,False,
+                                                *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    def list_stream(cls,client,access_token,*args,deadline=None,**kwargs):
+
+        """
+            Generator yielding the BitGoResources of a single LIST
+            response while it is being downloaded.The response is
+            decoded incrementally, so only one item is in memory at
+            a time.Requires the LIST_KEY class variable.
+
+            @param *args: Extra arguments mapped to the LIST endpoint.
+
+            @param **kwargs: Anything passed to kwargs
+                             will be used as request data.
+
+            @param deadline : Optional seconds(or a Deadline) bounding the
+                              wait for the response and every read of it.
+        """
+
+        cls.validate_requirements(client=client,access_token=access_token)
+
+        if not cls.LIST_KEY:
+            raise BitGoResourceException('{name} needs a LIST_KEY class variable '\
+                                         'to stream its items'.format(name=cls.__name__))
+
+        method,endpoint_mapped = cls._map_request('LIST',args,kwargs)
+
+        items = client.stream(url=endpoint_mapped,
+                              key=cls.LIST_KEY,
+                              method=method,
+                              params=kwargs,
+                              access_token=access_token,
+                              action='LIST',
+                              deadline=deadline)
+
+        for item in items:
+            yield cls.from_json(client=client,
+                                access_token=access_token,
+                                json_data=item)
+
+    @classmethod
+    def _next_page_params(cls,params,page,items):
+
+        """
+            Returns the request params for the page following
+            'page', or None when 'page' was the last one.
+        """
+
+        if not items:
+            return None
+
+        next_params = dict(params)
+
+        if cls.PAGINATION_CURSOR:
+            request_param,response_key = cls.PAGINATION_CURSOR
+            cursor = page.get(response_key,None)
+            if not cursor:
+                return None
+            next_params[request_param] = cursor
+        else:
+            next_params['skip'] = params['skip'] + len(items)
+            total = page.get('total',None)
+            if total is not None:
+                if next_params['skip'] >= total:
+                    return None
+            elif len(items) < params['limit']:
+                return None
+
+        return next_params
+
+    @classmethod
+    def iter_all(cls,client,access_token,page_size=None,prefetch=True,*args,
+                 deadline=None,**kwargs):
+
+        """
+            Generator yielding every BitGoResource of the LIST action,
+            requesting one page after another.Only the current page
+            is held in memory and every item is built through
+            from_json() lazily, right before it is yielded.
+
+            @param page_size : Number of items requested per page.
+                               Defaults to the class PAGE_SIZE.
+
+            @param prefetch : If True, the next page is requested in
+                              a background thread while the caller
+                              works through the current one.
+
+            @param *args: Extra arguments mapped to the LIST endpoint.
+
+            @param **kwargs: Extra request params sent with every page.
+
+            @param deadline : Optional seconds(or a Deadline) for the whole
+                              iteration, starting with this call.Every page
+                              request only gets the time left, and the page
+                              that can't be fetched in time raises
+                              DeadlineExceeded.
+        """
+
+        cls.validate_requirements(client=client,access_token=access_token)
+        deadline = Deadline.coerce(deadline)
+
+        if not cls.LIST_KEY:
+            raise BitGoResourceException('{name} needs a LIST_KEY class variable '\
+                                         'to iterate over its pages'.format(name=cls.__name__))
+
+        params = dict(kwargs)
+        params['limit'] = page_size or cls.PAGE_SIZE
+        if not cls.PAGINATION_CURSOR:
+            params.setdefault('skip',0)
+
+        def fetch(page_params):
+            return cls.request_resource('LIST',client,access_token,True,
+                                        *args,deadline=deadline,**page_params)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending = executor.submit(fetch,params) if prefetch else None
+
+        try:
+            while params is not None:
+                page = pending.result() if prefetch else fetch(params)
+                items = page.get(cls.LIST_KEY,None) or []
+
+                params = cls._next_page_params(params,page,items)
+                if prefetch and params is not None:
+                    pending = executor.submit(fetch,params)
+
+                for item in items:
+                    yield cls.from_json(client=client,
+                                        access_token=access_token,
+                                        json_data=item)
+        finally:
+            if executor is not None:
+                pending.cancel()
+                executor.shutdown(wait=False)
 
 
 class UpdateMixin(object):
@@ -453,17 +841,25 @@ class UpdateMixin(object):
         A generic mixin used for updating a BitGoResource by id.
     """
 
+    __slots__ = ()
+
     @classmethod
-    def update(cls,client,access_token,resource_id,*args,**kwargs):
+    def update(cls,client,access_token,resource_id,*args,deadline=None,**kwargs):
 
         cls.validate_requirements(client=client,access_token=access_token)
 
-        args = list(args).append(resource_id)
-        return cls.request_resource(action='UPDATE',
-                                    client=client,
-                                    access_token=access_token,
-                                    *args,
-                                    **kwargs)
+        args = list(args) + [resource_id]
+        return cls.request_resource('UPDATE',client,access_token,False,
+                                    *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    async def async_update(cls,client,access_token,resource_id,*args,deadline=None,**kwargs):
+
+        cls.validate_requirements(client=client,access_token=access_token)
+
+        args = list(args) + [resource_id]
+        return await cls.async_request_resource('UPDATE',client,access_token,False,
+                                                *args,deadline=deadline,**kwargs)
 
 
 class DeleteMixin(object):
@@ -472,17 +868,25 @@ class DeleteMixin(object):
         A generic mixin used for deleting a BitGoResource by id.
     """
 
+    __slots__ = ()
+
     @classmethod
-    def delete(cls,client,access_token,resource_id,*args,**kwargs):
+    def delete(cls,client,access_token,resource_id,*args,deadline=None,**kwargs):
 
         cls.validate_requirements(client=client,access_token=access_token)
 
-        args = list(args).append(resource_id)
-        return cls.request_resource(action='DELETE',
-                                    client=client,
-                                    access_token=access_token,
-                                    *args,
-                                    **kwargs)
+        args = list(args) + [resource_id]
+        return cls.request_resource('DELETE',client,access_token,False,
+                                    *args,deadline=deadline,**kwargs)
+
+    @classmethod
+    async def async_delete(cls,client,access_token,resource_id,*args,deadline=None,**kwargs):
+
+        cls.validate_requirements(client=client,access_token=access_token)
+
+        args = list(args) + [resource_id]
+        return await cls.async_request_resource('DELETE',client,access_token,False,
+                                                *args,deadline=deadline,**kwargs)
 
 
 class CRUDMixin(CreateMixin,ReadMixin,UpdateMixin,DeleteMixin):
@@ -492,7 +896,7 @@ class CRUDMixin(CreateMixin,ReadMixin,UpdateMixin,DeleteMixin):
         create,read,update and delete a BitGoResource.However,
         it cannot list multiple BitGoResource.
     """
-    pass
+    __slots__ = ()
 
 
 
@@ -0,0 +1,205 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+__all__ = ['RetryPolicy']
+
+
+class RetryPolicy(object):
+
+    """ Decides whether a failed request sent by BitGoClient should
+        be sent again, and how long to wait before doing so.
+
+        Connection errors, timeouts and the RETRY_STATUSES http status
+        codes are retried with an exponential backoff plus jitter,
+        up to max_attempts attempts in total.On a 429 or 503 the
+        server's Retry-After header is honored instead of the backoff.
+        Only idempotent http methods are retried unless
+        retry_non_idempotent is set, since retrying a POST might
+        create the same resource twice.
+
+        The policy keeps thread safe counters about every retry it
+        allows, see stats().A policy can be shared between clients,
+        and custom policies can subclass it and override
+        on_exception() and on_status().AsyncBitGoClient takes the same
+        policies, its aiohttp errors are retried like their requests
+        counterparts.
+
+        Example:
+            client = BitGoClient(retry=RetryPolicy(max_attempts=5,
+                                                   backoff_factor=0.2))
+    """
+
+    IDEMPOTENT_METHODS = frozenset(['get','put','delete'])
+    RETRY_STATUSES = frozenset([429,500,502,503,504])
+    RETRY_AFTER_STATUSES = frozenset([429,503])
+    RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout)
+    #Connection errors that won't go away by sending the request again
+    FATAL_EXCEPTIONS = (requests.exceptions.SSLError,)
+
+    if aiohttp is not None:
+        RETRY_EXCEPTIONS += (aiohttp.ClientConnectionError,asyncio.TimeoutError)
+        FATAL_EXCEPTIONS += (aiohttp.ClientSSLError,)
+
+    def __init__(self,max_attempts=3,backoff_factor=0.5,max_backoff=30.0,
+                 jitter=True,retry_statuses=None,retry_non_idempotent=False,
+                 max_retry_after=60.0):
+
+        """
+            @param max_attempts : Total number of attempts per request,
+                                  including the first one.
+
+            @param backoff_factor : The n-th retry waits up to
+                                    backoff_factor * 2 ** (n - 1) seconds.
+
+            @param max_backoff : Upper bound in seconds for any backoff.
+
+            @param jitter : If True, a random delay between 0 and the
+                            backoff is used so many clients failing at
+                            once don't retry in lockstep.
+
+            @param retry_statuses : Http status codes to retry.Defaults
+                                    to RETRY_STATUSES.
+
+            @param retry_non_idempotent : If True, POST requests are
+                                          retried as well.
+
+            @param max_retry_after : A Retry-After longer than this many
+                                     seconds is not waited for and the
+                                     error is raised right away.
+        """
+
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses or self.RETRY_STATUSES)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.max_retry_after = max_retry_after
+
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._exhausted = 0
+        self._reasons = {}
+
+    def is_retryable_method(self,method):
+        return self.retry_non_idempotent or method.lower() in self.IDEMPOTENT_METHODS
+
+    def backoff(self,attempt):
+
+        """ Returns the seconds to wait after the given failed attempt."""
+
+        delay = min(self.max_backoff,self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0,delay)
+        return delay
+
+    def parse_retry_after(self,value):
+
+        """ Returns the seconds to wait from a Retry-After header value,
+            which is either a number of seconds or an http date.None is
+            returned when the value can't be parsed.
+        """
+
+        if not value:
+            return None
+
+        try:
+            return max(0.0,float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError,ValueError):
+            return None
+
+        return max(0.0,retry_at.timestamp() - time.time())
+
+    def on_exception(self,method,exc,attempt):
+
+        """ Returns the seconds to wait before retrying a request that
+            raised a requests(or aiohttp) exception, or None to give up.
+        """
+
+        if not isinstance(exc,self.RETRY_EXCEPTIONS) or isinstance(exc,self.FATAL_EXCEPTIONS):
+            return None
+
+        return self._retry(method=method,attempt=attempt,
+                           reason=type(exc).__name__,delay=self.backoff(attempt))
+
+    def on_response(self,method,response,attempt):
+
+        """ Returns the seconds to wait before retrying a request that
+            got 'response' back, or None to keep the response.
+        """
+
+        return self.on_status(method=method,status=response.status_code,
+                              headers=response.headers,attempt=attempt)
+
+    def on_status(self,method,status,headers,attempt):
+
+        """ Returns the seconds to wait before retrying a request
+            answered with the http status code and headers, or None
+            to keep the response.
+        """
+
+        if status not in self.retry_statuses:
+            return None
+
+        delay = self.backoff(attempt)
+        if status in self.RETRY_AFTER_STATUSES:
+            retry_after = self.parse_retry_after(headers.get('Retry-After',None))
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                delay = retry_after
+
+        return self._retry(method=method,attempt=attempt,reason=status,delay=delay)
+
+    def _retry(self,method,attempt,reason,delay):
+
+        if not self.is_retryable_method(method):
+            return None
+
+        with self._lock:
+            if attempt >= self.max_attempts:
+                self._exhausted += 1
+                return None
+
+            self._retries += 1
+            self._reasons[reason] = self._reasons.get(reason,0) + 1
+
+        return delay
+
+    def sleep(self,seconds):
+        time.sleep(seconds)
+
+    def stats(self):
+
+        """ Returns a snapshot of the retry counters:
+                'retries' = number of retries sent
+                'exhausted' = requests that failed after max_attempts
+                'reasons' = retries per http status code or exception name
+        """
+
+        with self._lock:
+            return {'retries':self._retries,
+                    'exhausted':self._exhausted,
+                    'reasons':dict(self._reasons)}
+
+    def reset_stats(self):
+        with self._lock:
+            self._retries = 0
+            self._exhausted = 0
+            self._reasons = {}
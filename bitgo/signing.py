@@ -0,0 +1,332 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import ecdsa
+except ImportError:
+    ecdsa = None
+
+from bitgo.errors import BitGoClientException,InvalidTransaction
+from bitgo.transaction import (SIGHASH_ALL,multisig_pubkeys,multisig_script,
+                               signature_hashes)
+
+__all__ = ['ECDSASigner','TransactionSigner']
+
+#Signer and private keys of a worker process, set once when it starts
+_worker = {}
+
+
+def _start_worker(signer,keys):
+    _worker['signer'] = signer
+    _worker['keys'] = keys
+
+
+def _sign_chunk(jobs):
+
+    """ Signs jobs, a list of (digest,position of the key) tuples, in
+        a worker process.
+    """
+
+    signer = _worker['signer']
+    keys = _worker['keys']
+    return [signer(digest,keys[position]) for digest,position in jobs]
+
+
+class ECDSASigner(object):
+
+    """
+        Signs signature hashes with secp256k1 private keys, with
+        deterministic(RFC 6979) nonces and low S values, so signing the
+        same transaction twice gives the same signatures.
+
+        Requires the optional 'ecdsa' package:
+            pip install ecdsa
+    """
+
+    def __init__(self):
+        if ecdsa is None:
+            raise BitGoClientException('ECDSASigner requires the ecdsa package.'\
+                                       'Install it with: pip install ecdsa')
+        self._keys = {}
+
+    def __getstate__(self):
+        #The SigningKeys are built again by the process unpickling it
+        return {}
+
+    def __setstate__(self,state):
+        self._keys = {}
+
+    def signing_key(self,key):
+
+        """ Returns the ecdsa SigningKey of a 32 byte private key,
+            built once per key.
+        """
+
+        signing_key = self._keys.get(key,None)
+        if signing_key is None:
+            signing_key = ecdsa.SigningKey.from_string(key,curve=ecdsa.SECP256k1)
+            self._keys[key] = signing_key
+        return signing_key
+
+    def public_key(self,key):
+
+        """ Returns the compressed public key of a private key."""
+
+        point = self.signing_key(key).get_verifying_key().pubkey.point
+        return bytes([2 + (point.y() & 1)]) + point.x().to_bytes(32,'big')
+
+    def __call__(self,digest,key):
+
+        """ Returns the DER signature of digest by key."""
+
+        return self.signing_key(key).sign_digest_deterministic(digest,
+                                                              hashfunc=hashlib.sha256,
+                                                              sigencode=ecdsa.util.sigencode_der_canonize)
+
+
+class TransactionSigner(object):
+
+    """
+        Signs the inputs of a Transaction, spreading the signatures of
+        large transactions across a pool of processes.
+
+        The legacy signature hash of every input covers the whole
+        transaction, so hashing the inputs one at a time grows with the
+        square of their number.The hashes of all the inputs are instead
+        computed here in one pass over the parts of the unsigned
+        transaction they share, which takes a 1000 input consolidation
+        from most of a second to tens of milliseconds.
+
+        Signing is then the costly part.Transactions with at least
+        min_parallel_inputs inputs have their digests signed by worker
+        processes, in chunks.The tasks only carry the 32 byte digests and
+        the position of the key signing each of them, never the
+        transaction or the keys.The private keys are handed to the
+        workers once, when the pool starts, so they do reach these child
+        processes: the pool is started again when other keys sign, and
+        close() shuts it down along with the keys it holds.
+
+        Signatures are made by signer, a callable taking (digest,key) and
+        returning a DER signature, which needs to be picklable to be sent
+        to the workers.ECDSASigner is used by default.Its nonces are
+        deterministic, so the signatures are the same with or without the
+        pool and however the inputs were split.
+
+        Example:
+            with TransactionSigner(processes=4) as signer:
+                signatures = signer.sign(tx,user_key,redeem_scripts)
+                signer.sign_multisig(tx,user_key,redeem_scripts)
+    """
+
+    def __init__(self,signer=None,processes=None,chunk_size=None,
+                 min_parallel_inputs=64):
+
+        """
+            @param signer : Callable(digest,key) returning a DER
+                            signature.Defaults to an ECDSASigner.
+
+            @param processes : Worker processes of the pool.Defaults to
+                               the number of cpus.
+
+            @param chunk_size : Inputs signed per task.Defaults to
+                                spreading the inputs over 4 tasks per
+                                worker.
+
+            @param min_parallel_inputs : Smallest number of inputs signed
+                                         in the pool, smaller transactions
+                                         are signed in process since
+                                         starting workers costs more.
+        """
+
+        self.signer = signer
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel_inputs = min_parallel_inputs
+
+        self._pool = None
+        #(signer,keys) the pool's workers were started with
+        self._pool_state = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc,tb):
+        self.close()
+
+    def close(self):
+
+        """ Shuts down the process pool, if any, and the keys its
+            workers hold.
+        """
+
+        with self._lock:
+            self._close_pool()
+
+    def _close_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = self._pool_state = None
+
+    def _pool_for(self,keys):
+
+        """ Returns the process pool whose workers sign with keys,
+            starting it if needed.Called with the lock held.
+        """
+
+        state = (self.signer,keys)
+        if self._pool is None or self._pool_state != state:
+            self._close_pool()
+            self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                             initializer=_start_worker,
+                                             initargs=state)
+            self._pool_state = state
+        return self._pool
+
+    def _sign_in_pool(self,digests,keys):
+        unique = tuple(dict.fromkeys(keys))
+        positions = {key:position for position,key in enumerate(unique)}
+        jobs = [(digest,positions[key]) for digest,key in zip(digests,keys)]
+
+        chunk_size = self.chunk_size or -(-len(jobs) // (self.processes * 4))
+        chunks = [jobs[start:start + chunk_size] for start in range(0,len(jobs),chunk_size)]
+
+        #Signing with other keys restarts the pool, so it is used by
+        #one call at a time
+        with self._lock:
+            pool = self._pool_for(unique)
+            futures = [pool.submit(_sign_chunk,chunk) for chunk in chunks]
+            signatures = []
+            for future in futures:
+                signatures.extend(future.result())
+        return signatures
+
+    @staticmethod
+    def _scripts(tx,scripts):
+        if isinstance(scripts,(bytes,bytearray)):
+            return [bytes(scripts)] * len(tx.inputs)
+
+        scripts = list(scripts)
+        if len(scripts) != len(tx.inputs):
+            raise InvalidTransaction('Got {s} scripts for {n} inputs'.format(s=len(scripts),
+                                                                          n=len(tx.inputs)))
+        return scripts
+
+    @staticmethod
+    def _keys(tx,keys):
+        if isinstance(keys,(bytes,bytearray)):
+            return [bytes(keys)] * len(tx.inputs)
+
+        keys = list(keys)
+        if len(keys) != len(tx.inputs):
+            raise InvalidTransaction('Got {k} keys for {n} inputs'.format(k=len(keys),n=len(tx.inputs)))
+        return keys
+
+    def signature_hashes(self,tx,scripts,hashtype=SIGHASH_ALL):
+
+        """
+            Returns the signature hash of every input of tx, in order.
+
+            @param scripts : The script code of every input(the redeem
+                             script of a P2SH input), or a single script
+                             shared by all of them.
+        """
+
+        scripts = self._scripts(tx,scripts)
+        prefix,empty_inputs,suffix = tx.sighash_parts(hashtype)
+        jobs = [(index,tx.signing_input(index,script)) for index,script in enumerate(scripts)]
+        return signature_hashes(prefix,empty_inputs,suffix,jobs)
+
+    def sign(self,tx,keys,scripts,hashtype=SIGHASH_ALL):
+
+        """
+            Returns the signature of every input of tx, the DER
+            signature followed by the hashtype byte.
+
+            @param keys : The 32 byte private key signing every input,
+                          or a list with the key of each input.
+
+            @param scripts : See signature_hashes().
+        """
+
+        if self.signer is None:
+            self.signer = ECDSASigner()
+
+        keys = self._keys(tx,keys)
+        digests = self.signature_hashes(tx,scripts,hashtype)
+
+        if len(digests) < self.min_parallel_inputs or self.processes < 2:
+            signatures = [self.signer(digest,key) for digest,key in zip(digests,keys)]
+        else:
+            signatures = self._sign_in_pool(digests,keys)
+
+        suffix = bytes([hashtype])
+        return [signature + suffix for signature in signatures]
+
+    def _position(self,key,pubkeys):
+
+        """ Returns the position of key's public key in pubkeys."""
+
+        public_key = getattr(self.signer,'public_key',None)
+        if public_key is None:
+            raise InvalidTransaction('The signer can not tell the public key of a private key, '\
+                                     'pass the position of the key in the redeem scripts')
+
+        try:
+            return pubkeys.index(public_key(key))
+        except ValueError:
+            raise InvalidTransaction('The signing key is not one of the keys of the redeem script')
+
+    def sign_multisig(self,tx,keys,redeem_scripts,signatures=None,position=None,
+                      hashtype=SIGHASH_ALL):
+
+        """
+            Signs the P2SH multisig inputs of tx in place, setting the
+            script of every input to its signatures, in the order of
+            their public keys in the redeem script, and the redeem
+            script.Returns the signatures of every input, keyed by the
+            position of their public key.
+
+            @param signatures : Optional list with, for every input, a
+                                dict of the signatures it already has keyed
+                                by the position of their public key in the
+                                redeem script, e.g. for the second signature
+                                of a half signed transaction.
+
+            @param position : Position of the signing key's public key in
+                              every redeem script.By default it is looked
+                              up with the signer's public_key().
+        """
+
+        if self.signer is None:
+            self.signer = ECDSASigner()
+
+        keys = self._keys(tx,keys)
+        redeem_scripts = self._scripts(tx,redeem_scripts)
+        if signatures is not None and len(signatures) != len(tx.inputs):
+            raise InvalidTransaction('Got {s} signature lists for {n} inputs'.format(s=len(signatures),
+                                                                                  n=len(tx.inputs)))
+
+        #Positions are checked before signing so a wrong key or redeem
+        #script leaves tx untouched
+        positions = []
+        for key,redeem_script in zip(keys,redeem_scripts):
+            pubkeys = multisig_pubkeys(redeem_script)
+            key_position = self._position(key,pubkeys) if position is None else position
+            if not 0 <= key_position < len(pubkeys):
+                raise InvalidTransaction('Invalid public key position:{p}'.format(p=key_position))
+            positions.append(key_position)
+
+        new_signatures = self.sign(tx,keys,redeem_scripts,hashtype)
+
+        signed = []
+        for index,tx_input in enumerate(tx.inputs):
+            by_position = dict(signatures[index]) if signatures else {}
+            by_position[positions[index]] = new_signatures[index]
+            tx_input.script = multisig_script([by_position[key_position]
+                                               for key_position in sorted(by_position)],
+                                              redeem_scripts[index])
+            signed.append(by_position)
+        return signed
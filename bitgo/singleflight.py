@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+
+from bitgo.errors import DeadlineExceeded
+
+__all__ = ['SingleFlight','AsyncSingleFlight']
+
+
+class Call(object):
+
+    """ A request in flight and the callers waiting on it."""
+
+    __slots__ = ('done','result','error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+
+    """
+        Coalesces identical GET requests sent at the same time by
+        several threads: the first caller sends the request and the
+        others wait for it, so they all get the same decoded json
+        (or the same exception) out of a single round trip.
+
+        Requests are identical when they have the same access token,
+        url and params.Only requests in flight are shared, nothing is
+        kept once they finish(see ResponseCache for that).The json
+        handed to every caller is the same object, so it should not
+        be modified in place.
+
+        Example:
+            client = BitGoClient(single_flight=SingleFlight())
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._shared = 0
+
+    @staticmethod
+    def make_key(token,url,params=None):
+
+        """ Builds the key identical requests share."""
+
+        params_key = json.dumps(params,sort_keys=True,default=str) if params else ''
+        return (token,url,params_key)
+
+    def do(self,key,func,deadline=None):
+
+        """
+            Returns func(), unless a call with the same key is already
+            in flight, in which case its outcome is waited for instead.
+
+            @param deadline : Optional Deadline bounding the wait on a
+                              call in flight.
+        """
+
+        with self._lock:
+            call = self._calls.get(key,None)
+            if call is None:
+                call = self._calls[key] = Call()
+                self._executed += 1
+                leader = True
+            else:
+                self._shared += 1
+                leader = False
+
+        if not leader:
+            timeout = None if deadline is None else max(0.0,deadline.remaining())
+            if not call.done.wait(timeout):
+                raise DeadlineExceeded('The {s}s deadline of the call was exceeded while '\
+                                       'waiting on an identical request'.format(s=deadline.seconds))
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self):
+
+        """ Returns the coalescing counters:
+                'executed' = requests actually sent
+                'shared' = callers served by another caller's request
+                'in_flight' = requests currently in flight
+        """
+
+        with self._lock:
+            return {'executed':self._executed,
+                    'shared':self._shared,
+                    'in_flight':len(self._calls)}
+
+
+class AsyncSingleFlight(SingleFlight):
+
+    """
+        Coroutine version of SingleFlight for an AsyncBitGoClient,
+        coalescing identical GET requests awaited concurrently on the
+        same event loop.
+
+        The request runs in its own task, so cancelling the caller
+        that started it does not cancel it for the other callers.
+
+        Example:
+            client = AsyncBitGoClient(single_flight=AsyncSingleFlight())
+    """
+
+    async def do(self,key,func,deadline=None):
+
+        """
+            Returns await func(), unless a call with the same key is
+            already in flight, in which case its outcome is awaited
+            instead.
+
+            @param deadline : Optional Deadline bounding the wait on a
+                              call in flight.
+        """
+
+        #Only the event loop thread touches the calls, so no lock is needed
+        task = self._calls.get(key,None)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self._executed += 1
+            task.add_done_callback(lambda _: self._calls.pop(key,None))
+        else:
+            self._shared += 1
+
+        if deadline is None:
+            return await asyncio.shield(task)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task),max(0.0,deadline.remaining()))
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise DeadlineExceeded('The {s}s deadline of the call was exceeded while '\
+                                   'waiting on an identical request'.format(s=deadline.seconds))
+
+    def stats(self):
+        return {'executed':self._executed,
+                'shared':self._shared,
+                'in_flight':len(self._calls)}
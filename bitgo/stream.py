@@ -0,0 +1,170 @@
+import codecs
+import json
+
+from bitgo.errors import BitGoException
+
+__all__ = ['JSONItemStream']
+
+
+class JSONItemStream(object):
+
+    """
+        Incremental decoder yielding, one by one, the items of the
+        json array stored under 'key' in a top level json object,
+        e.g. every transaction of {"transactions":[...],"total":5}.
+
+        The body is read chunk by chunk and only the item currently
+        being decoded is buffered, so memory stays bounded by the size
+        of one item no matter how long the array is.Every other top
+        level key is decoded as a whole and kept in 'metadata', which
+        is complete once iteration finishes.If 'key' is None, the body
+        itself needs to be a json array.
+
+        Example:
+            stream = JSONItemStream(response.iter_content(65536),'transactions')
+            for tx in stream:
+                ...
+            total = stream.metadata.get('total')
+    """
+
+    WHITESPACE = ' \t\n\r'
+    NUMBER = '0123456789+-.eE'
+
+    def __init__(self,chunks,key=None,encoding='utf-8'):
+
+        """
+            @param chunks : An iterable of bytes(or str) chunks of the body.
+
+            @param key : The top level key holding the array to stream.
+
+            @param encoding : The encoding of bytes chunks.
+        """
+
+        self.key = key
+        self.metadata = {}
+
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder(encoding)()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._items = self._iter_items()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    def _fill(self):
+
+        """ Appends the next chunk to the buffer, dropping everything
+            already consumed.Returns False once the body is exhausted.
+        """
+
+        if self._eof:
+            return False
+
+        for chunk in self._chunks:
+            text = self._text.decode(chunk) if isinstance(chunk,bytes) else chunk
+            if text:
+                self._buffer = self._buffer[self._pos:] + text
+                self._pos = 0
+                return True
+
+        self._eof = True
+        tail = self._text.decode(b'',final=True)
+        if tail:
+            self._buffer = self._buffer[self._pos:] + tail
+            self._pos = 0
+            return True
+        return False
+
+    def _error(self,reason):
+        return BitGoException('Could not decode the streamed json response: {r}'.format(r=reason))
+
+    def _peek(self):
+
+        """ Returns the next non whitespace character, or '' at the end."""
+
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in self.WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ''
+
+    def _take(self,expected):
+
+        char = self._peek()
+        if char not in expected:
+            raise self._error('expected one of {e!r} but found {c!r}'.format(e=expected,c=char))
+        self._pos += 1
+        return char
+
+    def _value(self):
+
+        """ Decodes the next complete json value."""
+
+        self._peek()
+        while True:
+            try:
+                value,end = self._decoder.raw_decode(self._buffer,self._pos)
+            except ValueError as exc:
+                if not self._fill():
+                    raise self._error(exc)
+                continue
+
+            #A number or literal ending right at the end of the buffer
+            #might continue in the next chunk, as might a number followed
+            #by the start of its fraction or exponent(e.g. '6.5e' of '6.5e2')
+            buffer = self._buffer
+            pos = end
+            if isinstance(value,(int,float)):
+                while pos < len(buffer) and buffer[pos] in self.NUMBER:
+                    pos += 1
+            if pos == len(buffer) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def _iter_array(self):
+        self._take('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._take(',]') == ']':
+                return
+
+    def _iter_items(self):
+
+        if self.key is None:
+            yield from self._iter_array()
+            return
+
+        self._take('{')
+        if self._peek() == '}':
+            return
+
+        while True:
+            name = self._value()
+            if not isinstance(name,str):
+                raise self._error('expected an object key')
+            self._take(':')
+
+            if name == self.key and self._peek() == '[':
+                yield from self._iter_array()
+            else:
+                self.metadata[name] = self._value()
+
+            if self._take(',}') == '}':
+                return
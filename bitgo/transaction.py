@@ -0,0 +1,610 @@
+import hashlib
+import struct
+
+from bitgo.errors import InvalidTransaction
+
+__all__ = ['TxInput','TxOutput','Transaction','address_script','varint_size',
+           'push_data','multisig_script','signature_hashes','SIGHASH_ALL']
+
+
+B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+B58_INDEX = {char:i for i,char in enumerate(B58_ALPHABET)}
+
+SIGHASH_ALL = 1
+#Size of an input without a script, as serialized when signing another one
+EMPTY_INPUT_SIZE = 41
+
+#Address version bytes of P2PKH and P2SH addresses, mainnet and testnet
+P2PKH_VERSIONS = (0x00,0x6f)
+P2SH_VERSIONS = (0x05,0xc4)
+
+
+def double_sha256(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def varint_size(n):
+
+    """ Returns the number of bytes of n encoded as a varint."""
+
+    if n < 0xfd:
+        return 1
+    if n <= 0xffff:
+        return 3
+    if n <= 0xffffffff:
+        return 5
+    return 9
+
+
+def pack_varint(buffer,offset,n):
+
+    """ Writes n as a varint into buffer at offset, returning the
+        offset following it.
+    """
+
+    if n < 0xfd:
+        buffer[offset] = n
+        return offset + 1
+    if n <= 0xffff:
+        struct.pack_into('<BH',buffer,offset,0xfd,n)
+        return offset + 3
+    if n <= 0xffffffff:
+        struct.pack_into('<BI',buffer,offset,0xfe,n)
+        return offset + 5
+    struct.pack_into('<BQ',buffer,offset,0xff,n)
+    return offset + 9
+
+
+def unpack_varint(view,offset):
+
+    """ Returns the varint of view at offset, and the offset
+        following it.
+    """
+
+    prefix = view[offset]
+    if prefix < 0xfd:
+        return prefix,offset + 1
+    if prefix == 0xfd:
+        return struct.unpack_from('<H',view,offset + 1)[0],offset + 3
+    if prefix == 0xfe:
+        return struct.unpack_from('<I',view,offset + 1)[0],offset + 5
+    return struct.unpack_from('<Q',view,offset + 1)[0],offset + 9
+
+
+def pack_bytes(buffer,offset,data):
+    offset = pack_varint(buffer,offset,len(data))
+    end = offset + len(data)
+    buffer[offset:end] = data
+    return end
+
+
+def unpack_bytes(view,offset):
+    length,offset = unpack_varint(view,offset)
+    end = offset + length
+    if end > len(view):
+        raise InvalidTransaction('The raw transaction ends in the middle of a script')
+    return bytes(view[offset:end]),end
+
+
+def push_data(data):
+
+    """ Returns the script pushing data onto the stack."""
+
+    length = len(data)
+    if length < 0x4c:
+        return bytes([length]) + data
+    if length <= 0xff:
+        return bytes([0x4c,length]) + data
+    if length <= 0xffff:
+        return b'\x4d' + struct.pack('<H',length) + data
+    return b'\x4e' + struct.pack('<I',length) + data
+
+
+def multisig_script(signatures,redeem_script):
+
+    """ Returns the input script spending a P2SH multisig output
+        with signatures, in the order of their public keys in
+        redeem_script.
+    """
+
+    return b'\x00' + b''.join(push_data(signature) for signature in signatures) + push_data(redeem_script)
+
+
+def multisig_pubkeys(redeem_script):
+
+    """ Returns the public keys of an m of n multisig redeem script,
+        in the order their signatures go in the input script.
+    """
+
+    script = bytes(redeem_script)
+    pubkeys = []
+    offset = 1
+    try:
+        if not 0x51 <= script[0] <= 0x60 or script[-1] != 0xae:
+            raise InvalidTransaction('Not a multisig redeem script')
+        while offset < len(script) - 2:
+            length = script[offset]
+            if length not in (33,65):
+                raise InvalidTransaction('Invalid public key push in multisig redeem script')
+            pubkeys.append(script[offset + 1:offset + 1 + length])
+            offset += 1 + length
+        if offset != len(script) - 2 or script[offset] != 0x50 + len(pubkeys):
+            raise InvalidTransaction('Invalid public key count in multisig redeem script')
+    except IndexError:
+        raise InvalidTransaction('Not a multisig redeem script')
+    return pubkeys
+
+
+def signature_hashes(prefix,empty_inputs,suffix,jobs):
+
+    """
+        Returns the legacy signature hashes of jobs, a list of
+        (input index,serialized input with its script code) tuples,
+        out of the parts returned by Transaction.sighash_parts().
+
+        Every hash covers the whole transaction, so it is fed to sha256
+        in slices of the parts instead of serializing it again for each
+        input.
+    """
+
+    view = memoryview(empty_inputs)
+    digests = []
+    for index,signed_input in jobs:
+        start = index * EMPTY_INPUT_SIZE
+        digest = hashlib.sha256(prefix)
+        digest.update(view[:start])
+        digest.update(signed_input)
+        digest.update(view[start + EMPTY_INPUT_SIZE:])
+        digest.update(suffix)
+        digests.append(hashlib.sha256(digest.digest()).digest())
+    return digests
+
+
+def b58check_decode(address):
+
+    """ Returns the version byte and payload of a base58check
+        encoded address.
+    """
+
+    n = 0
+    for char in address:
+        if char not in B58_INDEX:
+            raise InvalidTransaction('Invalid base58 character in address:{a}'.format(a=address))
+        n = n * 58 + B58_INDEX[char]
+
+    raw = n.to_bytes((n.bit_length() + 7) // 8,'big')
+    raw = b'\x00' * (len(address) - len(address.lstrip('1'))) + raw
+    if len(raw) < 5 or double_sha256(raw[:-4])[:4] != raw[-4:]:
+        raise InvalidTransaction('Invalid checksum for address:{a}'.format(a=address))
+    return raw[0],raw[1:-4]
+
+
+def address_script(address):
+
+    """ Returns the output script paying a P2PKH or P2SH address."""
+
+    version,payload = b58check_decode(address)
+    if len(payload) != 20:
+        raise InvalidTransaction('Invalid address:{a}'.format(a=address))
+
+    if version in P2PKH_VERSIONS:
+        #OP_DUP OP_HASH160 <hash> OP_EQUALVERIFY OP_CHECKSIG
+        return b'\x76\xa9\x14' + payload + b'\x88\xac'
+    if version in P2SH_VERSIONS:
+        #OP_HASH160 <hash> OP_EQUAL
+        return b'\xa9\x14' + payload + b'\x87'
+
+    raise InvalidTransaction('Unsupported version byte {v} for address:{a}'.format(v=version,a=address))
+
+
+class TxInput(object):
+
+    """ An input of a Transaction, spending the output tx_output_n
+        of the transaction tx_hash.
+    """
+
+    __slots__ = ('prev_hash','tx_output_n','script','sequence','witness','value')
+
+    def __init__(self,prev_hash,tx_output_n,script=b'',sequence=0xffffffff,
+                 witness=None,value=None):
+
+        """
+            @param prev_hash : Hash of the transaction spent, 32 bytes in
+                               the order they are serialized(the reverse
+                               of the hex txid).
+
+            @param script : The input script, empty until signed.
+
+            @param witness : Optional list of witness items.
+
+            @param value : Value of the output spent, when known, for
+                           fees and signing.
+        """
+
+        self.prev_hash = prev_hash
+        self.tx_output_n = tx_output_n
+        self.script = script
+        self.sequence = sequence
+        self.witness = witness or []
+        self.value = value
+
+    @property
+    def tx_hash(self):
+
+        """ Hex txid of the transaction spent."""
+
+        return self.prev_hash[::-1].hex()
+
+    @property
+    def outpoint(self):
+        return (self.tx_hash,self.tx_output_n)
+
+    def size(self):
+        return 40 + varint_size(len(self.script)) + len(self.script)
+
+    def witness_size(self):
+        return varint_size(len(self.witness)) + sum(varint_size(len(item)) + len(item)
+                                                    for item in self.witness)
+
+    def __repr__(self):
+        return '<TxInput {h}:{n}>'.format(h=self.tx_hash,n=self.tx_output_n)
+
+
+class TxOutput(object):
+
+    """ An output of a Transaction paying value satoshis to script."""
+
+    __slots__ = ('value','script')
+
+    def __init__(self,value,script):
+        self.value = value
+        self.script = script
+
+    def size(self):
+        return 8 + varint_size(len(self.script)) + len(self.script)
+
+    def __repr__(self):
+        return '<TxOutput value:{v}>'.format(v=self.value)
+
+
+class Transaction(object):
+
+    """
+        A bitcoin transaction built, serialized and deserialized in
+        process, without any request to BitGo's API.
+
+        Raw transactions are read through a memoryview and written
+        into a buffer allocated once at their final size, so neither
+        step goes through hex strings or intermediate copies.Sizes,
+        and the fees depending on them, are computed out of the length
+        of the scripts without serializing anything.
+
+        Example:
+            tx = Transaction()
+            for unspent in selection.unspents:
+                tx.add_input(unspent.tx_hash,unspent.tx_output_n,value=unspent.value)
+            tx.add_output(150000,address_script(address))
+            fee = tx.estimate_fee(fee_rate=20000)
+
+            tx = Transaction.deserialize(raw)
+            print(tx.txid,tx.vsize(),tx.fee())
+    """
+
+    __slots__ = ('version','inputs','outputs','locktime')
+
+    #Size of a signed P2SH 2 of 3 multisig input
+    SIGNED_INPUT_SIZE = 297
+
+    def __init__(self,version=1,inputs=None,outputs=None,locktime=0):
+        self.version = version
+        self.inputs = inputs or []
+        self.outputs = outputs or []
+        self.locktime = locktime
+
+    def add_input(self,tx_hash,tx_output_n,script=b'',sequence=0xffffffff,value=None):
+
+        """
+            Adds an input spending output tx_output_n of tx_hash.
+
+            @param tx_hash : Hex txid of the transaction spent.
+        """
+
+        tx_input = TxInput(prev_hash=bytes.fromhex(tx_hash)[::-1],
+                           tx_output_n=tx_output_n,
+                           script=script,
+                           sequence=sequence,
+                           value=value)
+        self.inputs.append(tx_input)
+        return tx_input
+
+    def add_output(self,value,script):
+
+        """
+            Adds an output paying value satoshis to script, or to an
+            address when script is a str.
+        """
+
+        if isinstance(script,str):
+            script = address_script(script)
+        if not isinstance(value,int) or isinstance(value,bool) or value < 0:
+            raise InvalidTransaction('Output values are non negative integers in satoshis')
+
+        tx_output = TxOutput(value=value,script=script)
+        self.outputs.append(tx_output)
+        return tx_output
+
+    @classmethod
+    def from_selection(cls,selection,recipients,change_script=None):
+
+        """
+            Returns the unsigned Transaction spending a CoinSelection,
+            paying recipients and sending the change, if any, to
+            change_script.
+
+            @param recipients : List of {'address','amount'} dicts.
+        """
+
+        tx = cls()
+        for unspent in selection.unspents:
+            tx.add_input(unspent.tx_hash,unspent.tx_output_n,value=unspent.value)
+        for recipient in recipients:
+            tx.add_output(recipient['amount'],recipient['address'])
+        if selection.change:
+            if change_script is None:
+                raise InvalidTransaction('The selection has change, but no change script was given')
+            tx.add_output(selection.change,change_script)
+        return tx
+
+    @property
+    def has_witness(self):
+        return any(tx_input.witness for tx_input in self.inputs)
+
+    def base_size(self):
+
+        """ Returns the size in bytes of the transaction without its
+            witness data.
+        """
+
+        return (8 + varint_size(len(self.inputs)) + varint_size(len(self.outputs)) +
+                sum(tx_input.size() for tx_input in self.inputs) +
+                sum(tx_output.size() for tx_output in self.outputs))
+
+    def size(self):
+
+        """ Returns the size in bytes of the serialized transaction."""
+
+        size = self.base_size()
+        if self.has_witness:
+            size += 2 + sum(tx_input.witness_size() for tx_input in self.inputs)
+        return size
+
+    def weight(self):
+        return self.base_size() * 3 + self.size()
+
+    def vsize(self):
+        return -(-self.weight() // 4)
+
+    def estimate_size(self,signed_input_size=SIGNED_INPUT_SIZE):
+
+        """ Returns the size the transaction will have once signed,
+            counting every input without a script as signed_input_size
+            bytes.
+        """
+
+        unsigned = sum(1 for tx_input in self.inputs if not tx_input.script)
+        return self.vsize() + unsigned * (signed_input_size - 41)
+
+    def estimate_fee(self,fee_rate,signed_input_size=SIGNED_INPUT_SIZE):
+
+        """ Returns the fee in satoshis of the signed transaction at
+            fee_rate satoshis per kilobyte.
+        """
+
+        return -(-self.estimate_size(signed_input_size) * fee_rate // 1000)
+
+    @property
+    def output_value(self):
+        return sum(tx_output.value for tx_output in self.outputs)
+
+    def fee(self):
+
+        """ Returns the fee paid, the value of the outputs spent
+            minus the value of the outputs, or None when the value of
+            an input is not known.
+        """
+
+        values = [tx_input.value for tx_input in self.inputs]
+        if None in values:
+            return None
+        return sum(values) - self.output_value
+
+    def serialize_into(self,buffer,offset=0,witness=True):
+
+        """ Writes the raw transaction into buffer at offset, returning
+            the offset following it.
+        """
+
+        witness = witness and self.has_witness
+        struct.pack_into('<i',buffer,offset,self.version)
+        offset += 4
+        if witness:
+            buffer[offset] = 0
+            buffer[offset + 1] = 1
+            offset += 2
+
+        offset = pack_varint(buffer,offset,len(self.inputs))
+        for tx_input in self.inputs:
+            buffer[offset:offset + 32] = tx_input.prev_hash
+            struct.pack_into('<I',buffer,offset + 32,tx_input.tx_output_n)
+            offset = pack_bytes(buffer,offset + 36,tx_input.script)
+            struct.pack_into('<I',buffer,offset,tx_input.sequence)
+            offset += 4
+
+        offset = pack_varint(buffer,offset,len(self.outputs))
+        for tx_output in self.outputs:
+            struct.pack_into('<q',buffer,offset,tx_output.value)
+            offset = pack_bytes(buffer,offset + 8,tx_output.script)
+
+        if witness:
+            for tx_input in self.inputs:
+                offset = pack_varint(buffer,offset,len(tx_input.witness))
+                for item in tx_input.witness:
+                    offset = pack_bytes(buffer,offset,item)
+
+        struct.pack_into('<I',buffer,offset,self.locktime)
+        return offset + 4
+
+    def serialize(self,witness=True):
+
+        """ Returns the raw transaction as bytes."""
+
+        size = self.size() if witness else self.base_size()
+        buffer = bytearray(size)
+        self.serialize_into(buffer,0,witness=witness)
+        return bytes(buffer)
+
+    @classmethod
+    def deserialize(cls,data):
+
+        """
+            Returns the Transaction of a raw transaction.
+
+            @param data : bytes, bytearray or memoryview of the raw
+                          transaction.
+        """
+
+        tx,offset = cls.deserialize_from(memoryview(data),0)
+        if offset != len(data):
+            raise InvalidTransaction('{n} bytes were left after the raw transaction'.format(n=len(data) - offset))
+        return tx
+
+    @classmethod
+    def deserialize_from(cls,view,offset=0):
+
+        """ Reads a transaction out of a memoryview at offset,
+            returning it and the offset following it.
+        """
+
+        try:
+            version = struct.unpack_from('<i',view,offset)[0]
+            offset += 4
+
+            witness = view[offset] == 0 and view[offset + 1] == 1
+            if witness:
+                offset += 2
+
+            count,offset = unpack_varint(view,offset)
+            inputs = []
+            for _ in range(count):
+                prev_hash = bytes(view[offset:offset + 32])
+                tx_output_n = struct.unpack_from('<I',view,offset + 32)[0]
+                script,offset = unpack_bytes(view,offset + 36)
+                sequence = struct.unpack_from('<I',view,offset)[0]
+                offset += 4
+                inputs.append(TxInput(prev_hash,tx_output_n,script,sequence))
+
+            count,offset = unpack_varint(view,offset)
+            outputs = []
+            for _ in range(count):
+                value = struct.unpack_from('<q',view,offset)[0]
+                script,offset = unpack_bytes(view,offset + 8)
+                outputs.append(TxOutput(value,script))
+
+            if witness:
+                for tx_input in inputs:
+                    items,offset = unpack_varint(view,offset)
+                    for _ in range(items):
+                        item,offset = unpack_bytes(view,offset)
+                        tx_input.witness.append(item)
+
+            locktime = struct.unpack_from('<I',view,offset)[0]
+            offset += 4
+        except (IndexError,struct.error):
+            raise InvalidTransaction('The raw transaction is truncated')
+
+        return cls(version=version,inputs=inputs,outputs=outputs,locktime=locktime),offset
+
+    @classmethod
+    def from_hex(cls,raw_hex):
+        return cls.deserialize(bytes.fromhex(raw_hex))
+
+    def to_hex(self):
+        return self.serialize().hex()
+
+    def sighash_parts(self,hashtype=SIGHASH_ALL):
+
+        """
+            Returns the (prefix,empty_inputs,suffix) bytes the legacy
+            signature hashes of the inputs are made of: the version and
+            input count, every input without a script, and the outputs,
+            locktime and hashtype.
+        """
+
+        if hashtype != SIGHASH_ALL:
+            raise InvalidTransaction('Only SIGHASH_ALL signature hashes are supported')
+
+        prefix = bytearray(4 + varint_size(len(self.inputs)))
+        struct.pack_into('<i',prefix,0,self.version)
+        pack_varint(prefix,4,len(self.inputs))
+
+        empty_inputs = bytearray(EMPTY_INPUT_SIZE * len(self.inputs))
+        offset = 0
+        for tx_input in self.inputs:
+            empty_inputs[offset:offset + 32] = tx_input.prev_hash
+            struct.pack_into('<IBI',empty_inputs,offset + 32,tx_input.tx_output_n,0,
+                             tx_input.sequence)
+            offset += EMPTY_INPUT_SIZE
+
+        suffix = bytearray(varint_size(len(self.outputs)) + 8 +
+                           sum(tx_output.size() for tx_output in self.outputs))
+        offset = pack_varint(suffix,0,len(self.outputs))
+        for tx_output in self.outputs:
+            struct.pack_into('<q',suffix,offset,tx_output.value)
+            offset = pack_bytes(suffix,offset + 8,tx_output.script)
+        struct.pack_into('<II',suffix,offset,self.locktime,hashtype)
+
+        return bytes(prefix),bytes(empty_inputs),bytes(suffix)
+
+    def signing_input(self,index,script_code):
+
+        """ Returns input index serialized with script_code, as it is
+            when signing it.
+        """
+
+        tx_input = self.inputs[index]
+        buffer = bytearray(40 + varint_size(len(script_code)) + len(script_code))
+        buffer[0:32] = tx_input.prev_hash
+        struct.pack_into('<I',buffer,32,tx_input.tx_output_n)
+        offset = pack_bytes(buffer,36,script_code)
+        struct.pack_into('<I',buffer,offset,tx_input.sequence)
+        return bytes(buffer)
+
+    def signature_hash(self,index,script_code,hashtype=SIGHASH_ALL):
+
+        """
+            Returns the legacy signature hash input index is signed
+            with.
+
+            @param script_code : Script of the output spent, the redeem
+                                 script of a P2SH output.
+        """
+
+        prefix,empty_inputs,suffix = self.sighash_parts(hashtype)
+        return signature_hashes(prefix,empty_inputs,suffix,
+                                [(index,self.signing_input(index,script_code))])[0]
+
+    @property
+    def txid(self):
+
+        """ Hex id of the transaction, its hash without witness data."""
+
+        return double_sha256(self.serialize(witness=False))[::-1].hex()
+
+    @property
+    def wtxid(self):
+        return double_sha256(self.serialize())[::-1].hex()
+
+    def __repr__(self):
+        return '<Transaction inputs:{i} outputs:{o} size:{s}>'.format(i=len(self.inputs),
+                                                                    o=len(self.outputs),
+                                                                    s=self.size())
@@ -0,0 +1,221 @@
+import abc
+import datetime
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from bitgo.errors import BitGoClientException
+
+__all__ = ['Transport','RequestsTransport','HTTP2Transport']
+
+
+class Transport(abc.ABC):
+
+    """
+        Sends the http requests of a BitGoClient.Subclasses implement
+        request().
+
+        request() receives the request ready to be sent and returns a
+        requests.Response(or an object with the same interface:
+        status_code, headers, content, elapsed, encoding,
+        raise_for_status(), iter_content() and close()).Failures need to
+        be raised as requests exceptions, so retries, circuit breaking
+        and error mapping work the same whatever the transport.
+    """
+
+    @abc.abstractmethod
+    def request(self,method,url,params=None,data=None,headers=None,
+                proxies=None,stream=False,timeout=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+
+    """ Transport sending requests through a requests Session,
+        one request per kept alive HTTP/1.1 connection at a time.
+        This is BitGoClient's default transport.
+    """
+
+    def __init__(self,session):
+        self.session = session
+
+    def request(self,method,url,params=None,data=None,headers=None,
+                proxies=None,stream=False,timeout=None):
+        return self.session.request(method,url,params=params,data=data,
+                                    headers=headers,proxies=proxies,
+                                    stream=stream,timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTP2Stream(object):
+
+    """ Stands in for urllib3's raw response so requests.Response
+        can stream the body of an httpx response.version is the http
+        version negotiated, 20 for HTTP/2 and 11 for HTTP/1.1.
+    """
+
+    def __init__(self,response):
+        self._response = response
+        self.version = 20 if response.http_version == 'HTTP/2' else 11
+
+    def stream(self,chunk_size,decode_content=True):
+        try:
+            for chunk in self._response.iter_bytes(chunk_size=chunk_size):
+                yield chunk
+        except httpx.TransportError as exc:
+            raise requests.exceptions.ChunkedEncodingError(exc)
+        finally:
+            self._response.close()
+
+    def close(self):
+        self._response.close()
+
+
+class HTTP2Transport(Transport):
+
+    """
+        Transport multiplexing requests over HTTP/2 connections.
+
+        Every request sent while others are in flight to the same host,
+        e.g. by the threads of get_many() or by several threads sharing
+        the client, travels as a new stream of the same connection
+        instead of waiting for a free connection or opening a new one.
+        Only HTTP/2 is spoken by default, so servers that don't negotiate
+        it fail.Passing http1=True falls back to HTTP/1.1 for them, at
+        the cost of plain http urls no longer using HTTP/2.
+
+        Requires the optional 'httpx' package with its 'h2' extra:
+            pip install httpx[http2]
+
+        Example:
+            transport = HTTP2Transport(max_connections=4)
+            client = BitGoClient(env='prod',transport=transport)
+            wallets = BitGoWallet.get_many(client,token,wallet_ids,concurrency=50)
+    """
+
+    def __init__(self,max_connections=10,max_keepalive_connections=10,
+                 keepalive_expiry=30.0,verify=True,http1=False):
+
+        """
+            @param max_connections : Maximum number of connections per
+                                     proxy(or direct) route.
+
+            @param max_keepalive_connections : Idle connections kept open.
+
+            @param keepalive_expiry : Seconds an idle connection is kept.
+
+            @param verify : Whether to verify TLS certificates, or the path
+                            to a CA bundle.
+
+            @param http1 : Also offer HTTP/1.1 when negotiating with the
+                           server, so servers without HTTP/2 still work.
+                           By default only HTTP/2 is offered over TLS,
+                           and plain http requests use HTTP/2 with prior
+                           knowledge.With http1=True plain http requests
+                           use HTTP/1.1.
+        """
+
+        if httpx is None:
+            raise BitGoClientException('HTTP2Transport requires the httpx package.'\
+                                       'Install it with: pip install httpx[http2]')
+
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.verify = verify
+        self.http1 = http1
+
+        #httpx binds proxies to its clients, so there is one per proxy url
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client(self,proxies):
+        proxy = (proxies.get('https') or proxies.get('http')) if proxies else None
+        client = self._clients.get(proxy,None)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(proxy,None)
+                if client is None:
+                    client = httpx.Client(http1=self.http1,http2=True,proxy=proxy,
+                                          limits=self.limits,verify=self.verify)
+                    self._clients[proxy] = client
+        return client
+
+    @staticmethod
+    def _timeout(timeout):
+        if timeout is None:
+            return httpx.Timeout(None)
+        if not isinstance(timeout,tuple):
+            timeout = (timeout,timeout)
+        connect,read = timeout
+        return httpx.Timeout(connect=connect,read=read,write=read,pool=connect)
+
+    def _to_response(self,request,response,stream,elapsed):
+
+        """ Wraps an httpx response into a requests.Response."""
+
+        wrapped = requests.Response()
+        wrapped.status_code = response.status_code
+        wrapped.headers = CaseInsensitiveDict(response.headers.multi_items())
+        wrapped.url = str(response.url)
+        wrapped.reason = response.reason_phrase
+        wrapped.encoding = response.charset_encoding
+        wrapped.elapsed = datetime.timedelta(seconds=elapsed)
+        wrapped.request = request
+        wrapped.raw = HTTP2Stream(response)
+
+        if not stream:
+            wrapped._content = response.content
+            wrapped._content_consumed = True
+        return wrapped
+
+    def request(self,method,url,params=None,data=None,headers=None,
+                proxies=None,stream=False,timeout=None):
+
+        client = self._client(proxies)
+        prepared = requests.Request(method.upper(),url,params=params,data=data,
+                                    headers=headers).prepare()
+
+        start = time.perf_counter()
+        try:
+            request = client.build_request(prepared.method,prepared.url,
+                                           content=prepared.body,headers=headers,
+                                           timeout=self._timeout(timeout))
+            response = client.send(request,stream=True)
+            elapsed = time.perf_counter() - start
+            if not stream:
+                try:
+                    response.read()
+                finally:
+                    response.close()
+        except httpx.ConnectTimeout as exc:
+            raise requests.exceptions.ConnectTimeout(exc,request=prepared)
+        except httpx.TimeoutException as exc:
+            raise requests.exceptions.ReadTimeout(exc,request=prepared)
+        except httpx.ProxyError as exc:
+            raise requests.exceptions.ProxyError(exc,request=prepared)
+        except httpx.TransportError as exc:
+            raise requests.exceptions.ConnectionError(exc,request=prepared)
+        except httpx.HTTPError as exc:
+            raise requests.exceptions.RequestException(exc,request=prepared)
+
+        return self._to_response(prepared,response,stream,elapsed)
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients = {}
+        for client in clients:
+            client.close()
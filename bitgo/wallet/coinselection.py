@@ -0,0 +1,418 @@
+import random
+
+from bitgo.errors import BitGoResourceException,InsufficientFunds
+
+__all__ = ['CoinSelection','CoinSelector']
+
+
+class CoinSelection(object):
+
+    """ The unspents picked to fund an amount, and what is left
+        for fees and change.
+    """
+
+    __slots__ = ('unspents','amount','value','fee','change','strategy')
+
+    def __init__(self,unspents,amount,value,fee,change,strategy):
+        self.unspents = unspents
+        self.amount = amount
+        #Total value of the unspents
+        self.value = value
+        self.fee = fee
+        #Value of the change output, 0 when there is none
+        self.change = change
+        self.strategy = strategy
+
+    @property
+    def outpoints(self):
+        return [unspent.outpoint for unspent in self.unspents]
+
+    def __len__(self):
+        return len(self.unspents)
+
+    def __repr__(self):
+        return '<CoinSelection {s} inputs:{n} amount:{a} fee:{f} change:{c}>'.format(s=self.strategy,
+                                                                                  n=len(self.unspents),
+                                                                                  a=self.amount,
+                                                                                  f=self.fee,
+                                                                                  c=self.change)
+
+
+class CoinSelector(object):
+
+    """
+        Picks the unspents of an UnspentIndex funding an amount at a
+        fee rate, without any request to BitGo's API.
+
+        Unspents are compared by their effective value, their value
+        minus the fee of spending them.Every input of a wallet has the
+        same size, so the effective values keep the order of the index
+        and the unspents worth spending are found with a binary search,
+        whatever the size of the wallet.
+
+        Strategies:
+            'branch_and_bound' = searches for a set of unspents matching
+                                 the amount closely enough to do without
+                                 a change output(the change would cost
+                                 more than it is worth)
+            'knapsack' = the smallest unspent covering the amount, or
+                         the best of random subsets of the unspents
+                         smaller than the amount, whichever wastes less
+            'largest_first' = the largest unspents until the amount is
+                              covered, fewest inputs
+            'auto' = branch_and_bound, then knapsack when there is no
+                     changeless match
+
+        A strategy finding no match falls back to largest_first, and the
+        strategy actually used is kept in CoinSelection.strategy.
+
+        Example:
+            selector = CoinSelector(fee_rate=20000,min_confirms=1)
+            selection = selector.select(index,150000)
+            print(selection.outpoints,selection.fee,selection.change)
+    """
+
+    BRANCH_AND_BOUND = 'branch_and_bound'
+    KNAPSACK = 'knapsack'
+    LARGEST_FIRST = 'largest_first'
+    AUTO = 'auto'
+    STRATEGIES = (BRANCH_AND_BOUND,KNAPSACK,LARGEST_FIRST,AUTO)
+
+    #Sizes in bytes of a transaction spending P2SH 2 of 3 multisig
+    #unspents to P2SH or P2PKH outputs
+    INPUT_SIZE = 297
+    OUTPUT_SIZE = 34
+    OVERHEAD_SIZE = 10
+    DUST_THRESHOLD = 546
+
+    def __init__(self,fee_rate=10000,min_confirms=1,input_size=INPUT_SIZE,
+                 output_size=OUTPUT_SIZE,overhead_size=OVERHEAD_SIZE,
+                 dust_threshold=DUST_THRESHOLD,max_tries=20000,
+                 knapsack_candidates=256,knapsack_iterations=200,seed=None):
+
+        """
+            @param fee_rate : Fee in satoshis per kilobyte, like BitGo's
+                              feeRate param.
+
+            @param min_confirms : Confirmations needed by an unspent to be
+                                  picked.
+
+            @param input_size : Bytes added to the transaction by every
+                                input.
+
+            @param output_size : Bytes added by every output, change
+                                 included.
+
+            @param overhead_size : Bytes of the transaction without any
+                                   input or output.
+
+            @param dust_threshold : Smallest change output created, smaller
+                                    change goes to the fee.
+
+            @param max_tries : Branches the branch and bound search visits
+                               before giving up.
+
+            @param knapsack_candidates : Largest unspents smaller than the
+                                         amount the knapsack random subsets
+                                         are drawn from.
+
+            @param knapsack_iterations : Random subsets tried by knapsack.
+
+            @param seed : Seed of the knapsack random subsets, so selections
+                          can be reproduced.
+        """
+
+        if fee_rate < 0:
+            raise BitGoResourceException('fee_rate can not be negative')
+
+        self.fee_rate = fee_rate
+        self.min_confirms = min_confirms
+        self.input_size = input_size
+        self.output_size = output_size
+        self.overhead_size = overhead_size
+        self.dust_threshold = dust_threshold
+        self.max_tries = max_tries
+        self.knapsack_candidates = knapsack_candidates
+        self.knapsack_iterations = knapsack_iterations
+        self.random = random.Random(seed)
+
+    def fee(self,size):
+
+        """ Returns the fee in satoshis of size bytes."""
+
+        return -(-size * self.fee_rate // 1000)
+
+    @property
+    def input_fee(self):
+        return self.fee(self.input_size)
+
+    @property
+    def cost_of_change(self):
+
+        """ Fee of adding a change output and of spending it later."""
+
+        return self.fee(self.output_size) + self.input_fee
+
+    def size(self,inputs,outputs):
+
+        """ Returns the size in bytes of a transaction."""
+
+        return self.overhead_size + inputs * self.input_size + outputs * self.output_size
+
+    def target(self,amount,outputs=1):
+
+        """ Returns the effective value the inputs need to add up to
+            for amount paid to outputs outputs.
+        """
+
+        return amount + self.fee(self.overhead_size + outputs * self.output_size)
+
+    def _candidates(self,index,max_value=None):
+
+        """
+            Returns the positions and effective values of the unspents
+            worth spending, up to max_value effective value, largest
+            first.
+        """
+
+        input_fee = self.input_fee
+        start = index.position(input_fee + 1)
+        end = len(index) if max_value is None else index.position(max_value + input_fee + 1)
+
+        values = index.values[start:end]
+        max_height = index.max_height(self.min_confirms)
+        if max_height >= index.UNCONFIRMED:
+            positions = range(end - 1,start - 1,-1)
+            effective = [value - input_fee for value in reversed(values)]
+        else:
+            heights = index.heights[start:end]
+            positions = []
+            effective = []
+            for offset in range(len(values) - 1,-1,-1):
+                if heights[offset] <= max_height:
+                    positions.append(start + offset)
+                    effective.append(values[offset] - input_fee)
+
+        return positions,effective
+
+    def _selection(self,index,positions,amount,target,outputs,strategy):
+        unspents = [index.unspent(position) for position in positions]
+        value = sum(unspent.value for unspent in unspents)
+
+        excess = value - len(unspents) * self.input_fee - target
+        change_fee = self.fee(self.output_size)
+        change = excess - change_fee
+        if change < self.dust_threshold:
+            change = 0
+
+        return CoinSelection(unspents=unspents,
+                             amount=amount,
+                             value=value,
+                             fee=value - amount - change,
+                             change=change,
+                             strategy=strategy)
+
+    def largest_first(self,index,target):
+
+        """ Returns the positions of the largest unspents covering
+            target, or None.
+        """
+
+        input_fee = self.input_fee
+        max_height = index.max_height(self.min_confirms)
+        values = index.values
+        heights = index.heights
+
+        positions = []
+        total = 0
+        position = len(values) - 1
+        while position >= 0 and values[position] > input_fee:
+            if heights[position] <= max_height:
+                positions.append(position)
+                total += values[position] - input_fee
+                if total >= target:
+                    return positions
+            position -= 1
+        return None
+
+    def branch_and_bound(self,index,target):
+
+        """
+            Returns the positions of unspents whose effective values add
+            up to target, or less than cost_of_change above it, or None.
+            Depth first search over the candidates, largest first,
+            keeping the match wasting the least.
+        """
+
+        cost_of_change = self.cost_of_change
+        positions,effective = self._candidates(index,max_value=target + cost_of_change)
+
+        available = sum(effective)
+        if available < target:
+            return None
+
+        count = len(effective)
+        selected = []
+        value = 0
+        best = None
+        best_waste = None
+
+        for _ in range(self.max_tries):
+            backtrack = False
+            if value + available < target or value > target + cost_of_change:
+                backtrack = True
+            elif value >= target:
+                waste = value - target
+                if best is None or waste < best_waste:
+                    best = [positions[i] for i,included in enumerate(selected) if included]
+                    best_waste = waste
+                    if waste == 0:
+                        break
+                backtrack = True
+
+            if backtrack:
+                #Walk back to the last candidate included and leave it out
+                while selected and not selected[-1]:
+                    selected.pop()
+                    available += effective[len(selected)]
+                if not selected:
+                    break
+                selected[-1] = False
+                value -= effective[len(selected) - 1]
+            else:
+                depth = len(selected)
+                if depth == count:
+                    break
+                available -= effective[depth]
+                #Including a candidate worth the same as the one just left
+                #out would visit the same sums again
+                if selected and not selected[-1] and effective[depth] == effective[depth - 1]:
+                    selected.append(False)
+                else:
+                    selected.append(True)
+                    value += effective[depth]
+
+        return best
+
+    def _best_subset(self,effective,target):
+        best = [True] * len(effective)
+        best_value = sum(effective)
+        rng = self.random
+
+        for _ in range(self.knapsack_iterations):
+            if best_value == target:
+                break
+            included = [False] * len(effective)
+            value = 0
+            reached = False
+            #First pass picks candidates at random, the second fills the gaps
+            for second_pass in (False,True):
+                if reached:
+                    break
+                for i,candidate in enumerate(effective):
+                    if included[i] or (not second_pass and rng.random() < 0.5):
+                        continue
+                    value += candidate
+                    included[i] = True
+                    if value >= target:
+                        reached = True
+                        if value < best_value:
+                            best_value = value
+                            best = list(included)
+                        value -= candidate
+                        included[i] = False
+
+        return best,best_value
+
+    def knapsack(self,index,target):
+
+        """
+            Returns the positions of the unspents covering target with
+            the least excess out of the smallest unspent larger than
+            target and random subsets of the largest unspents smaller
+            than it, or None.
+        """
+
+        input_fee = self.input_fee
+        min_change = self.dust_threshold + self.fee(self.output_size)
+
+        larger_position = None
+        lowest_larger = index.find(target + input_fee,min_confirms=self.min_confirms)
+        if lowest_larger is not None:
+            larger_position = self._position_of(index,lowest_larger)
+            if lowest_larger.value - input_fee == target:
+                return [larger_position]
+
+        positions,effective = self._candidates(index,max_value=target - 1)
+        positions = positions[:self.knapsack_candidates]
+        effective = effective[:self.knapsack_candidates]
+
+        total = sum(effective)
+        if total == target:
+            return list(positions)
+        if total < target:
+            if larger_position is not None:
+                return [larger_position]
+            #Only more than knapsack_candidates small unspents can cover it
+            return self.largest_first(index,target)
+
+        best,best_value = self._best_subset(effective,target)
+        if best_value != target and total >= target + min_change:
+            best,best_value = self._best_subset(effective,target + min_change)
+
+        if larger_position is not None and (best_value != target and
+                                            lowest_larger.value - input_fee <= best_value):
+            return [larger_position]
+
+        return [positions[i] for i,included in enumerate(best) if included]
+
+    @staticmethod
+    def _position_of(index,unspent):
+        position = index.position(unspent.value)
+        while index.unspent(position).outpoint != unspent.outpoint:
+            position += 1
+        return position
+
+    def select(self,index,amount,outputs=1,strategy=AUTO):
+
+        """
+            Returns the CoinSelection of index's unspents paying amount
+            to outputs outputs, raising InsufficientFunds when the
+            unspents can't cover it.
+
+            @param index : An UnspentIndex.
+
+            @param amount : Satoshis paid, excluding fees.
+
+            @param outputs : Number of outputs paid, change excluded.
+
+            @param strategy : One of STRATEGIES.
+        """
+
+        if strategy not in self.STRATEGIES:
+            raise BitGoResourceException('Invalid coin selection strategy:{s}.Valid strategies '\
+                                         'are {names}'.format(s=strategy,names=', '.join(self.STRATEGIES)))
+
+        target = self.target(amount,outputs)
+
+        positions = None
+        used = strategy
+        if strategy in (self.BRANCH_AND_BOUND,self.AUTO):
+            used = self.BRANCH_AND_BOUND
+            positions = self.branch_and_bound(index,target)
+        if positions is None and strategy in (self.KNAPSACK,self.AUTO):
+            used = self.KNAPSACK
+            positions = self.knapsack(index,target)
+        if positions is None:
+            #Nothing better was found, the unspents still cover amount
+            #unless even the largest ones don't
+            used = self.LARGEST_FIRST
+            positions = self.largest_first(index,target)
+
+        if positions is None:
+            raise InsufficientFunds('The unspents of wallet {w} can not pay {a} satoshis '\
+                                    'at a fee rate of {r} satoshis/kB'.format(w=index.wallet_id,
+                                                                               a=amount,
+                                                                               r=self.fee_rate))
+
+        return self._selection(index,positions,amount,target,outputs,used)
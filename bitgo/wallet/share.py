@@ -41,11 +41,14 @@ class BitGoWalletShare(BitGoResource,CRUDMixin,ListMixin):
 
     """
 
-        ENDPOINT = {'CREATE':,
-                    'READ':,
-                    'UPDATE':,
-                    'DELETE':,
-                    'LIST':,
+    __slots__ = ()
+
+    ENDPOINT = {'CREATE':('wallet/:id/share','POST'),
+                'READ':('walletshare/:id','GET'),
+                'UPDATE':('walletshare/:id','POST'),
+                'DELETE':('walletshare/:id','DELETE'),
+                'LIST':('walletshare','GET')}
+
     @classmethod
     def share_wallet(cls,email,permissions,wallet_password,skip_keychain,disable_email):
 
@@ -133,11 +136,9 @@ class BitGoWalletShare(BitGoResource,CRUDMixin,ListMixin):
 
         """
 
-        client.request_resource(action='LIST',
-                                client=client,
-                                access_token=access_token,
+        cls.validate_requirements(client=client,access_token=access_token)
+        return cls.request_resource('LIST',client,access_token,not retrieve)
 
- 
     def accept_share(self):
 
         """
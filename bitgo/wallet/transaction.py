@@ -0,0 +1,386 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from bitgo.deadline import Deadline
+from bitgo.errors import (BitGoException,BitGoResourceException,HttpError,
+                          InsufficientFunds,InvalidTransaction)
+from bitgo.signing import TransactionSigner
+from bitgo.transaction import Transaction,address_script
+from bitgo.wallet.coinselection import CoinSelector
+from bitgo.wallet.wallet import BitGoWallet
+
+__all__ = ['SendBatch','SendOutcome','SendManyBuilder','sign_selection']
+
+
+def sign_selection(signer,selection,recipients,keys,change_address=None):
+
+    """
+        Returns the Transaction spending a CoinSelection and paying
+        recipients, every input signed by a TransactionSigner with the
+        user key.BitGo adds the second signature when it is sent.
+
+        The redeem script of every input is read from the
+        'redeemScript' hex of the unspent's details, so the
+        UnspentIndex needs to keep them.
+
+        @param keys : The 32 byte private key signing every input, or a
+                      callable returning the key of an Unspent.
+
+        @param change_address : Address the change, if any, is sent to.
+    """
+
+    tx = Transaction.from_selection(selection,recipients,change_address)
+
+    redeem_scripts = []
+    for unspent in selection.unspents:
+        redeem_script = (unspent.details or {}).get('redeemScript',None)
+        if not redeem_script:
+            raise InvalidTransaction('No redeem script for unspent {h}:{n}'.format(h=unspent.tx_hash,
+                                                                                  n=unspent.tx_output_n))
+        redeem_scripts.append(bytes.fromhex(redeem_script))
+
+    if callable(keys):
+        keys = [keys(unspent) for unspent in selection.unspents]
+
+    signer.sign_multisig(tx,keys,redeem_scripts)
+    return tx
+
+
+class SendBatch(object):
+
+    """ Recipients paid by one transaction, and the unspents
+        selected to fund it.
+    """
+
+    __slots__ = ('number','positions','recipients','selection','size')
+
+    def __init__(self,number,positions,recipients,selection,size):
+        self.number = number
+        #Positions of the recipients in the list given to the builder
+        self.positions = positions
+        self.recipients = recipients
+        self.selection = selection
+        #Estimated size of the transaction in bytes
+        self.size = size
+
+    @property
+    def amount(self):
+        return sum(recipient['amount'] for recipient in self.recipients)
+
+    def __len__(self):
+        return len(self.recipients)
+
+    def __repr__(self):
+        return '<SendBatch {n} recipients:{r} inputs:{i} size:{s}>'.format(n=self.number,
+                                                                        r=len(self.recipients),
+                                                                        i=len(self.selection),
+                                                                        s=self.size)
+
+
+class SendOutcome(object):
+
+    """ What became of the payment to one recipient."""
+
+    __slots__ = ('recipient','batch','tx_hash','error')
+
+    def __init__(self,recipient,batch=None,tx_hash=None,error=None):
+        self.recipient = recipient
+        #Number of the SendBatch paying the recipient, None if unbatched
+        self.batch = batch
+        self.tx_hash = tx_hash
+        #The BitGoException the payment failed with
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return '<SendOutcome {a} failed:{e!r}>'.format(a=self.recipient['address'],e=self.error)
+        return '<SendOutcome {a} tx:{h}>'.format(a=self.recipient['address'],h=self.tx_hash)
+
+
+class SendManyBuilder(object):
+
+    """
+        Pays many recipients out of a wallet with as few transactions
+        as possible.
+
+        Recipients are packed, in order, into batches as large as the
+        size limit of a transaction allows once the inputs funding them
+        are accounted for.The unspents of every batch are selected once,
+        out of the wallet's UnspentIndex, and taken out of it right away
+        so no two batches spend the same output.The batches are then
+        sent concurrently to the wallet's sendmany endpoint, with the
+        unspents they were given, and every recipient gets a SendOutcome.
+
+        sendmany is served by BitGo Express, which signs the
+        transactions, so the client needs to point to it.When the user
+        keys are given instead, every batch is built and signed here by
+        a TransactionSigner and sent to BitGo's tx/send endpoint, which
+        adds its own signature.
+
+        Example:
+            index = UnspentIndex(wallet_id)
+            index.sync(client,token)
+            builder = SendManyBuilder(index,CoinSelector(fee_rate=20000))
+            outcomes = builder.send(client,token,
+                                    [{'address':address,'amount':amount},...],
+                                    wallet_passphrase=passphrase)
+            failed = [outcome for outcome in outcomes if not outcome.ok]
+
+            #Signing locally, large batches across a process pool
+            with TransactionSigner(processes=4) as signer:
+                outcomes = builder.send(client,token,recipients,keys=user_key,
+                                        signer=signer,change_address=address)
+    """
+
+    #Largest standard transaction relayed by bitcoin nodes
+    MAX_SIZE = 100000
+
+    def __init__(self,index,selector=None,max_size=MAX_SIZE,max_recipients=None,
+                 strategy=CoinSelector.AUTO):
+
+        """
+            @param index : The wallet's UnspentIndex.
+
+            @param selector : CoinSelector picking the unspents of every
+                              batch, with the fee rate paid.
+
+            @param max_size : Maximum size in bytes of a transaction.
+
+            @param max_recipients : Optional maximum number of recipients
+                                    per transaction.
+
+            @param strategy : Coin selection strategy of every batch.
+        """
+
+        self.index = index
+        self.selector = selector or CoinSelector()
+        self.max_size = max_size
+        self.max_recipients = max_recipients
+        self.strategy = strategy
+
+    @staticmethod
+    def _validate(recipient):
+        if not isinstance(recipient,dict) or 'address' not in recipient or 'amount' not in recipient:
+            raise BitGoResourceException('Every recipient needs to be a dict with '\
+                                         'an address and an amount')
+
+        address = recipient['address']
+        try:
+            if not isinstance(address,str):
+                raise InvalidTransaction('Addresses are base58 strings')
+            address_script(address)
+        except InvalidTransaction as exc:
+            raise BitGoResourceException('Invalid address for recipient:{a}.{e}'.format(a=address,e=exc))
+
+        amount = recipient['amount']
+        if not isinstance(amount,int) or isinstance(amount,bool) or amount <= 0:
+            raise BitGoResourceException('Invalid amount for recipient:{a}.Amounts are '\
+                                         'positive integers in satoshis'.format(a=address))
+
+    def _fitting(self,count):
+
+        """ Returns the most recipients a transaction can pay with a
+            single input and a change output.
+        """
+
+        selector = self.selector
+        room = self.max_size - selector.size(inputs=1,outputs=1)
+        fitting = max(1,room // selector.output_size)
+        if self.max_recipients:
+            fitting = min(fitting,self.max_recipients)
+        return min(count,fitting)
+
+    def _select(self,recipients):
+
+        """ Returns the number of recipients, CoinSelection and size
+            of the largest batch out of the head of recipients that fits
+            in max_size and can be funded.
+        """
+
+        selector = self.selector
+        count = self._fitting(len(recipients))
+        while True:
+            amount = sum(recipient['amount'] for recipient in recipients[:count])
+            try:
+                selection = selector.select(self.index,amount,outputs=count,strategy=self.strategy)
+            except InsufficientFunds:
+                if count == 1:
+                    raise
+                count = max(1,count // 2)
+                continue
+
+            size = selector.size(inputs=len(selection),
+                                 outputs=count + (1 if selection.change else 0))
+            if size <= self.max_size:
+                return count,selection,size
+
+            if count == 1:
+                raise BitGoResourceException('Paying {a} needs more inputs than a transaction '\
+                                             'of {s} bytes can hold'.format(a=recipients[0]['address'],
+                                                                            s=self.max_size))
+
+            #Fewer recipients also need fewer inputs
+            count = max(1,min(count - 1,count * self.max_size // size))
+
+    def build(self,recipients):
+
+        """
+            Packs recipients into SendBatches, taking the unspents of
+            every batch out of the index.Returns the batches and the
+            SendOutcome of every recipient, the ones that could not be
+            batched already holding their error.
+
+            @param recipients : List of {'address','amount'} dicts,
+                                amounts in satoshis.
+        """
+
+        recipients = list(recipients)
+        for recipient in recipients:
+            self._validate(recipient)
+
+        outcomes = [SendOutcome(recipient) for recipient in recipients]
+        batches = []
+
+        start = 0
+        while start < len(recipients):
+            try:
+                count,selection,size = self._select(recipients[start:])
+            except BitGoResourceException as exc:
+                #The recipient can't be paid, the ones after it might
+                outcomes[start].error = exc
+                start += 1
+                continue
+
+            self.index.spend(selection.outpoints)
+
+            positions = list(range(start,start + count))
+            batch = SendBatch(number=len(batches),
+                              positions=positions,
+                              recipients=recipients[start:start + count],
+                              selection=selection,
+                              size=size)
+            batches.append(batch)
+            for position in positions:
+                outcomes[position].batch = batch.number
+            start += count
+
+        return batches,outcomes
+
+    def payload(self,batch,**params):
+
+        """ Returns the sendmany request data of a batch."""
+
+        data = {'recipients':[{'address':recipient['address'],'amount':recipient['amount']}
+                              for recipient in batch.recipients],
+                'unspents':['{h}:{n}'.format(h=unspent.tx_hash,n=unspent.tx_output_n)
+                            for unspent in batch.selection.unspents],
+                'feeRate':self.selector.fee_rate,
+                'minConfirms':self.selector.min_confirms}
+        data.update(params)
+        return data
+
+    def sign(self,batch,keys,signer,change_address=None):
+
+        """ Returns the Transaction of a batch, signed with keys.See
+            sign_selection().
+        """
+
+        return sign_selection(signer,batch.selection,batch.recipients,keys,change_address)
+
+    def send(self,client,access_token,recipients,wallet_passphrase=None,
+             concurrency=4,deadline=None,keys=None,signer=None,change_address=None,
+             **params):
+
+        """
+            Builds the batches paying recipients and sends them through
+            the client, at most concurrency at once.Returns the list of
+            SendOutcomes, in the same order as recipients.
+
+            The unspents of a batch rejected by BitGo with a 4xx http
+            status, or failing before its request was sent(e.g. an open
+            circuit, an unavailable proxy, a deadline already passed or
+            a transaction that could not be signed), are put back into
+            the index.The ones of a batch failing any
+            other way, e.g. a 5xx status or a timeout, are left out until
+            the next sync, since the transaction might have gone through.
+
+            @param wallet_passphrase : Passphrase BitGo Express decrypts
+                                       the wallet's user key with.Not
+                                       sent when signing locally.
+
+            @param concurrency : Maximum number of batches in flight.
+
+            @param deadline : Optional seconds(or a Deadline) for sending
+                              every batch.
+
+            @param keys : Optional user key signing the batches locally
+                          instead of BitGo Express, see sign_selection().
+
+            @param signer : TransactionSigner signing the batches with
+                            keys.Defaults to one closed once they are
+                            sent.
+
+            @param change_address : Address of the change of batches
+                                    signed locally.
+
+            @param **params : Extra sendmany params sent with every
+                              batch, e.g. message or otp.
+        """
+
+        BitGoWallet.validate_requirements(client=client,access_token=access_token)
+        deadline = Deadline.coerce(deadline)
+
+        if wallet_passphrase is not None and keys is None:
+            params['walletPassphrase'] = wallet_passphrase
+
+        batches,outcomes = self.build(recipients)
+        if not batches:
+            return outcomes
+
+        own_signer = keys is not None and signer is None
+        if own_signer:
+            signer = TransactionSigner()
+
+        def signed(batch):
+            try:
+                tx = self.sign(batch,keys,signer,change_address)
+            except BitGoException as exc:
+                exc.sent = False
+                raise
+            return BitGoWallet.request_resource('SEND_TRANSACTION',client,access_token,True,
+                                                deadline=deadline,tx=tx.to_hex(),**params)
+
+        def submit(batch):
+            try:
+                if keys is not None:
+                    return signed(batch)
+                return BitGoWallet.request_resource('SEND_MANY',client,access_token,True,
+                                                    self.index.wallet_id,deadline=deadline,
+                                                    **self.payload(batch,**params))
+            except BitGoException as exc:
+                rejected = (isinstance(exc,HttpError) and exc.status_code is not None and
+                            400 <= exc.status_code < 500)
+                if rejected or exc.sent is False:
+                    self.index.restore(batch.selection.unspents)
+                return exc
+
+        workers = max(1,min(concurrency,len(batches)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                responses = list(executor.map(submit,batches))
+        finally:
+            if own_signer:
+                signer.close()
+
+        for batch,response in zip(batches,responses):
+            for position in batch.positions:
+                if isinstance(response,BitGoException):
+                    outcomes[position].error = response
+                else:
+                    #sendmany answers with 'hash', tx/send with 'transactionHash'
+                    outcomes[position].tx_hash = response.get('hash',response.get('transactionHash',None))
+
+        return outcomes
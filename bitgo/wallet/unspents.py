@@ -0,0 +1,559 @@
+import array
+import threading
+
+from bitgo.deadline import Deadline
+from bitgo.errors import BitGoResourceException
+from bitgo.wallet.wallet import BitGoWallet
+
+__all__ = ['Unspent','UnspentIndex']
+
+
+class Unspent(object):
+
+    """ An unspent output of an UnspentIndex."""
+
+    __slots__ = ('tx_hash','tx_output_n','value','height','details')
+
+    def __init__(self,tx_hash,tx_output_n,value,height=None,details=None):
+        self.tx_hash = tx_hash
+        self.tx_output_n = tx_output_n
+        self.value = value
+        #None while unconfirmed
+        self.height = height
+        #The json the output was last seen in, if it was kept
+        self.details = details
+
+    @property
+    def outpoint(self):
+        return (self.tx_hash,self.tx_output_n)
+
+    def __repr__(self):
+        return '<Unspent {h}:{n} value:{v} height:{height}>'.format(h=self.tx_hash,
+                                                                 n=self.tx_output_n,
+                                                                 v=self.value,
+                                                                 height=self.height)
+
+
+class UnspentIndex(object):
+
+    """
+        Local index of the unspent outputs of a wallet, so sends can
+        pick their inputs in memory instead of listing every unspent
+        through BitGo's API each time.
+
+        Outputs are kept in parallel arrays(value, block height, output
+        index and the raw 32 byte transaction hash) sorted by value and
+        then by confirmation, oldest first, unconfirmed outputs last.
+        Looking an amount up is a binary search, and adding or removing
+        an output moves a slice of the arrays instead of resorting them.
+
+        The first sync() pages through the wallet's unspents.Later ones
+        only request the wallet's transactions since the last block
+        height seen, minus REORG_DEPTH blocks, adding the wallet's new
+        outputs and dropping the ones spent since.Outputs spent by a
+        transaction the index was not told about yet can be dropped right
+        away with spend(), e.g. once a send went through.
+
+        Example:
+            index = UnspentIndex(wallet_id)
+            index.sync(client,token)
+            unspent = index.find(150000,min_confirms=1)
+            ...
+            index.sync(client,token)
+    """
+
+    #Heights stored for unconfirmed outputs, sorting them last
+    UNCONFIRMED = 2 ** 31 - 1
+    #Blocks synced again on every incremental sync, in case of a reorg
+    REORG_DEPTH = 6
+    PAGE_SIZE = 500
+    #Batches of add_many() larger than this are merged with a sort
+    BULK_THRESHOLD = 64
+
+    def __init__(self,wallet_id,keep_details=True):
+
+        """
+            @param wallet_id : Id of the BitGo wallet indexed.
+
+            @param keep_details : Whether the json of every output
+                                  (address, chainPath, script,...) is kept
+                                  along with it, as Unspent.details.
+        """
+
+        self.wallet_id = wallet_id
+        self.keep_details = keep_details
+        #Last block height seen, None until synced once
+        self.height = None
+        self.synced = False
+
+        self._values = array.array('q')
+        self._heights = array.array('i')
+        self._vouts = array.array('I')
+        self._hashes = bytearray()
+        #(tx_hash,tx_output_n) -> (value,height) of every output indexed
+        self._outpoints = {}
+        self._details = {}
+        #Outputs spent locally, waiting for their spending transaction
+        self._spent = set()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self,outpoint):
+        return tuple(outpoint) in self._outpoints
+
+    def __iter__(self):
+
+        """ Iterates over every Unspent, smallest value first, as they
+            were when the iteration started.
+        """
+
+        with self._lock:
+            unspents = [self.unspent(position) for position in range(len(self._values))]
+        return iter(unspents)
+
+    def _search(self,value,height):
+
+        """ Returns the position (value,height) sorts at, before any
+            equal output.
+        """
+
+        values = self._values
+        heights = self._heights
+        low,high = 0,len(values)
+        while low < high:
+            middle = (low + high) // 2
+            if values[middle] < value or (values[middle] == value and heights[middle] < height):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _locate(self,tx_hash,tx_output_n):
+        entry = self._outpoints.get((tx_hash,tx_output_n),None)
+        if entry is None:
+            return None
+
+        value,height = entry
+        raw = bytes.fromhex(tx_hash)
+        position = self._search(value,height)
+        while position < len(self._values) and self._values[position] == value:
+            if (self._vouts[position] == tx_output_n and
+                    self._hashes[position * 32:position * 32 + 32] == raw):
+                return position
+            position += 1
+
+        raise BitGoResourceException('The unspent index of wallet {w} is corrupted, '\
+                                     '{h}:{n} is missing'.format(w=self.wallet_id,
+                                                                 h=tx_hash,n=tx_output_n))
+
+    def add(self,tx_hash,tx_output_n,value,height=None,details=None):
+
+        """
+            Adds an unspent output, or updates it when it is already
+            indexed.
+
+            @param height : Block height of its transaction, None while
+                            unconfirmed.
+        """
+
+        stored_height = self.UNCONFIRMED if height is None else height
+        outpoint = (tx_hash,tx_output_n)
+
+        with self._lock:
+            if outpoint in self._spent:
+                return
+
+            if outpoint in self._outpoints:
+                if self._outpoints[outpoint] == (value,stored_height):
+                    if details is not None and self.keep_details:
+                        self._details[outpoint] = details
+                    return
+                self._delete(outpoint)
+
+            position = self._search(value,stored_height)
+            self._values.insert(position,value)
+            self._heights.insert(position,stored_height)
+            self._vouts.insert(position,tx_output_n)
+            self._hashes[position * 32:position * 32] = bytes.fromhex(tx_hash)
+            self._outpoints[outpoint] = (value,stored_height)
+            if details is not None and self.keep_details:
+                self._details[outpoint] = details
+
+    def add_many(self,unspents):
+
+        """
+            Adds or updates several outputs at once.Large batches are
+            merged into the index with a single sort instead of one
+            insertion each.
+
+            @param unspents : Iterable of (tx_hash,tx_output_n,value,
+                              height,details) tuples.
+        """
+
+        with self._lock:
+            batch = {}
+            for tx_hash,tx_output_n,value,height,details in unspents:
+                outpoint = (tx_hash,tx_output_n)
+                if outpoint not in self._spent:
+                    batch[outpoint] = (value,height,details)
+
+            if len(batch) <= self.BULK_THRESHOLD:
+                for (tx_hash,tx_output_n),(value,height,details) in batch.items():
+                    self.add(tx_hash,tx_output_n,value,height,details)
+                return
+
+            for outpoint,(value,height,details) in batch.items():
+                if outpoint in self._outpoints:
+                    self._delete(outpoint)
+                if details is not None and self.keep_details:
+                    self._details[outpoint] = details
+
+            hashes = self._hashes
+            entries = [(value,height,vout,bytes(hashes[position * 32:position * 32 + 32]))
+                       for position,(value,height,vout)
+                       in enumerate(zip(self._values,self._heights,self._vouts))]
+            for (tx_hash,tx_output_n),(value,height,details) in batch.items():
+                height = self.UNCONFIRMED if height is None else height
+                entries.append((value,height,tx_output_n,bytes.fromhex(tx_hash)))
+                self._outpoints[(tx_hash,tx_output_n)] = (value,height)
+
+            entries.sort(key=lambda entry: (entry[0],entry[1]))
+            self._values = array.array('q',[entry[0] for entry in entries])
+            self._heights = array.array('i',[entry[1] for entry in entries])
+            self._vouts = array.array('I',[entry[2] for entry in entries])
+            self._hashes = bytearray(b''.join([entry[3] for entry in entries]))
+
+    def _delete(self,outpoint):
+        position = self._locate(*outpoint)
+        if position is None:
+            return False
+
+        del self._values[position]
+        del self._heights[position]
+        del self._vouts[position]
+        del self._hashes[position * 32:position * 32 + 32]
+        del self._outpoints[outpoint]
+        self._details.pop(outpoint,None)
+        return True
+
+    def remove(self,tx_hash,tx_output_n):
+
+        """ Removes an output, returning whether it was indexed."""
+
+        with self._lock:
+            return self._delete((tx_hash,tx_output_n))
+
+    def spend(self,outpoints):
+
+        """
+            Removes outputs spent by a transaction the index has not
+            synced yet, e.g. the inputs of a send that just went through.
+            They are not added back by a sync until their spending
+            transaction shows up in it.
+
+            @param outpoints : Iterable of (tx_hash,tx_output_n) tuples.
+        """
+
+        with self._lock:
+            for outpoint in outpoints:
+                outpoint = tuple(outpoint)
+                self._delete(outpoint)
+                self._spent.add(outpoint)
+
+    def restore(self,unspents):
+
+        """ Adds back Unspents taken out by spend(), e.g. the inputs
+            of a send that was rejected.
+        """
+
+        with self._lock:
+            for unspent in unspents:
+                self._spent.discard(unspent.outpoint)
+                self.add(unspent.tx_hash,unspent.tx_output_n,unspent.value,
+                         unspent.height,unspent.details)
+
+    def clear(self):
+        with self._lock:
+            del self._values[:]
+            del self._heights[:]
+            del self._vouts[:]
+            del self._hashes[:]
+            self._outpoints.clear()
+            self._details.clear()
+            self._spent.clear()
+            self.height = None
+            self.synced = False
+
+    @property
+    def values(self):
+
+        """ The sorted values array, to be read but not modified."""
+
+        return self._values
+
+    @property
+    def heights(self):
+
+        """ The heights array matching values, UNCONFIRMED for
+            unconfirmed outputs.
+        """
+
+        return self._heights
+
+    def position(self,value):
+
+        """ Returns the position of the first output worth at least
+            value.
+        """
+
+        return self._search(value,-1)
+
+    def unspent(self,position):
+
+        """ Returns the Unspent at a position of the sorted index."""
+
+        tx_hash = self._hashes[position * 32:position * 32 + 32].hex()
+        tx_output_n = self._vouts[position]
+        height = self._heights[position]
+        return Unspent(tx_hash=tx_hash,
+                       tx_output_n=tx_output_n,
+                       value=self._values[position],
+                       height=None if height == self.UNCONFIRMED else height,
+                       details=self._details.get((tx_hash,tx_output_n),None))
+
+    def confirmations(self,height):
+        if height is None or height == self.UNCONFIRMED or self.height is None:
+            return 0
+        return max(0,self.height - height + 1)
+
+    def max_height(self,min_confirms=0):
+
+        """ Returns the highest stored height of an output with at
+            least min_confirms confirmations.
+        """
+
+        if min_confirms <= 0:
+            return self.UNCONFIRMED
+        if self.height is None:
+            return -1
+        return self.height - min_confirms + 1
+
+    def find(self,amount,min_confirms=0):
+
+        """
+            Returns the smallest Unspent worth at least amount with at
+            least min_confirms confirmations, or None.
+        """
+
+        max_height = self.max_height(min_confirms)
+        with self._lock:
+            position = self._search(amount,-1)
+            heights = self._heights
+            while position < len(heights):
+                if heights[position] <= max_height:
+                    return self.unspent(position)
+                position += 1
+        return None
+
+    def between(self,min_value,max_value,min_confirms=0):
+
+        """ Returns the Unspents worth from min_value up to max_value,
+            smallest first.
+        """
+
+        max_height = self.max_height(min_confirms)
+        with self._lock:
+            start = self._search(min_value,-1)
+            end = self._search(max_value + 1,-1)
+            return [self.unspent(position) for position in range(start,end)
+                    if self._heights[position] <= max_height]
+
+    def largest(self,count,min_confirms=0):
+
+        """ Returns up to count Unspents, largest first."""
+
+        max_height = self.max_height(min_confirms)
+        unspents = []
+        with self._lock:
+            position = len(self._values) - 1
+            while position >= 0 and len(unspents) < count:
+                if self._heights[position] <= max_height:
+                    unspents.append(self.unspent(position))
+                position -= 1
+        return unspents
+
+    def snapshot(self,min_confirms=0):
+
+        """
+            Returns (positions,values) arrays of the outputs with at
+            least min_confirms confirmations, smallest value first, to
+            run coin selection over without holding the index.Positions
+            stay valid until the index changes.
+        """
+
+        max_height = self.max_height(min_confirms)
+        with self._lock:
+            if max_height >= self.UNCONFIRMED:
+                return (array.array('I',range(len(self._values))),array.array('q',self._values))
+
+            positions = array.array('I',[position for position,height in enumerate(self._heights)
+                                         if height <= max_height])
+            values = self._values
+            return (positions,array.array('q',[values[position] for position in positions]))
+
+    def balance(self,min_confirms=0):
+        max_height = self.max_height(min_confirms)
+        with self._lock:
+            if max_height >= self.UNCONFIRMED:
+                return sum(self._values)
+            return sum(value for value,height in zip(self._values,self._heights)
+                       if height <= max_height)
+
+    def _see_block(self,height,confirmations):
+
+        """ Moves the last block height seen forward, out of the height
+            and confirmations of a transaction.
+        """
+
+        if height is None:
+            return
+        tip = height + max(1,confirmations or 1) - 1
+        if self.height is None or tip > self.height:
+            self.height = tip
+
+    def load_unspents(self,unspents):
+
+        """ Adds the outputs of a page of the wallet's unspents."""
+
+        batch = []
+        with self._lock:
+            for unspent in unspents:
+                height = unspent.get('blockHeight',None)
+                self._see_block(height,unspent.get('confirmations',None))
+                batch.append((unspent['tx_hash'],unspent['tx_output_n'],
+                              unspent['value'],height,unspent))
+            self.add_many(batch)
+
+    def apply_transactions(self,transactions):
+
+        """
+            Adds the wallet's outputs of transactions and removes the
+            outputs they spend.Outputs are added before any is removed,
+            so the transactions can come in any order.
+        """
+
+        batch = []
+        spent = []
+        with self._lock:
+            for transaction in transactions:
+                height = transaction.get('height',None)
+                if transaction.get('pending',False):
+                    height = None
+                self._see_block(height,transaction.get('confirmations',None))
+
+                for output in transaction.get('outputs',None) or []:
+                    if output.get('isMine',False):
+                        batch.append((transaction['id'],output['vout'],
+                                      output['value'],height,output))
+
+                for tx_input in transaction.get('inputs',None) or []:
+                    if 'previousHash' in tx_input:
+                        spent.append((tx_input['previousHash'],tx_input['previousOutputIndex']))
+
+            self.add_many(batch)
+            for outpoint in spent:
+                self._spent.discard(outpoint)
+                self._delete(outpoint)
+
+    def _page_params(self):
+        if not self.synced:
+            return 'UNSPENTS','unspents',{}
+        return 'TRANSACTIONS','transactions',{'minHeight':max(0,self.height - self.REORG_DEPTH)}
+
+    def _apply(self,action,items):
+        if action == 'UNSPENTS':
+            self.load_unspents(items)
+        else:
+            self.apply_transactions(items)
+
+    def sync(self,client,access_token,deadline=None):
+
+        """
+            Brings the index up to date, paging through the wallet's
+            unspents the first time and through its transactions since
+            the last block height seen afterwards.Returns the number of
+            items synced.
+
+            @param deadline : Optional seconds(or a Deadline) for the
+                              whole sync.
+        """
+
+        deadline = Deadline.coerce(deadline)
+        action,key,params = self._page_params()
+        params.update({'skip':0,'limit':self.PAGE_SIZE})
+
+        #Every page is applied at once, since a transaction can spend
+        #an output of a transaction listed on another page
+        items = []
+        while params is not None:
+            page = BitGoWallet.request_resource(action,client,access_token,True,
+                                                self.wallet_id,deadline=deadline,**params)
+            page_items = page.get(key,None) or []
+            items.extend(page_items)
+            params = BitGoWallet._next_page_params(params,page,page_items)
+
+        self._apply(action,items)
+        self._finish_sync()
+        return len(items)
+
+    async def async_sync(self,client,access_token,deadline=None):
+
+        """ Coroutine version of sync() for an AsyncBitGoClient."""
+
+        deadline = Deadline.coerce(deadline)
+        action,key,params = self._page_params()
+        params.update({'skip':0,'limit':self.PAGE_SIZE})
+
+        #Every page is applied at once, since a transaction can spend
+        #an output of a transaction listed on another page
+        items = []
+        while params is not None:
+            page = await BitGoWallet.async_request_resource(action,client,access_token,True,
+                                                            self.wallet_id,deadline=deadline,
+                                                            **params)
+            page_items = page.get(key,None) or []
+            items.extend(page_items)
+            params = BitGoWallet._next_page_params(params,page,page_items)
+
+        self._apply(action,items)
+        self._finish_sync()
+        return len(items)
+
+    def _finish_sync(self):
+        #An empty wallet has no height to sync from, so it is listed again
+        self.synced = self.height is not None
+
+    def full_sync(self,client,access_token,deadline=None):
+
+        """ Drops every output and syncs the index from scratch."""
+
+        self.clear()
+        return self.sync(client,access_token,deadline=deadline)
+
+    def stats(self):
+
+        """ Returns the size of the index:
+                'unspents' = outputs indexed
+                'balance' = their total value
+                'height' = last block height seen
+                'bytes' = memory taken by the sorted arrays
+        """
+
+        with self._lock:
+            return {'unspents':len(self._values),
+                    'balance':sum(self._values),
+                    'height':self.height,
+                    'bytes':(self._values.itemsize + self._heights.itemsize +
+                             self._vouts.itemsize + 32) * len(self._values)}
@@ -1,11 +1,56 @@
 
 from bitgo.client import BitGoClient
 from bitgo.errors import BitGoResourceException
-from bitgo.resource import (BitGoResource,CRUDMixin,ListMixin)
+from bitgo.keychains import BitGoKeychains
+from bitgo.resource import (BitGoResource,CRUDMixin,ListMixin,ReadMixin)
 
 
 class BitGoWallet(BitGoResource,CRUDMixin,ListMixin):
 
+    __slots__ = ()
+
+    ENDPOINT = {'CREATE':('wallet','POST'),
+                'READ':('wallet/:id','GET'),
+                'UPDATE':('wallet/:id','PUT'),
+                'DELETE':('wallet/:id','DELETE'),
+                'LIST':('wallet','GET'),
+                'UNSPENTS':('wallet/:id/unspents','GET'),
+                'TRANSACTIONS':('wallet/:id/tx','GET'),
+                'SEND_MANY':('wallet/:id/sendmany','POST'),
+                'SEND_TRANSACTION':('tx/send','POST')}
+    LIST_KEY = 'wallets'
+    SUBRESOURCES = {'keychains':BitGoKeychains}
+
+    @classmethod
+    def unspents(cls,client,access_token,wallet_id,deadline=None,**kwargs):
+
+        """
+            Returns the decoded json of a page of the wallet's unspent
+            outputs, kept under its 'unspents' key.
+
+            @param **kwargs : Request params, e.g. skip,limit or
+                              minConfirms.
+        """
+
+        cls.validate_requirements(client=client,access_token=access_token)
+        return cls.request_resource('UNSPENTS',client,access_token,True,
+                                    wallet_id,deadline=deadline,**kwargs)
+
+    @classmethod
+    def transactions(cls,client,access_token,wallet_id,deadline=None,**kwargs):
+
+        """
+            Returns the decoded json of a page of the wallet's
+            transactions, kept under its 'transactions' key.
+
+            @param **kwargs : Request params, e.g. skip,limit or
+                              minHeight.
+        """
+
+        cls.validate_requirements(client=client,access_token=access_token)
+        return cls.request_resource('TRANSACTIONS',client,access_token,True,
+                                    wallet_id,deadline=deadline,**kwargs)
+
     def id(self):
         pass
 
@@ -33,3 +78,23 @@ class BitGoWallet(BitGoResource,CRUDMixin,ListMixin):
     def pending_approvals(self):
         pass
 
+
+class BitGoWalletTransaction(BitGoResource,ReadMixin,ListMixin):
+
+    """
+        A transaction of a wallet, with its outputs and its entries
+        (the value each address gained or lost) as resources.
+
+        Example:
+            tx = BitGoWalletTransaction.get(client,token,tx_hash,wallet_id)
+            for entry in tx.entries:
+                print(entry.account,entry.value)
+    """
+
+    __slots__ = ()
+
+    ENDPOINT = {'READ':('wallet/:id/tx/:txid','GET'),
+                'LIST':('wallet/:id/tx','GET')}
+    LIST_KEY = 'transactions'
+    SUBRESOURCES = {'outputs':BitGoResource,
+                    'entries':BitGoResource}
@@ -1,10 +1,7 @@
 import os
 import sys
 
-try:
-    from setuptools import setup
-except ImportError:
-    from distutils.core import setup
+from setuptools import find_packages, setup
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'bitgo'))
 import version
@@ -13,6 +10,13 @@ path, script = os.path.split(sys.argv[0])
 os.chdir(os.path.abspath(path))
 
 install_requires = ['requests==2.7.0', 'lxml==3.4.4']
+extras_require = {'async': ['aiohttp'],
+                  'fast': ['orjson'],
+                  'http2': ['httpx[http2]>=0.26'],
+                  'signing': ['ecdsa>=0.13']}
+#The signing tests need ecdsa to run the real signer
+tests_require = ['ecdsa>=0.13']
+extras_require['test'] = tests_require
 
 setup(
     name='BitGoPY',
@@ -21,8 +25,10 @@ setup(
     author='Erik Dominguez',
     author_email='erik.dominguez1003@gmail.com',
     url='https://bitgo.com/',
-    packages=['bitgo'],
+    packages=find_packages(exclude=['test', 'test.*', 'benchmarks']),
     package_data={'bitgo': ['../VERSION']},
     install_requires=install_requires,
+    extras_require=extras_require,
+    tests_require=tests_require,
     test_suite='test'
 )
@@ -0,0 +1,229 @@
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler,ThreadingHTTPServer
+
+__all__ = ['LocalServer','LocalHTTP2Server']
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self,*args):
+        pass
+
+    def _handle(self):
+        server = self.server.owner
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        with server.lock:
+            server.requests.append({'method':self.command,'path':self.path,
+                                    'headers':dict(self.headers),'body':body})
+            server.connections.add(self.client_address)
+
+        route = server.routes.get((self.command,self.path.split('?')[0]),None)
+        if route is None:
+            status,headers,content = 200,{},json.dumps({'method':self.command,
+                                                       'path':self.path}).encode('utf-8')
+        else:
+            status,headers,content = route(self,body)
+            if not isinstance(content,bytes):
+                content = json.dumps(content).encode('utf-8')
+
+        self.send_response(status)
+        for name,value in headers.items():
+            self.send_header(name,value)
+        self.send_header('Content-Type','application/json')
+        self.send_header('Content-Length',str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class _Server(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def handle_error(self,request,client_address):
+        #Clients going away mid response, e.g. cancelled requests
+        if not isinstance(sys.exc_info()[1],ConnectionError):
+            super(_Server,self).handle_error(request,client_address)
+
+
+class LocalServer(object):
+
+    """ HTTP/1.1 server on a random local port answering like BitGo's
+        API, for tests.Requests to a path without a route get their
+        method and path back as json.
+
+        Example:
+            with LocalServer() as server:
+                server.route('GET','/api/v1/wallet',lambda handler,body: (200,{},{'wallets':[]}))
+                client = BitGoClient(env=server.endpoint)
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+        self._server = _Server(('127.0.0.1',0),_Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever,daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def endpoint(self):
+        return 'http://127.0.0.1:{port}/api/v1'.format(port=self.port)
+
+    def route(self,method,path,handler):
+
+        """ Answers method requests to path with handler(request_handler,body),
+            returning a (status,headers,json or bytes) tuple.
+        """
+
+        self.routes[(method,path)] = handler
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+
+class LocalHTTP2Server(object):
+
+    """ HTTP/2 server speaking cleartext h2 with prior knowledge on a
+        random local port, for tests.Every request is answered from its
+        own thread after delay seconds, so streams of one connection are
+        answered concurrently.Requires the 'h2' package.
+    """
+
+    def __init__(self,delay=0.0):
+        #Imported here so the HTTP/1.1 server works without h2
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        self._h2 = h2
+        self.delay = delay
+        self.routes = {}
+        self.requests = []
+        self.connections = 0
+        self.max_concurrent = 0
+        self.lock = threading.Lock()
+        self._active = 0
+
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET,socket.SO_REUSEADDR,1)
+        self._socket.bind(('127.0.0.1',0))
+        self._socket.listen(16)
+        threading.Thread(target=self._accept,daemon=True).start()
+
+    @property
+    def endpoint(self):
+        return 'http://127.0.0.1:{port}/api/v1'.format(port=self._socket.getsockname()[1])
+
+    def route(self,method,path,handler):
+
+        """ Answers method requests to path with handler(headers,body),
+            returning a (status,json or bytes) tuple.
+        """
+
+        self.routes[(method,path)] = handler
+
+    def _accept(self):
+        while True:
+            try:
+                connection,_ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve,args=(connection,),daemon=True).start()
+
+    def _serve(self,sock):
+        h2 = self._h2
+        connection = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        connection.initiate_connection()
+        sock.sendall(connection.data_to_send())
+
+        with self.lock:
+            self.connections += 1
+
+        send_lock = threading.Lock()
+        pending = {}
+        while True:
+            try:
+                data = sock.recv(65535)
+            except OSError:
+                break
+            if not data:
+                break
+
+            with send_lock:
+                for event in connection.receive_data(data):
+                    if isinstance(event,h2.events.RequestReceived):
+                        pending[event.stream_id] = [dict((name.decode('utf-8'),value.decode('utf-8'))
+                                                         for name,value in event.headers),b'']
+                    elif isinstance(event,h2.events.DataReceived):
+                        pending[event.stream_id][1] += event.data
+                        connection.acknowledge_received_data(event.flow_controlled_length,event.stream_id)
+                    elif isinstance(event,h2.events.StreamEnded):
+                        headers,body = pending.pop(event.stream_id)
+                        threading.Thread(target=self._respond,
+                                         args=(sock,connection,send_lock,event.stream_id,headers,body),
+                                         daemon=True).start()
+                sock.sendall(connection.data_to_send())
+        sock.close()
+
+    def _respond(self,sock,connection,send_lock,stream_id,headers,body):
+        with self.lock:
+            self.requests.append({'headers':headers,'body':body})
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent,self._active)
+
+        time.sleep(self.delay)
+        route = self.routes.get((headers[':method'],headers[':path'].split('?')[0]),None)
+        if route is None:
+            status,content = 200,{'method':headers[':method'],'path':headers[':path']}
+        else:
+            status,content = route(headers,body)
+        if not isinstance(content,bytes):
+            content = json.dumps(content).encode('utf-8')
+
+        with self.lock:
+            self._active -= 1
+
+        with send_lock:
+            try:
+                connection.send_headers(stream_id,[(':status',str(status)),
+                                                   ('content-type','application/json'),
+                                                   ('content-length',str(len(content)))])
+                connection.send_data(stream_id,content,end_stream=True)
+                sock.sendall(connection.data_to_send())
+            except (OSError,self._h2.exceptions.ProtocolError):
+                #The client gave up on the stream, e.g. after a timeout
+                pass
+
+    def close(self):
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
@@ -0,0 +1,106 @@
+import unittest
+
+from bitgo.async_client import AsyncBitGoClient
+from bitgo.cache import ETagCache,ResponseCache
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoClientException,BitGoException,NotFound
+from bitgo.middleware import Middleware
+from bitgo.retry import RetryPolicy
+
+from test.server import LocalServer
+
+
+class RecordingMiddleware(Middleware):
+
+    def __init__(self):
+        self.events = []
+
+    def after_receive(self,context):
+        self.events.append(('ok',context.status_code,'total' in context.timings))
+
+    def on_error(self,context,exc):
+        self.events.append(('error',context.status_code,type(exc).__name__))
+
+
+class AsyncBitGoClientTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+    async def test_requests(self):
+        async with AsyncBitGoClient(env=self.server.endpoint) as client:
+            self.assertEqual(await client.get('wallet',access_token='token'),
+                             {'method':'GET','path':'/api/v1/wallet'})
+            await client.post('wallet',{'label':'a'})
+
+        self.assertEqual(self.server.requests[0]['headers']['Authorization'],'Bearer token')
+        self.assertEqual(self.server.requests[1]['body'],b'{"label":"a"}')
+
+    async def test_sync_usage_is_refused(self):
+        client = AsyncBitGoClient(env=self.server.endpoint)
+        self.addAsyncCleanup(client.close)
+
+        with self.assertRaises(TypeError):
+            with client:
+                pass
+        with self.assertRaises(BitGoClientException):
+            client.stream('wallet',key='wallets')
+
+    async def test_invalid_json_raises_like_the_sync_client(self):
+        self.server.route('GET','/api/v1/broken',lambda handler,body: (200,{},b'{"a":'))
+        self.server.route('DELETE','/api/v1/empty',lambda handler,body: (200,{},b''))
+
+        async with AsyncBitGoClient(env=self.server.endpoint) as client:
+            with self.assertRaises(BitGoException):
+                await client.get('broken')
+            self.assertIsNone(await client.delete('empty'))
+
+        with BitGoClient(env=self.server.endpoint) as client:
+            with self.assertRaises(BitGoException):
+                client.get('broken')
+            self.assertIsNone(client.delete('empty'))
+
+    async def test_retry(self):
+        statuses = [503,503,200]
+
+        def flaky(handler,body):
+            return statuses.pop(0),{'Retry-After':'0'},{'ok':True}
+
+        self.server.route('GET','/api/v1/flaky',flaky)
+        retry = RetryPolicy(max_attempts=3,backoff_factor=0.01)
+        async with AsyncBitGoClient(env=self.server.endpoint,retry=retry) as client:
+            self.assertEqual(await client.get('flaky'),{'ok':True})
+
+        self.assertEqual(retry.stats()['reasons'],{503:2})
+
+    async def test_caches(self):
+        self.server.route('GET','/api/v1/tagged',
+                          lambda handler,body: (304,{},b'') if handler.headers.get('If-None-Match') == '"v1"'
+                                               else (200,{'ETag':'"v1"'},{'v':1}))
+
+        async with AsyncBitGoClient(env=self.server.endpoint,etag_cache=ETagCache()) as client:
+            self.assertEqual(await client.get('tagged'),{'v':1})
+            self.assertEqual(await client.get('tagged'),{'v':1})
+            self.assertEqual(client.etag_cache.stats()['not_modified'],1)
+
+        async with AsyncBitGoClient(env=self.server.endpoint,cache=ResponseCache()) as client:
+            await client.get('wallet')
+            await client.get('wallet')
+
+        self.assertEqual(len(self.server.requests),3)
+
+    async def test_middlewares(self):
+        middleware = RecordingMiddleware()
+        self.server.route('GET','/api/v1/missing',lambda handler,body: (404,{},{'error':'no'}))
+
+        async with AsyncBitGoClient(env=self.server.endpoint,middlewares=[middleware]) as client:
+            await client.get('wallet')
+            with self.assertRaises(NotFound):
+                await client.get('missing')
+
+        self.assertEqual(middleware.events,[('ok',200,True),('error',404,'NotFound')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import time
+import unittest
+
+from bitgo.breaker import CircuitBreaker
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoClientException,CircuitOpen,HttpError
+from bitgo.wallet.wallet import BitGoWallet
+
+from test.server import LocalServer
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_rate=0.5,min_calls=4,open_seconds=0.1,probes=2)
+
+    def calls(self,outcomes,action='READ',seconds=0.01):
+        for failed in outcomes:
+            self.breaker.record(self.breaker.before_call(action),seconds,failed=failed)
+
+    def trip(self,action='READ'):
+        self.calls([True] * 4,action=action)
+        self.assertEqual(self.breaker.circuit(action).state,CircuitBreaker.OPEN)
+
+    def half_open(self,action='READ'):
+        self.trip(action)
+        time.sleep(0.12)
+
+    def test_opens_on_failure_rate(self):
+        self.calls([False,True,False])
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.CLOSED)
+        self.calls([True])
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call('READ')
+        self.assertEqual(self.breaker.stats()['READ']['rejected'],1)
+
+    def test_opens_on_slow_calls(self):
+        breaker = CircuitBreaker(min_calls=2,slow_call_seconds=1.0,slow_call_rate=1.0)
+        for _ in range(2):
+            breaker.record(breaker.before_call('LIST'),1.5,failed=False)
+        with self.assertRaises(CircuitOpen):
+            breaker.before_call('LIST')
+
+    def test_half_open_probes_close_the_circuit(self):
+        self.half_open()
+        probes = [self.breaker.before_call('READ') for _ in range(2)]
+        self.assertTrue(all(probe.probe for probe in probes))
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.HALF_OPEN)
+
+        #Only probes are let through while half open
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call('READ')
+
+        self.breaker.record(probes[0],0.01,failed=False)
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.HALF_OPEN)
+        self.breaker.record(probes[1],0.01,failed=False)
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.stats()['READ']['calls'],0)
+
+    def test_failed_probe_opens_the_circuit(self):
+        self.half_open()
+        probe = self.breaker.before_call('READ')
+        self.breaker.record(probe,0.01,failed=True)
+
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call('READ')
+
+    def test_stale_calls_are_not_probes(self):
+        stale = [self.breaker.before_call('READ') for _ in range(3)]
+        self.half_open()
+
+        #Calls let through before the circuit opened finishing now
+        #neither close it nor open it again
+        self.breaker.record(stale[0],0.01,failed=False)
+        self.breaker.record(stale[1],0.01,failed=True)
+        self.breaker.release(stale[2])
+        probes = [self.breaker.before_call('READ') for _ in range(2)]
+        self.breaker.record(probes[0],0.01,failed=False)
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call('READ')
+
+        self.breaker.record(probes[1],0.01,failed=False)
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.CLOSED)
+
+    def test_release_gives_back_the_probe_slot(self):
+        self.half_open()
+        probes = [self.breaker.before_call('READ') for _ in range(2)]
+        self.breaker.release(probes[0])
+
+        probe = self.breaker.before_call('READ')
+        self.assertTrue(probe.probe)
+        for call in (probes[1],probe):
+            self.breaker.record(call,0.01,failed=False)
+        self.assertEqual(self.breaker.circuit('READ').state,CircuitBreaker.CLOSED)
+
+    def test_families_are_resource_actions(self):
+        self.trip('READ')
+        self.calls([False],action='LIST')
+        self.calls([False],action=None)
+
+        stats = self.breaker.stats()
+        self.assertEqual(sorted(stats),['LIST','READ','default'])
+        self.assertEqual(stats['LIST']['state'],CircuitBreaker.CLOSED)
+
+        breaker = CircuitBreaker(family=lambda action: 'all')
+        breaker.before_call('READ')
+        breaker.before_call(None)
+        self.assertEqual(list(breaker.stats()),['all'])
+
+    def test_invalid_rates(self):
+        with self.assertRaises(BitGoClientException):
+            CircuitBreaker(failure_rate=0)
+        with self.assertRaises(BitGoClientException):
+            CircuitBreaker(slow_call_rate=1.5)
+
+
+class ClientCircuitBreakerTest(unittest.TestCase):
+
+    def test_fails_fast_once_open(self):
+        breaker = CircuitBreaker(min_calls=3,open_seconds=60)
+        with LocalServer() as server:
+            server.route('GET','/api/v1/wallet/w1',lambda handler,body: (503,{},{'error':'down'}))
+            server.route('GET','/api/v1/wallet',lambda handler,body: (200,{},{'wallets':[]}))
+
+            with BitGoClient(env=server.endpoint,circuit_breaker=breaker) as client:
+                for _ in range(3):
+                    with self.assertRaises(HttpError):
+                        BitGoWallet.get(client,'token','w1')
+                with self.assertRaises(CircuitOpen):
+                    BitGoWallet.get(client,'token','w1')
+
+                #Other actions have circuits of their own
+                self.assertEqual(BitGoWallet.list(client,'token').wallets,[])
+
+        self.assertEqual(len(server.requests),4)
+        self.assertEqual(breaker.stats()['READ']['state'],CircuitBreaker.OPEN)
+        self.assertEqual(breaker.stats()['LIST']['state'],CircuitBreaker.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import unittest
+
+from bitgo.client import BitGoClient,build_session
+from bitgo.errors import BitGoClientException,NotFound
+
+from test.server import LocalServer
+
+
+class BitGoClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+    def test_requests_reuse_one_connection(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            for _ in range(5):
+                client.get('wallet',access_token='token')
+
+        self.assertEqual(len(self.server.requests),5)
+        self.assertEqual(len(self.server.connections),1)
+
+    def test_methods_and_bodies(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            self.assertEqual(client.get('wallet'),{'method':'GET','path':'/api/v1/wallet'})
+            client.post('wallet',{'label':'a'},access_token='token')
+            client.put('wallet/1',{'label':'b'})
+            client.delete('wallet/1')
+
+        methods = [request['method'] for request in self.server.requests]
+        self.assertEqual(methods,['GET','POST','PUT','DELETE'])
+        post = self.server.requests[1]
+        self.assertEqual(json.loads(post['body'].decode('utf-8')),{'label':'a'})
+        self.assertEqual(post['headers']['Authorization'],'Bearer token')
+
+    def test_keep_alive_off_sends_connection_close(self):
+        with BitGoClient(env=self.server.endpoint,keep_alive=False) as client:
+            client.get('wallet')
+            client.get('wallet')
+
+        self.assertEqual(self.server.requests[0]['headers']['Connection'],'close')
+        self.assertEqual(len(self.server.connections),2)
+
+    def test_closed_client_refuses_requests(self):
+        client = BitGoClient(env=self.server.endpoint)
+        client.get('wallet')
+        client.close()
+        with self.assertRaises(BitGoClientException):
+            client.get('wallet')
+
+    def test_shared_session_is_left_open(self):
+        session = build_session(pool_maxsize=2)
+        self.addCleanup(session.close)
+
+        with BitGoClient(env=self.server.endpoint,session=session) as first:
+            first.get('wallet')
+        with BitGoClient(env=self.server.endpoint,session=session) as second:
+            second.get('wallet')
+
+        self.assertEqual(len(self.server.connections),1)
+
+    def test_http_errors_are_mapped(self):
+        self.server.route('GET','/api/v1/wallet/missing',
+                          lambda handler,body: (404,{},{'error':'not found'}))
+
+        with BitGoClient(env=self.server.endpoint) as client:
+            with self.assertRaises(NotFound):
+                client.get('wallet/missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
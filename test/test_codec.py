@@ -0,0 +1,44 @@
+import unittest
+from decimal import Decimal
+
+from bitgo.codec import JSONCodec,OrjsonCodec,get_codec,orjson
+from bitgo.errors import BitGoClientException
+
+
+class GetCodecTest(unittest.TestCase):
+
+    def test_default_is_the_standard_library(self):
+        self.assertEqual(type(get_codec()),JSONCodec)
+        self.assertEqual(type(get_codec('json')),JSONCodec)
+
+    def test_instances_are_returned_as_is(self):
+        codec = JSONCodec()
+        self.assertIs(get_codec(codec),codec)
+
+    def test_fastest(self):
+        codec = get_codec('fastest')
+        self.assertEqual(codec.loads(codec.dumps({'a':[1,2]})),{'a':[1,2]})
+        if orjson is not None:
+            self.assertEqual(codec.name,'orjson')
+
+    def test_unknown_codec(self):
+        with self.assertRaises(BitGoClientException):
+            get_codec('yaml')
+
+
+@unittest.skipIf(orjson is None,'orjson is not installed')
+class OrjsonCodecTest(unittest.TestCase):
+
+    def test_round_trips_like_the_standard_library(self):
+        data = {'address':'2N1','amount':150000,'label':'café'}
+        codec = OrjsonCodec()
+        self.assertEqual(codec.loads(codec.dumps(data)),JSONCodec().loads(JSONCodec().dumps(data)))
+
+    def test_falls_back_on_what_orjson_can_not_encode(self):
+        self.assertEqual(OrjsonCodec().dumps({'amount':2 ** 70}),b'{"amount":1180591620717411303424}')
+        with self.assertRaises(TypeError):
+            OrjsonCodec().dumps({'amount':Decimal('1.5')})
+
+
+if __name__ == '__main__':
+    unittest.main()
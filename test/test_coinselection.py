@@ -0,0 +1,131 @@
+import unittest
+
+from bitgo.errors import BitGoResourceException,InsufficientFunds
+from bitgo.wallet.coinselection import CoinSelector
+from bitgo.wallet.unspents import UnspentIndex
+
+from test.test_unspents import fake_hash
+
+#At 1000 satoshis/kB an input costs 297 satoshis to spend, so these
+#unspents are worth 10000,20000,35000,50000 and 70000 once spent
+INPUT_FEE = 297
+EFFECTIVE = (10000,20000,35000,50000,70000)
+
+
+def target_amount(target,outputs=1):
+
+    """ The amount whose target(effective value needed) is target."""
+
+    return target - 10 - 34 * outputs
+
+
+class CoinSelectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = UnspentIndex('w1')
+        self.index.height = 200
+        for i,effective in enumerate(EFFECTIVE):
+            self.index.add(fake_hash(i),0,effective + INPUT_FEE,height=150)
+        self.selector = CoinSelector(fee_rate=1000,seed=1)
+
+    def effective(self,selection):
+        return sorted(unspent.value - INPUT_FEE for unspent in selection.unspents)
+
+    def test_sizes_and_fees(self):
+        self.assertEqual(self.selector.input_fee,INPUT_FEE)
+        self.assertEqual(self.selector.size(inputs=2,outputs=2),10 + 2 * 297 + 2 * 34)
+        self.assertEqual(self.selector.target(1000),1044)
+        self.assertEqual(CoinSelector(fee_rate=1500).fee(1),2)
+        with self.assertRaises(BitGoResourceException):
+            CoinSelector(fee_rate=-1)
+
+    def test_branch_and_bound_exact_match(self):
+        amount = target_amount(30000)
+        selection = self.selector.select(self.index,amount,strategy=CoinSelector.BRANCH_AND_BOUND)
+
+        self.assertEqual(selection.strategy,CoinSelector.BRANCH_AND_BOUND)
+        self.assertEqual(self.effective(selection),[10000,20000])
+        self.assertEqual(selection.change,0)
+        self.assertEqual(selection.fee,selection.value - amount)
+
+    def test_branch_and_bound_within_cost_of_change(self):
+        #Up to cost_of_change over the target goes to the fee instead of
+        #paying for a change output
+        amount = target_amount(30000 - self.selector.cost_of_change + 1)
+        selection = self.selector.select(self.index,amount,strategy=CoinSelector.BRANCH_AND_BOUND)
+
+        self.assertEqual(self.effective(selection),[10000,20000])
+        self.assertEqual(selection.change,0)
+
+    def test_auto_prefers_a_changeless_match(self):
+        selection = self.selector.select(self.index,target_amount(85000))
+        self.assertEqual(selection.strategy,CoinSelector.BRANCH_AND_BOUND)
+        self.assertEqual(self.effective(selection),[35000,50000])
+
+    def test_auto_falls_back_to_knapsack(self):
+        #No combination lands within cost_of_change of 41000
+        amount = target_amount(41000)
+        selection = self.selector.select(self.index,amount)
+
+        self.assertEqual(selection.strategy,CoinSelector.KNAPSACK)
+        self.assertEqual(self.effective(selection),[10000,35000])
+        self.assertEqual(selection.change,45000 - 41000 - 34)
+        self.assertEqual(selection.fee,selection.value - amount - selection.change)
+
+    def test_knapsack_single_larger_unspent(self):
+        #No subset of the smaller unspents wastes less than the 70000 one
+        selection = self.selector.select(self.index,target_amount(69000),
+                                         strategy=CoinSelector.KNAPSACK)
+        self.assertEqual(selection.strategy,CoinSelector.KNAPSACK)
+        self.assertEqual(self.effective(selection),[70000])
+
+    def test_largest_first(self):
+        selection = self.selector.select(self.index,target_amount(100000),
+                                         strategy=CoinSelector.LARGEST_FIRST)
+        self.assertEqual(selection.strategy,CoinSelector.LARGEST_FIRST)
+        self.assertEqual(self.effective(selection),[50000,70000])
+
+    def test_falls_back_to_largest_first(self):
+        #Nothing matches without change, every unspent is needed
+        selection = self.selector.select(self.index,target_amount(184000),
+                                         strategy=CoinSelector.BRANCH_AND_BOUND)
+        self.assertEqual(selection.strategy,CoinSelector.LARGEST_FIRST)
+        self.assertEqual(len(selection),5)
+
+    def test_min_confirms(self):
+        self.index.add(fake_hash('new'),0,100000 + INPUT_FEE,height=200)
+        self.index.add(fake_hash('mempool'),0,200000 + INPUT_FEE,height=None)
+
+        amount = target_amount(100000)
+        unconfirmed = CoinSelector(fee_rate=1000,min_confirms=0)
+        self.assertEqual(self.effective(unconfirmed.select(self.index,amount,
+                                                           strategy=CoinSelector.LARGEST_FIRST)),
+                         [200000])
+
+        one = CoinSelector(fee_rate=1000,min_confirms=1)
+        self.assertEqual(self.effective(one.select(self.index,amount)),[100000])
+
+        two = CoinSelector(fee_rate=1000,min_confirms=2)
+        for strategy in CoinSelector.STRATEGIES:
+            selection = two.select(self.index,amount,strategy=strategy)
+            self.assertFalse(set(self.effective(selection)) & {100000,200000})
+
+    def test_insufficient_funds(self):
+        with self.assertRaises(InsufficientFunds):
+            self.selector.select(self.index,target_amount(sum(EFFECTIVE) + 1))
+        with self.assertRaises(InsufficientFunds):
+            CoinSelector(fee_rate=1000,min_confirms=100).select(self.index,1000)
+
+    def test_dust_is_not_worth_spending(self):
+        index = UnspentIndex('w2')
+        index.add(fake_hash('dust'),0,INPUT_FEE,height=None)
+        with self.assertRaises(InsufficientFunds):
+            CoinSelector(fee_rate=1000,min_confirms=0).select(index,1)
+
+    def test_invalid_strategy(self):
+        with self.assertRaises(BitGoResourceException):
+            self.selector.select(self.index,1000,strategy='smallest_first')
+
+
+if __name__ == '__main__':
+    unittest.main()
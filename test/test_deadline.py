@@ -0,0 +1,66 @@
+import time
+import unittest
+
+from bitgo.async_client import AsyncBitGoClient
+from bitgo.client import BitGoClient
+from bitgo.deadline import Deadline
+from bitgo.errors import DeadlineExceeded
+from bitgo.ratelimit import RateLimiter,TokenBucket
+
+from test.server import LocalServer
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_coerce(self):
+        deadline = Deadline(5)
+        self.assertIs(Deadline.coerce(deadline),deadline)
+        self.assertIsNone(Deadline.coerce(None))
+        self.assertLessEqual(Deadline.coerce(2).remaining(),2)
+
+    def test_timeout_is_shortened(self):
+        connect,read = Deadline(0.5).timeout((10.0,60.0))
+        self.assertLessEqual(connect,0.5)
+        self.assertLessEqual(read,0.5)
+
+
+class ClientDeadlineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.server.route('GET','/api/v1/slow',lambda handler,body: (time.sleep(0.5),(200,{},{}))[1])
+
+    def test_slow_response(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            with self.assertRaises(DeadlineExceeded):
+                client.get('slow',deadline=0.1)
+
+    def test_rate_limiter_wait_past_the_deadline_is_refunded(self):
+        limiter = RateLimiter(default=TokenBucket(rate=1,capacity=1))
+        with BitGoClient(env=self.server.endpoint,rate_limiter=limiter) as client:
+            client.get('wallet',deadline=5)
+            with self.assertRaises(DeadlineExceeded) as raised:
+                client.get('wallet',deadline=0.2)
+
+        self.assertIn('rate limiter',str(raised.exception))
+        self.assertEqual(len(self.server.requests),1)
+        #Only the first request used up the quota
+        self.assertLessEqual(limiter.reserve(),1.0)
+
+
+class AsyncClientDeadlineTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_rate_limiter_wait_past_the_deadline_is_refunded(self):
+        limiter = RateLimiter(default=TokenBucket(rate=1,capacity=1))
+        with LocalServer() as server:
+            async with AsyncBitGoClient(env=server.endpoint,rate_limiter=limiter) as client:
+                await client.get('wallet',deadline=5)
+                with self.assertRaises(DeadlineExceeded):
+                    await client.get('wallet',deadline=0.2)
+
+        self.assertLessEqual(limiter.reserve(),1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from urllib.parse import parse_qs,urlparse
+
+from bitgo.client import BitGoClient
+from bitgo.endpoint import EndpointTemplate,compile_endpoints
+from bitgo.errors import (InvalidResourceEndpoint,InvalidResourceEndpointUrl,
+                          InvalidResourceMethod)
+from bitgo.resource import BitGoResource,ReadMixin
+from bitgo.wallet.wallet import BitGoWallet,BitGoWalletTransaction
+
+from test.server import LocalServer
+
+
+class EndpointTemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.template = EndpointTemplate('READ','wallet/:walletId/tx/:txId','GET')
+
+    def test_placeholders(self):
+        self.assertEqual(self.template.names,('walletId','txId'))
+        self.assertEqual(self.template.build('w1','t1'),'/wallet/w1/tx/t1')
+        self.assertEqual(self.template.build('w1',txId='t1'),'/wallet/w1/tx/t1')
+        self.assertEqual(self.template.build(txId='t1',walletId='w1'),'/wallet/w1/tx/t1')
+        self.assertEqual(EndpointTemplate('LIST','/wallet','GET').build(),'/wallet')
+
+    def test_query(self):
+        url = self.template.build('w1','t1',query={'limit':5,'type':['a','b']})
+        self.assertEqual(urlparse(url).path,'/wallet/w1/tx/t1')
+        self.assertEqual(parse_qs(urlparse(url).query),{'limit':['5'],'type':['a','b']})
+
+    def test_literal_braces(self):
+        self.assertEqual(EndpointTemplate('READ','a{b}/:id','GET').build('1'),'/a{b}/1')
+
+    def test_wrong_arguments(self):
+        for args,named in [(('w1',),{}),(('w1','t1','x'),{}),(('w1',),{'other':'t1'}),
+                           (('w1','t1'),{'txId':'t2'})]:
+            with self.assertRaises(InvalidResourceEndpointUrl):
+                self.template.build(*args,**named)
+
+    def test_invalid_entries(self):
+        with self.assertRaises(InvalidResourceEndpointUrl):
+            EndpointTemplate('READ',None,'GET')
+        with self.assertRaises(InvalidResourceMethod):
+            EndpointTemplate('READ','wallet','PATCH')
+        with self.assertRaises(InvalidResourceEndpoint):
+            compile_endpoints({'READ':('wallet/:id',)})
+        with self.assertRaises(InvalidResourceEndpoint):
+            compile_endpoints([('wallet','GET')])
+
+
+class ResourceEndpointTest(unittest.TestCase):
+
+    def test_compiled_at_class_creation(self):
+        self.assertEqual(set(BitGoWallet.__dict__['_endpoint_templates']),set(BitGoWallet.ENDPOINT))
+        self.assertIs(BitGoWallet.get_endpoint_template('READ'),
+                      BitGoWallet.get_endpoint_template('READ'))
+        self.assertEqual(BitGoWallet.endpoint('READ','w1',query={'a':1}),'/wallet/w1?a=1')
+        self.assertEqual(BitGoWallet.get_action_endpoint('LIST'),('wallet','GET'))
+
+        with self.assertRaises(InvalidResourceMethod):
+            class Broken(BitGoResource,ReadMixin):
+                __slots__ = ()
+                ENDPOINT = {'READ':('broken/:id','FETCH')}
+
+        with self.assertRaises(InvalidResourceEndpoint):
+            BitGoWallet.get_endpoint_template('MISSING')
+
+    def test_replaced_endpoint_is_compiled_again(self):
+        class Replaced(BitGoResource,ReadMixin):
+            __slots__ = ()
+            ENDPOINT = {'READ':('old/:id','GET')}
+
+        self.assertEqual(Replaced.endpoint('READ','1'),'/old/1')
+        Replaced.ENDPOINT = {'READ':('new/:id','GET')}
+        self.assertEqual(Replaced.endpoint('READ','1'),'/new/1')
+
+    def test_requests_fill_placeholders_by_name(self):
+        with LocalServer() as server:
+            with BitGoClient(env=server.endpoint) as client:
+                BitGoWalletTransaction.request_resource('READ',client,'token',True,
+                                                        'w1',txid='t1',limit=2)
+                BitGoWalletTransaction.get(client,'token','t2','w2')
+
+        self.assertEqual([request['path'] for request in server.requests],
+                         ['/api/v1/wallet/w1/tx/t1?limit=2','/api/v1/wallet/w2/tx/t2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
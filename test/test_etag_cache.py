@@ -0,0 +1,131 @@
+import unittest
+
+from bitgo.cache import ETagCache
+from bitgo.client import BitGoClient
+from bitgo.errors import HttpError
+
+from test.server import LocalServer
+
+LAST_MODIFIED = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+
+class Versioned(object):
+
+    """ Answers a GET with the current version of a document, or with a
+        304 when the request's validators match it.
+    """
+
+    def __init__(self,etag=True,last_modified=False):
+        self.version = 1
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['ETag'] = '"v{v}"'.format(v=self.version)
+        if self.last_modified:
+            headers['Last-Modified'] = LAST_MODIFIED
+        return headers
+
+    def __call__(self,request,body):
+        headers = self.validators()
+        if headers:
+            if_none_match = request.headers.get('If-None-Match')
+            if_modified_since = request.headers.get('If-Modified-Since')
+            if ((if_none_match and if_none_match == headers.get('ETag')) or
+                    (if_modified_since and if_modified_since == headers.get('Last-Modified'))):
+                return 304,{},b''
+        return 200,headers,{'version':self.version}
+
+
+class ETagCacheTest(unittest.TestCase):
+
+    def test_conditional_headers(self):
+        cache = ETagCache()
+        self.assertEqual(cache.conditional_headers(None),{})
+        self.assertEqual(cache.conditional_headers(('"v1"',LAST_MODIFIED,{})),
+                         {'If-None-Match':'"v1"','If-Modified-Since':LAST_MODIFIED})
+
+    def test_lru_eviction(self):
+        cache = ETagCache(maxsize=2)
+        for url in ('a','b','c'):
+            cache.store(cache.make_key('token',url),{'ETag':url},{})
+
+        self.assertIsNone(cache.get(cache.make_key('token','a')))
+        self.assertEqual(len(cache),2)
+        self.assertEqual(cache.stats()['evictions'],1)
+
+
+class ClientETagCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.client = BitGoClient(env=self.server.endpoint,etag_cache=ETagCache())
+        self.addCleanup(self.client.close)
+
+    def header(self,number,name):
+        return self.server.requests[number]['headers'].get(name)
+
+    def test_not_modified_returns_the_stored_json(self):
+        self.server.route('GET','/api/v1/wallet/w1',Versioned())
+
+        first = self.client.get('wallet/w1',access_token='token')
+        second = self.client.get('wallet/w1',access_token='token')
+
+        self.assertEqual(first,{'version':1})
+        self.assertIs(second,first)
+        self.assertIsNone(self.header(0,'If-None-Match'))
+        self.assertEqual(self.header(1,'If-None-Match'),'"v1"')
+        self.assertEqual(self.client.etag_cache.stats(),{'not_modified':1,'modified':1,
+                                                         'evictions':0,'size':1})
+
+    def test_changed_document(self):
+        document = Versioned()
+        self.server.route('GET','/api/v1/wallet/w1',document)
+
+        self.client.get('wallet/w1',access_token='token')
+        document.version = 2
+        self.assertEqual(self.client.get('wallet/w1',access_token='token'),{'version':2})
+        self.assertEqual(self.client.get('wallet/w1',access_token='token'),{'version':2})
+
+        self.assertEqual(self.header(2,'If-None-Match'),'"v2"')
+        self.assertEqual(self.client.etag_cache.stats()['not_modified'],1)
+
+    def test_last_modified(self):
+        self.server.route('GET','/api/v1/wallet/w1',Versioned(etag=False,last_modified=True))
+
+        self.client.get('wallet/w1',access_token='token')
+        self.assertEqual(self.client.get('wallet/w1',access_token='token'),{'version':1})
+        self.assertEqual(self.header(1,'If-Modified-Since'),LAST_MODIFIED)
+        self.assertIsNone(self.header(1,'If-None-Match'))
+
+    def test_responses_without_validators_are_not_kept(self):
+        self.server.route('GET','/api/v1/wallet/w1',Versioned(etag=False))
+
+        self.client.get('wallet/w1',access_token='token')
+        self.client.get('wallet/w1',access_token='token')
+        self.assertIsNone(self.header(1,'If-None-Match'))
+        self.assertEqual(len(self.client.etag_cache),0)
+
+    def test_entries_per_token_and_params(self):
+        self.server.route('GET','/api/v1/wallet',Versioned())
+
+        self.client.get('wallet',access_token='token')
+        self.client.get('wallet',access_token='other')
+        self.client.request('wallet',params={'limit':5},access_token='token')
+
+        self.assertTrue(all(request['headers'].get('If-None-Match') is None
+                            for request in self.server.requests))
+        self.assertEqual(len(self.client.etag_cache),3)
+
+    def test_unexpected_not_modified(self):
+        self.server.route('GET','/api/v1/wallet/w1',lambda request,body: (304,{},b''))
+        with self.assertRaises(HttpError) as raised:
+            self.client.get('wallet/w1',access_token='token')
+        self.assertEqual(raised.exception.status_code,304)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+
+from bitgo.async_client import AsyncBitGoClient
+from bitgo.client import BitGoClient
+from bitgo.errors import DeadlineExceeded,NotFound
+from bitgo.wallet.wallet import BitGoWallet
+
+from test.server import LocalServer
+
+IDS = ['w{i}'.format(i=i) for i in range(10)]
+
+
+class Wallets(object):
+
+    """ Answers wallet reads after a delay, counting how many of them
+        are served at once.The ids in missing get a 404.
+    """
+
+    def __init__(self,server,delay=0.05,missing=()):
+        self.delay = delay
+        self.missing = missing
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        for wallet_id in IDS:
+            server.route('GET','/api/v1/wallet/' + wallet_id,self.handler(wallet_id))
+
+    def handler(self,wallet_id):
+        def handle(request,body):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active,self.active)
+            time.sleep(self.delay)
+            with self.lock:
+                self.active -= 1
+            if wallet_id in self.missing:
+                return 404,{},{'error':'wallet not found'}
+            return 200,{},{'id':wallet_id,'label':'wallet ' + wallet_id}
+        return handle
+
+
+class GetManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+    def test_results_keep_the_order_of_the_ids(self):
+        Wallets(self.server,missing=('w3','w7'))
+        with BitGoClient(env=self.server.endpoint) as client:
+            wallets = BitGoWallet.get_many(client,'token',reversed(IDS),concurrency=4)
+
+        self.assertEqual(len(wallets),10)
+        for wallet_id,wallet in zip(reversed(IDS),wallets):
+            if wallet_id in ('w3','w7'):
+                self.assertIsInstance(wallet,NotFound)
+            else:
+                self.assertIsInstance(wallet,BitGoWallet)
+                self.assertEqual(wallet['id'],wallet_id)
+        self.assertEqual(len(self.server.requests),10)
+
+    def test_concurrency_is_bounded(self):
+        wallets = Wallets(self.server)
+        with BitGoClient(env=self.server.endpoint) as client:
+            start = time.perf_counter()
+            BitGoWallet.get_many(client,'token',IDS,concurrency=3)
+            elapsed = time.perf_counter() - start
+
+        self.assertLessEqual(wallets.max_active,3)
+        self.assertGreater(wallets.max_active,1)
+        #4 rounds of 3 requests instead of 10 one after another
+        self.assertLess(elapsed,10 * wallets.delay)
+
+    def test_deadline_of_the_batch(self):
+        Wallets(self.server,delay=0.2)
+        with BitGoClient(env=self.server.endpoint) as client:
+            wallets = BitGoWallet.get_many(client,'token',IDS[:4],concurrency=2,deadline=0.3)
+
+        self.assertIsInstance(wallets[0],BitGoWallet)
+        self.assertIsInstance(wallets[1],BitGoWallet)
+        self.assertTrue(all(isinstance(wallet,DeadlineExceeded) for wallet in wallets[2:]))
+
+    def test_no_ids(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            self.assertEqual(BitGoWallet.get_many(client,'token',[]),[])
+        self.assertEqual(self.server.requests,[])
+
+
+class AsyncGetManyTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+    async def test_results_keep_the_order_of_the_ids(self):
+        wallets = Wallets(self.server,missing=('w5',))
+        async with AsyncBitGoClient(env=self.server.endpoint) as client:
+            results = await BitGoWallet.async_get_many(client,'token',IDS,concurrency=4)
+
+        self.assertIsInstance(results[5],NotFound)
+        self.assertEqual([result['id'] for result in results[:5] + results[6:]],
+                         IDS[:5] + IDS[6:])
+        self.assertLessEqual(wallets.max_active,4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import base64
+import unittest
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoClientException
+from bitgo.proxy import ProxyPool
+from bitgo.token import BitGoAccessToken
+
+from test.server import LocalServer
+
+
+class PrebuiltHeadersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.client = BitGoClient(env=self.server.endpoint)
+        self.addCleanup(self.client.close)
+
+    def headers(self,number=-1):
+        return self.server.requests[number]['headers']
+
+    def test_headers_sent(self):
+        self.client.get('wallet')
+        self.assertEqual(self.headers()['User-Agent'],BitGoClient.USER_AGENT)
+        self.assertEqual(self.headers()['Content-type'],'application/json')
+        self.assertNotIn('Authorization',self.headers())
+
+        self.client.get('wallet',access_token='token')
+        self.client.get('wallet',access_token=BitGoAccessToken('other'))
+        self.assertEqual(self.headers(1)['Authorization'],'Bearer token')
+        self.assertEqual(self.headers(2)['Authorization'],'Bearer other')
+
+    def test_headers_are_built_once_per_token(self):
+        headers = self.client._build_headers('token')
+        self.assertIs(self.client._build_headers('token'),headers)
+        self.assertIs(self.client._build_headers(None),self.client._base_headers)
+
+        self.client.HEADER_CACHE_SIZE = 2
+        for token in ('a','b','c'):
+            self.client._build_headers(token)
+        self.assertEqual(list(self.client._token_headers),['b','c'])
+
+    def test_setters_rebuild_the_headers(self):
+        self.client.get('wallet',access_token='token')
+        self.client.user_agent = 'custom agent'
+        self.client.keep_alive = False
+        self.client.get('wallet',access_token='token')
+
+        self.assertEqual(self.headers()['User-Agent'],'custom agent')
+        self.assertEqual(self.headers()['Connection'],'close')
+        self.assertEqual(self.headers()['Authorization'],'Bearer token')
+
+        self.client.user_agent = None
+        self.client.keep_alive = True
+        self.client.get('wallet')
+        self.assertEqual(self.headers()['User-Agent'],BitGoClient.USER_AGENT)
+        self.assertNotEqual(self.headers().get('Connection'),'close')
+
+
+class ProxyTest(unittest.TestCase):
+
+    #Requests for this host only get anywhere through the proxy
+    ENDPOINT = 'http://bitgo.invalid/api/v1'
+
+    def setUp(self):
+        self.proxy = LocalServer()
+        self.addCleanup(self.proxy.close)
+
+    def test_requests_go_through_the_proxy(self):
+        with BitGoClient(env=self.ENDPOINT,proxy={'ip':'127.0.0.1','port':self.proxy.port}) as client:
+            proxies = client._proxies
+            client.get('wallet',access_token='token')
+            client.get('wallet/w1')
+            self.assertIs(client._proxies,proxies)
+
+        self.assertEqual([request['path'] for request in self.proxy.requests],
+                         [self.ENDPOINT + '/wallet',self.ENDPOINT + '/wallet/w1'])
+        self.assertNotIn('Proxy-Authorization',self.proxy.requests[0]['headers'])
+
+    def test_proxy_credentials(self):
+        proxy = {'ip':'127.0.0.1','port':self.proxy.port,'username':'user','password':'secret'}
+        with BitGoClient(env=self.ENDPOINT,proxy=proxy) as client:
+            client.get('wallet')
+
+        credentials = base64.b64encode(b'user:secret').decode('ascii')
+        self.assertEqual(self.proxy.requests[0]['headers']['Proxy-Authorization'],
+                         'Basic ' + credentials)
+
+    def test_set_proxy(self):
+        with LocalServer() as server:
+            with BitGoClient(env=server.endpoint) as client:
+                self.assertIsNone(client._proxies)
+                client.get('wallet')
+
+                client.set_proxy({'ip':'127.0.0.1','port':self.proxy.port})
+                self.assertEqual(client._proxies['http'],
+                                 'http://127.0.0.1:{port}'.format(port=self.proxy.port))
+                client.get('wallet')
+
+                client.proxy = None
+                client.get('wallet')
+
+        self.assertEqual(len(server.requests),2)
+        self.assertEqual([request['path'] for request in self.proxy.requests],
+                         [server.endpoint + '/wallet'])
+
+    def test_invalid_proxies(self):
+        with BitGoClient(env=self.ENDPOINT) as client:
+            for proxy in ('127.0.0.1:8080',{'ip':'127.0.0.1'},{'port':8080}):
+                with self.assertRaises(BitGoClientException):
+                    client.set_proxy(proxy)
+            self.assertIsNone(client._proxies)
+
+        with self.assertRaises(BitGoClientException):
+            BitGoClient(proxy={'ip':'127.0.0.1','port':8080},
+                        proxy_pool=ProxyPool([{'ip':'127.0.0.1','port':8081}]))
+
+
+if __name__ == '__main__':
+    unittest.main()
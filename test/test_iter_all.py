@@ -0,0 +1,132 @@
+import time
+import unittest
+from urllib.parse import parse_qs,urlparse
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoResourceException,DeadlineExceeded
+from bitgo.resource import BitGoResource,ListMixin
+from bitgo.wallet.wallet import BitGoWallet
+
+from test.server import LocalServer
+
+WALLETS = [{'id':'w{i}'.format(i=i)} for i in range(25)]
+
+
+class Transfers(BitGoResource,ListMixin):
+
+    __slots__ = ()
+
+    ENDPOINT = {'LIST':('wallet/:id/transfer','GET')}
+    LIST_KEY = 'transfers'
+    PAGINATION_CURSOR = ('prevId','nextBatchPrevId')
+
+
+def query(path):
+    return {name:values[0] for name,values in parse_qs(urlparse(path).query).items()}
+
+
+def wallet_pages(total=True,delay=0.0):
+
+    """ Answers wallet lists out of WALLETS by skip and limit, with
+        their total unless total is False.
+    """
+
+    def handler(request,body):
+        time.sleep(delay)
+        params = query(request.path)
+        skip,limit = int(params['skip']),int(params['limit'])
+        page = {'wallets':WALLETS[skip:skip + limit]}
+        if total:
+            page['total'] = len(WALLETS)
+        return 200,{},page
+    return handler
+
+
+class IterAllTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.client = BitGoClient(env=self.server.endpoint)
+        self.addCleanup(self.client.close)
+
+    def sent(self):
+        return [query(request['path']) for request in self.server.requests]
+
+    def test_pages_by_skip_and_limit(self):
+        self.server.route('GET','/api/v1/wallet',wallet_pages())
+        wallets = list(BitGoWallet.iter_all(self.client,'token',page_size=10))
+
+        self.assertTrue(all(isinstance(wallet,BitGoWallet) for wallet in wallets))
+        self.assertEqual([wallet['id'] for wallet in wallets],[wallet['id'] for wallet in WALLETS])
+        self.assertEqual([(params['skip'],params['limit']) for params in self.sent()],
+                         [('0','10'),('10','10'),('20','10')])
+
+    def test_short_page_ends_without_a_total(self):
+        self.server.route('GET','/api/v1/wallet',wallet_pages(total=False))
+        wallets = list(BitGoWallet.iter_all(self.client,'token',page_size=5,prefetch=False))
+
+        self.assertEqual(len(wallets),25)
+        #The fifth page is full, only the empty sixth one tells it was the last
+        self.assertEqual(len(self.server.requests),6)
+
+    def test_next_page_is_prefetched(self):
+        self.server.route('GET','/api/v1/wallet',wallet_pages())
+
+        wallets = BitGoWallet.iter_all(self.client,'token',page_size=10)
+        next(wallets)
+        time.sleep(0.1)
+        self.assertEqual(len(self.server.requests),2)
+        wallets.close()
+
+        wallets = BitGoWallet.iter_all(self.client,'token',page_size=10,prefetch=False)
+        next(wallets)
+        time.sleep(0.1)
+        self.assertEqual(len(self.server.requests),3)
+        wallets.close()
+
+    def test_prefetch_overlaps_the_caller(self):
+        self.server.route('GET','/api/v1/wallet',wallet_pages(delay=0.1))
+
+        def consume(prefetch):
+            start = time.perf_counter()
+            for _ in BitGoWallet.iter_all(self.client,'token',page_size=10,prefetch=prefetch):
+                time.sleep(0.01)
+            return time.perf_counter() - start
+
+        #Each page takes as long to fetch as to work through
+        self.assertLess(consume(True),consume(False) - 0.1)
+
+    def test_cursor_pagination(self):
+        pages = {None:{'transfers':[{'id':'t1'},{'id':'t2'}],'nextBatchPrevId':'t2'},
+                 't2':{'transfers':[{'id':'t3'}]}}
+        self.server.route('GET','/api/v1/wallet/w1/transfer',
+                          lambda request,body: (200,{},pages[query(request.path).get('prevId')]))
+
+        transfers = list(Transfers.iter_all(self.client,'token',2,True,'w1'))
+
+        self.assertEqual([transfer['id'] for transfer in transfers],['t1','t2','t3'])
+        self.assertEqual([params.get('prevId') for params in self.sent()],
+                         [None,'t2'])
+        self.assertTrue(all('skip' not in params for params in self.sent()))
+
+    def test_deadline_of_the_iteration(self):
+        self.server.route('GET','/api/v1/wallet',wallet_pages(delay=0.15))
+
+        wallets = []
+        with self.assertRaises(DeadlineExceeded):
+            for wallet in BitGoWallet.iter_all(self.client,'token',page_size=10,deadline=0.25):
+                wallets.append(wallet)
+        self.assertEqual(len(wallets),10)
+
+    def test_list_key_is_required(self):
+        class Unlisted(BitGoResource,ListMixin):
+            __slots__ = ()
+            ENDPOINT = {'LIST':('unlisted','GET')}
+
+        with self.assertRaises(BitGoResourceException):
+            next(Unlisted.iter_all(self.client,'token'))
+
+
+if __name__ == '__main__':
+    unittest.main()
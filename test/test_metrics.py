@@ -0,0 +1,117 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from bitgo.client import BitGoClient
+from bitgo.errors import NotFound
+from bitgo.metrics import Metrics,OTLPExporter,PrometheusExporter
+
+from test.server import LocalServer
+
+LABELS = (('action','READ'),('method','GET'))
+
+
+def parse_prometheus(text):
+
+    """ Returns {sample name with labels:value} and {name:type}."""
+
+    samples = {}
+    types = {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _,_,name,kind = line.split(' ')
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            sample,value = line.rsplit(' ',1)
+            samples[sample] = float(value)
+    return samples,types
+
+
+class MetricsTest(unittest.TestCase):
+
+    def record(self,metrics,count):
+        for i in range(count):
+            metrics.record_request('READ','get',200,0.01 * (i % 3))
+
+    def test_shards_of_finished_threads_are_folded(self):
+        metrics = Metrics()
+        for _ in range(10):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(lambda _: self.record(metrics,25),range(8)))
+
+        self.record(metrics,5)
+        self.assertLessEqual(len(metrics._shards),1)
+
+        counters,histograms = metrics.collect()
+        self.assertEqual(counters[('bitgo_client_requests_total',LABELS + (('status','200'),))],2005)
+        self.assertEqual(histograms[('bitgo_client_request_duration_seconds',LABELS)][2],2005)
+
+    def test_collect_while_threads_exit(self):
+        metrics = Metrics()
+        threads = [threading.Thread(target=self.record,args=(metrics,100)) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        snapshots = [metrics.collect() for _ in range(50)]
+        for thread in threads:
+            thread.join()
+
+        key = ('bitgo_client_requests_total',LABELS + (('status','200'),))
+        totals = [counters.get(key,0) for counters,_ in snapshots]
+        self.assertEqual(totals,sorted(totals))
+        self.assertEqual(metrics.collect()[0][key],1600)
+
+
+class ExporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.server.route('GET','/api/v1/wallet/missing',lambda handler,body: (404,{},{'error':'no'}))
+
+        self.metrics = Metrics(buckets=(0.5,5.0))
+        with BitGoClient(env=self.server.endpoint,metrics=self.metrics) as client:
+            for _ in range(3):
+                client.request('wallet/w1',action='READ')
+            with self.assertRaises(NotFound):
+                client.request('wallet/missing',action='READ')
+
+    def test_prometheus(self):
+        samples,types = parse_prometheus(PrometheusExporter(self.metrics).render())
+
+        self.assertEqual(types['bitgo_client_requests_total'],'counter')
+        self.assertEqual(types['bitgo_client_request_duration_seconds'],'histogram')
+        self.assertEqual(samples['bitgo_client_requests_total{action="READ",method="GET",status="200"}'],3)
+        self.assertEqual(samples['bitgo_client_requests_total{action="READ",method="GET",status="404"}'],1)
+        self.assertEqual(samples['bitgo_client_errors_total{action="READ",method="GET",exception="NotFound"}'],1)
+
+        histogram = 'bitgo_client_request_duration_seconds'
+        self.assertEqual(samples[histogram + '_bucket{action="READ",method="GET",le="0.5"}'],4)
+        self.assertEqual(samples[histogram + '_bucket{action="READ",method="GET",le="+Inf"}'],4)
+        self.assertEqual(samples[histogram + '_count{action="READ",method="GET"}'],4)
+
+    def test_otlp(self):
+        received = []
+        self.server.route('POST','/v1/metrics',lambda handler,body: (received.append(body) or (200,{},{})))
+
+        OTLPExporter(self.metrics,endpoint=self.server.endpoint.replace('/api/v1','/v1/metrics'),
+                     service_name='payouts').export()
+
+        payload = json.loads(received[0].decode('utf-8'))
+        resource_metrics = payload['resourceMetrics'][0]
+        self.assertEqual(resource_metrics['resource']['attributes'],
+                         [{'key':'service.name','value':{'stringValue':'payouts'}}])
+
+        metrics = {metric['name']:metric for metric in resource_metrics['scopeMetrics'][0]['metrics']}
+        requests_total = metrics['bitgo_client_requests_total']['sum']
+        self.assertTrue(requests_total['isMonotonic'])
+        self.assertEqual(sorted(int(point['asInt']) for point in requests_total['dataPoints']),[1,3])
+
+        point = metrics['bitgo_client_request_duration_seconds']['histogram']['dataPoints'][0]
+        self.assertEqual(point['explicitBounds'],[0.5,5.0])
+        self.assertEqual(point['count'],'4')
+        self.assertEqual(sum(int(count) for count in point['bucketCounts']),4)
+
+
+if __name__ == '__main__':
+    unittest.main()
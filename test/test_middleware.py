@@ -0,0 +1,115 @@
+import time
+import unittest
+
+from bitgo.client import BitGoClient
+from bitgo.errors import NotFound
+from bitgo.middleware import Histogram,Middleware,TimingMiddleware
+from bitgo.wallet.wallet import BitGoWallet
+
+from test.server import LocalServer
+
+
+class Recorder(Middleware):
+
+    """ Middleware recording the hooks called on it into a shared log."""
+
+    def __init__(self,name,log):
+        self.name = name
+        self.log = log
+
+    def before_send(self,context):
+        context.extra[self.name] = 'sent'
+        self.log.append((self.name,'before_send',context.method,context.url,context.action))
+
+    def after_receive(self,context):
+        self.log.append((self.name,'after_receive',context.status_code,context.extra[self.name]))
+
+    def on_error(self,context,exc):
+        self.log.append((self.name,'on_error',context.status_code,type(exc).__name__,
+                         context.error is exc))
+
+
+class HistogramTest(unittest.TestCase):
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.5,0.1,1.0))
+        for value in (0.05,0.1,0.3,0.7,2.0):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'],5)
+        self.assertAlmostEqual(snapshot['sum'],3.15)
+        self.assertEqual(snapshot['buckets'],[(0.1,2),(0.5,3),(1.0,4),(float('inf'),5)])
+
+
+class ClientMiddlewareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+        def slow(request,body):
+            time.sleep(0.05)
+            return 200,{},{'id':'w1'}
+
+        self.server.route('GET','/api/v1/wallet/w1',slow)
+        self.server.route('GET','/api/v1/wallet/w9',lambda request,body: (404,{},{'error':'no'}))
+
+    def test_hooks_in_order(self):
+        log = []
+        middlewares = [Recorder('first',log),Recorder('second',log)]
+        with BitGoClient(env=self.server.endpoint,middlewares=middlewares) as client:
+            BitGoWallet.get(client,'token','w1')
+            with self.assertRaises(NotFound):
+                BitGoWallet.get(client,'token','w9')
+
+        self.assertEqual(log,[('first','before_send','get','/wallet/w1','READ'),
+                              ('second','before_send','get','/wallet/w1','READ'),
+                              ('first','after_receive',200,'sent'),
+                              ('second','after_receive',200,'sent'),
+                              ('first','before_send','get','/wallet/w9','READ'),
+                              ('second','before_send','get','/wallet/w9','READ'),
+                              ('first','on_error',404,'NotFound',True),
+                              ('second','on_error',404,'NotFound',True)])
+
+    def test_stage_timings(self):
+        contexts = []
+        timing = TimingMiddleware(callback=contexts.append)
+        with BitGoClient(env=self.server.endpoint,middlewares=[timing]) as client:
+            BitGoWallet.get(client,'token','w1')
+            BitGoWallet.get(client,'token','w1')
+
+        first,second = [context.timings for context in contexts]
+        #Only the first request opened a connection, the second one reused it
+        self.assertIn('connect',first)
+        self.assertNotIn('connect',second)
+        for timings in (first,second):
+            self.assertGreaterEqual(timings['server'],0.04)
+            self.assertIn('transfer',timings)
+            self.assertIn('parse',timings)
+            self.assertGreaterEqual(timings['total'],timings['server'])
+
+        snapshot = timing.snapshot()
+        self.assertEqual(snapshot[('READ','total')]['count'],2)
+        self.assertEqual(snapshot[('READ','server')]['count'],2)
+        self.assertEqual(snapshot[('READ','connect')]['count'],1)
+
+    def test_failures_are_observed(self):
+        timing = TimingMiddleware()
+        with BitGoClient(env=self.server.endpoint,middlewares=[timing]) as client:
+            with self.assertRaises(NotFound):
+                BitGoWallet.get(client,'token','w9')
+            client.get('wallet')
+
+        snapshot = timing.snapshot()
+        self.assertEqual(snapshot[('READ','total')]['count'],1)
+        self.assertEqual(snapshot[(None,'total')]['count'],1)
+
+    def test_without_middlewares(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            self.assertEqual(client.middlewares,[])
+            self.assertEqual(BitGoWallet.get(client,'token','w1')['id'],'w1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import time
+import unittest
+
+import requests
+
+from bitgo.async_client import AsyncBitGoClient
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoException,ProxyUnavailable
+from bitgo.proxy import ProxyPool
+from bitgo.transport import RequestsTransport
+
+from test.server import LocalServer
+
+PROXIES = [{'ip':'10.0.0.1','port':3128},
+           {'ip':'10.0.0.2','port':3128}]
+
+
+class FailingTransport(RequestsTransport):
+
+    def request(self,*args,**kwargs):
+        raise requests.exceptions.SSLError('handshake failed')
+
+
+class ProxyPoolTest(unittest.TestCase):
+
+    def test_token_is_pinned_when_selected(self):
+        pool = ProxyPool(PROXIES)
+        first = pool.select(token='a')
+        #A concurrent request sent before any response came back
+        self.assertIs(pool.select(token='a'),first)
+        self.assertIsNot(pool.select(token='b'),first)
+
+    def test_pin_is_kept_on_2xx_only(self):
+        pool = ProxyPool(PROXIES)
+        state = pool.select(token='a')
+        pool.record_success(state,0.1,token='a',status=403)
+        self.assertIsNot(pool.select(token='a'),state)
+
+        other = pool.select(token='b')
+        pool.record_success(other,0.1,token='b',status=200)
+        pool.record_success(other,0.1,token='b',status=404)
+        self.assertIs(pool.select(token='b'),other)
+
+    def test_failure_drops_an_unkept_pin(self):
+        pool = ProxyPool(PROXIES,failure_threshold=1)
+        state = pool.select(token='a')
+        pool.record_failure(state,token='a')
+        self.assertIsNot(pool.select(token='a'),state)
+
+    def test_kept_pin_to_a_down_proxy(self):
+        pool = ProxyPool(PROXIES,failure_threshold=1)
+        state = pool.select(token='a')
+        pool.record_success(state,0.1,token='a')
+        pool.record_failure(state,token='a')
+        with self.assertRaises(ProxyUnavailable):
+            pool.select(token='a')
+
+    def test_pins_are_bounded(self):
+        pool = ProxyPool(PROXIES,max_pins=10)
+        for i in range(100):
+            pool.record_success(pool.select(token=str(i)),0.1,token=str(i))
+        self.assertEqual(len(pool._pins),10)
+        self.assertEqual(sum(stats['tokens'] for stats in pool.stats().values()),10)
+
+    def test_released_probe(self):
+        pool = ProxyPool(PROXIES[:1],failure_threshold=1,cooldown=0.05)
+        pool.record_failure(pool.select())
+        with self.assertRaises(ProxyUnavailable):
+            pool.select()
+
+        time.sleep(0.06)
+        probe = pool.select()
+        with self.assertRaises(ProxyUnavailable):
+            pool.select()
+
+        pool.release(probe)
+        self.assertIs(pool.select(),probe)
+
+    def test_probe_without_outcome_times_out(self):
+        pool = ProxyPool(PROXIES[:1],failure_threshold=1,cooldown=0.05)
+        pool.record_failure(pool.select())
+        time.sleep(0.06)
+        probe = pool.select()
+
+        time.sleep(0.06)
+        self.assertIs(pool.select(),probe)
+        pool.record_success(probe,0.1)
+        self.assertTrue(pool.stats()['10.0.0.1:3128']['up'])
+
+
+class ProxyPoolClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.proxies = [LocalServer(),LocalServer()]
+        for proxy in self.proxies:
+            self.addCleanup(proxy.close)
+
+        self.pool = ProxyPool([{'ip':'127.0.0.1','port':proxy.port} for proxy in self.proxies],
+                              failure_threshold=1,cooldown=0.05)
+
+    def test_tokens_stick_to_their_proxy(self):
+        with BitGoClient(env='http://bitgo.test/api/v1',proxy_pool=self.pool) as client:
+            for _ in range(3):
+                for token in ('a','b'):
+                    client.get('wallet',access_token=token)
+
+        for proxy in self.proxies:
+            self.assertEqual(len(proxy.requests),3)
+            self.assertEqual(len(set(request['headers']['Authorization'] for request in proxy.requests)),1)
+
+    def test_other_errors_release_the_probe(self):
+        state = self.pool.select(token='a')
+        self.pool.record_failure(state)
+        time.sleep(0.06)
+
+        transport = FailingTransport(requests.Session())
+        with BitGoClient(env='http://bitgo.test/api/v1',proxy_pool=self.pool,
+                         transport=transport) as client:
+            for _ in range(2):
+                with self.assertRaises(BitGoException):
+                    client.get('wallet',access_token='a')
+
+        self.assertFalse(state.probing)
+
+
+class AsyncProxyPoolClientTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cancelled_probe_is_released(self):
+        with LocalServer() as proxy:
+            url = 'http://bitgo.test/api/v1/slow'
+            proxy.route('GET',url,lambda handler,body: (time.sleep(0.5),(200,{},{}))[1])
+            pool = ProxyPool([{'ip':'127.0.0.1','port':proxy.port}],failure_threshold=1,cooldown=0.05)
+
+            state = pool.select()
+            pool.record_failure(state)
+            time.sleep(0.06)
+
+            async with AsyncBitGoClient(env='http://bitgo.test/api/v1',proxy_pool=pool) as client:
+                task = asyncio.ensure_future(client.get('slow'))
+                await asyncio.sleep(0.1)
+                self.assertTrue(state.probing)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+            self.assertFalse(state.probing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import time
+import unittest
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoClientException,TooManyRequests
+from bitgo.ratelimit import FileTokenBucket,RateLimiter,TokenBucket,fcntl
+from bitgo.wallet.wallet import BitGoWallet
+
+from test.server import LocalServer
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10,capacity=3)
+        self.assertEqual([bucket.reserve() for _ in range(3)],[0.0,0.0,0.0])
+
+        #Callers past the burst are queued a tenth of a second apart
+        delays = [bucket.reserve() for _ in range(3)]
+        for expected,delay in zip((0.1,0.2,0.3),delays):
+            self.assertAlmostEqual(delay,expected,delta=0.02)
+
+    def test_capacity_defaults_to_rate(self):
+        self.assertEqual(TokenBucket(rate=5).capacity,5)
+        with self.assertRaises(BitGoClientException):
+            TokenBucket(rate=0)
+
+    def test_refund(self):
+        bucket = TokenBucket(rate=1,capacity=2)
+        bucket.reserve(tokens=2)
+        bucket.refund()
+        self.assertEqual(bucket.reserve(),0.0)
+        self.assertGreater(bucket.reserve(),0.5)
+
+    def test_refund_is_capped_at_capacity(self):
+        bucket = TokenBucket(rate=1,capacity=2)
+        bucket.refund(tokens=5)
+        self.assertEqual([bucket.reserve() for _ in range(2)],[0.0,0.0])
+        self.assertGreater(bucket.reserve(),0.5)
+
+    def test_acquire_waits(self):
+        bucket = TokenBucket(rate=20,capacity=1)
+        start = time.perf_counter()
+        for _ in range(4):
+            bucket.acquire()
+        self.assertGreaterEqual(time.perf_counter() - start,0.14)
+
+
+@unittest.skipIf(fcntl is None,'fcntl is not available')
+class FileTokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        fd,self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.unlink(self.path)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.unlink(self.path))
+
+    def test_buckets_share_the_file(self):
+        first = FileTokenBucket(self.path,rate=1,capacity=2)
+        second = FileTokenBucket(self.path,rate=1,capacity=2)
+
+        self.assertEqual(first.reserve(),0.0)
+        self.assertEqual(second.reserve(),0.0)
+        self.assertGreater(first.reserve(),0.5)
+
+    def test_refund_is_capped_at_capacity(self):
+        bucket = FileTokenBucket(self.path,rate=1,capacity=2)
+        bucket.refund(tokens=5)
+        self.assertEqual([bucket.reserve() for _ in range(2)],[0.0,0.0])
+        self.assertGreater(bucket.reserve(),0.5)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_buckets_per_action(self):
+        limiter = RateLimiter(default=TokenBucket(rate=1,capacity=1),
+                              buckets={'LIST':TokenBucket(rate=1,capacity=2)})
+
+        self.assertEqual(limiter.reserve(action='LIST'),0.0)
+        self.assertEqual(limiter.reserve(action='LIST'),0.0)
+        self.assertEqual(limiter.reserve(action='READ'),0.0)
+        self.assertGreater(limiter.reserve(),0.5)
+        self.assertEqual(RateLimiter().reserve(action='LIST'),0.0)
+
+    def test_client_waits_on_the_limiter(self):
+        limiter = RateLimiter(default=TokenBucket(rate=20,capacity=1))
+        with LocalServer() as server:
+            with BitGoClient(env=server.endpoint,rate_limiter=limiter) as client:
+                start = time.perf_counter()
+                for _ in range(4):
+                    client.get('wallet')
+                elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(server.requests),4)
+        self.assertGreaterEqual(elapsed,0.14)
+
+    def test_client_buckets_per_action(self):
+        limiter = RateLimiter(buckets={'LIST':TokenBucket(rate=5,capacity=1)})
+        with LocalServer() as server:
+            with BitGoClient(env=server.endpoint,rate_limiter=limiter) as client:
+                start = time.perf_counter()
+                for _ in range(5):
+                    BitGoWallet.get(client,'token','w1')
+                reads = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for _ in range(3):
+                    BitGoWallet.list(client,'token')
+                lists = time.perf_counter() - start
+
+        #Only the LIST action has a bucket of its own
+        self.assertGreaterEqual(lists,0.38)
+        self.assertLess(reads,lists)
+        self.assertEqual(len(server.requests),8)
+
+    def test_too_many_requests(self):
+        with LocalServer() as server:
+            server.route('GET','/api/v1/wallet',
+                         lambda handler,body: (429,{},{'error':'slow down'}))
+            with BitGoClient(env=server.endpoint) as client:
+                with self.assertRaises(TooManyRequests) as raised:
+                    client.get('wallet')
+
+        self.assertEqual(raised.exception.status_code,429)
+        self.assertIn('slow down',str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from bitgo.client import BitGoClient
+from bitgo.keychains import BitGoKeychains
+from bitgo.resource import BitGoResource
+from bitgo.wallet.share import BitGoWalletShare
+from bitgo.wallet.wallet import BitGoWallet,BitGoWalletTransaction
+
+from test.server import LocalServer
+
+TRANSACTION = {'id':'ab' * 32,
+               'outputs':[{'account':'2N1','value':5000,'vout':0},
+                          {'account':'2N2','value':2000,'vout':1}],
+               'entries':[{'account':'2N1','value':-7500},
+                          {'account':'2N2','value':2000}],
+               'fee':500}
+
+
+class BitGoResourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = BitGoClient()
+        self.addCleanup(self.client.close)
+
+    def test_resources_are_slotted(self):
+        wallet = BitGoWallet(self.client,'token',{'id':'w1','spendingAccount':True})
+        with self.assertRaises(AttributeError):
+            wallet.__dict__
+        self.assertTrue(wallet.spendingAccount)
+        self.assertEqual(wallet['id'],'w1')
+
+    def test_properties_are_not_copied(self):
+        properties = {'id':'w1'}
+        wallet = BitGoWallet(self.client,'token',properties)
+        self.assertIs(wallet.properties,properties)
+
+    def test_subresources_are_built_once(self):
+        tx = BitGoWalletTransaction(self.client,'token',TRANSACTION)
+
+        outputs = tx.outputs
+        self.assertIs(tx.outputs,outputs)
+        self.assertTrue(all(isinstance(output,BitGoResource) for output in outputs))
+        self.assertEqual([output.value for output in outputs],[5000,2000])
+        self.assertEqual([entry.account for entry in tx.entries],['2N1','2N2'])
+        self.assertEqual(tx.fee,500)
+        self.assertIs(tx.outputs[0].properties,TRANSACTION['outputs'][0])
+
+    def test_wallet_keychains(self):
+        wallet = BitGoWallet(self.client,'token',{'id':'w1',
+                                                  'keychains':[{'xpub':'xpub1','path':'/0'},
+                                                               {'xpub':'xpub2','path':'/0'}]})
+
+        keychains = wallet.keychains
+        self.assertTrue(all(isinstance(keychain,BitGoKeychains) for keychain in keychains))
+        self.assertEqual([keychain.xpub for keychain in keychains],['xpub1','xpub2'])
+
+    def test_missing_property(self):
+        wallet = BitGoWallet(self.client,'token',{'id':'w1'})
+        with self.assertRaises(AttributeError):
+            wallet.keychains
+
+
+class BitGoWalletTransactionTest(unittest.TestCase):
+
+    def test_get(self):
+        with LocalServer() as server:
+            server.route('GET','/api/v1/wallet/w1/tx/' + TRANSACTION['id'],
+                         lambda handler,body: (200,{},TRANSACTION))
+            with BitGoClient(env=server.endpoint) as client:
+                tx = BitGoWalletTransaction.get(client,'token',TRANSACTION['id'],'w1')
+
+        self.assertIsInstance(tx,BitGoWalletTransaction)
+        self.assertEqual(sum(entry.value for entry in tx.entries),-5500)
+
+
+class BitGoWalletShareTest(unittest.TestCase):
+
+    SHARES = {'incoming':[{'id':'s1','walletId':'w1'}],'outgoing':[]}
+
+    def test_slotted(self):
+        with BitGoClient() as client:
+            share = BitGoWalletShare(client,'token',{'id':'s1','walletId':'w1'})
+            with self.assertRaises(AttributeError):
+                share.__dict__
+            self.assertEqual(share.walletId,'w1')
+
+    def test_list_shares(self):
+        with LocalServer() as server:
+            server.route('GET','/api/v1/walletshare',lambda handler,body: (200,{},self.SHARES))
+            with BitGoClient(env=server.endpoint) as client:
+                shares = BitGoWalletShare.list_shares(client,'token')
+                raw = BitGoWalletShare.list_shares(client,'token',retrieve=False)
+
+        self.assertIsInstance(shares,BitGoWalletShare)
+        self.assertEqual(shares.incoming,self.SHARES['incoming'])
+        self.assertEqual(raw,self.SHARES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import time
+import unittest
+
+from bitgo.cache import ResponseCache
+from bitgo.client import BitGoClient
+from bitgo.errors import NotFound
+from bitgo.wallet.wallet import BitGoWallet
+
+from test.server import LocalServer
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(maxsize=2)
+        for name in ('a','b'):
+            cache.set(cache.make_key('token','get',name),{name:1})
+        cache.get(cache.make_key('token','get','a'))
+        cache.set(cache.make_key('token','get','c'),{'c':1})
+
+        self.assertIs(cache.get(cache.make_key('token','get','b')),ResponseCache.MISSING)
+        self.assertEqual(cache.get(cache.make_key('token','get','a')),{'a':1})
+        self.assertEqual(cache.stats()['evictions'],1)
+
+    def test_keys(self):
+        cache = ResponseCache()
+        self.assertEqual(cache.make_key('token','GET','/wallet/?limit=1',{'a':1,'b':2}),
+                         cache.make_key('token','get','wallet',{'b':2,'a':1}))
+        self.assertNotEqual(cache.make_key('token','get','wallet'),
+                            cache.make_key('other','get','wallet'))
+
+    def test_invalidation_of_related_urls(self):
+        cache = ResponseCache()
+        for url in ('wallet','wallet/w1','wallet/w1/tx','wallet/w2','keychain'):
+            cache.set(cache.make_key('token','get',url),{})
+
+        cache.invalidate('wallet/w1')
+        self.assertEqual(sorted(key[2] for key in cache._entries),['keychain','wallet/w2'])
+        self.assertEqual(cache.stats()['invalidations'],3)
+
+
+class ClientResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.server.route('GET','/api/v1/wallet',lambda request,body: (200,{},{'wallets':[]}))
+        self.server.route('GET','/api/v1/wallet/w1',lambda request,body: (200,{},{'id':'w1'}))
+        self.server.route('GET','/api/v1/wallet/w9',lambda request,body: (404,{},{'error':'no'}))
+
+    def client(self,**kwargs):
+        client = BitGoClient(env=self.server.endpoint,cache=ResponseCache(**kwargs))
+        self.addCleanup(client.close)
+        return client
+
+    def paths(self):
+        return [request['path'] for request in self.server.requests]
+
+    def test_gets_are_served_from_the_cache(self):
+        client = self.client()
+        first = BitGoWallet.get(client,'token','w1')
+        second = BitGoWallet.get(client,'token','w1')
+
+        self.assertEqual(second['id'],'w1')
+        #The cached json itself is shared
+        self.assertIs(first.properties,second.properties)
+        self.assertEqual(self.paths(),['/api/v1/wallet/w1'])
+        self.assertEqual(client.cache.stats()['hits'],1)
+
+    def test_tokens_and_params_are_not_shared(self):
+        client = self.client()
+        BitGoWallet.list(client,'token')
+        BitGoWallet.list(client,'other')
+        BitGoWallet.list(client,'token',limit=5)
+        BitGoWallet.list(client,'token',limit=5)
+
+        self.assertEqual(len(self.server.requests),3)
+
+    def test_ttl_per_action(self):
+        client = self.client(default_ttl=60,ttls={'LIST':0.1,'READ':0})
+        for _ in range(2):
+            BitGoWallet.list(client,'token')
+            BitGoWallet.get(client,'token','w1')
+        time.sleep(0.15)
+        BitGoWallet.list(client,'token')
+
+        self.assertEqual(self.paths(),['/api/v1/wallet','/api/v1/wallet/w1',
+                                       '/api/v1/wallet/w1','/api/v1/wallet'])
+        self.assertEqual(client.cache.stats()['expirations'],1)
+
+    def test_writes_invalidate(self):
+        client = self.client()
+        BitGoWallet.list(client,'token')
+        BitGoWallet.get(client,'token','w1')
+        client.get('keychain',access_token='token')
+
+        client.put('wallet/w1',{'label':'new'},access_token='token')
+        BitGoWallet.list(client,'token')
+        BitGoWallet.get(client,'token','w1')
+        client.get('keychain',access_token='token')
+
+        self.assertEqual(self.paths(),['/api/v1/wallet','/api/v1/wallet/w1','/api/v1/keychain',
+                                       '/api/v1/wallet/w1','/api/v1/wallet','/api/v1/wallet/w1'])
+
+    def test_errors_are_not_cached(self):
+        client = self.client()
+        for _ in range(2):
+            with self.assertRaises(NotFound):
+                BitGoWallet.get(client,'token','w9')
+
+        self.assertEqual(len(self.server.requests),2)
+        self.assertEqual(len(client.cache),0)
+
+
+if __name__ == '__main__':
+    unittest.main()
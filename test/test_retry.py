@@ -0,0 +1,152 @@
+import socket
+import time
+import unittest
+from email.utils import formatdate
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoException,HttpError
+from bitgo.retry import RetryPolicy
+
+from test.server import LocalServer
+
+
+class RecordingPolicy(RetryPolicy):
+
+    """ RetryPolicy keeping the delays it slept for."""
+
+    def __init__(self,**kwargs):
+        super(RecordingPolicy,self).__init__(**kwargs)
+        self.slept = []
+
+    def sleep(self,seconds):
+        self.slept.append(seconds)
+
+
+def statuses(*answers):
+
+    """ Answers with the (status,headers) of answers in turn, then
+        with a 200.
+    """
+
+    answers = list(answers)
+
+    def handler(request,body):
+        if answers:
+            status,headers = answers.pop(0)
+            return status,headers,{'error':'try again'}
+        return 200,{},{'ok':True}
+    return handler
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(backoff_factor=0.5,max_backoff=3.0,jitter=False)
+        self.assertEqual([policy.backoff(attempt) for attempt in range(1,6)],
+                         [0.5,1.0,2.0,3.0,3.0])
+
+        jittered = RetryPolicy(backoff_factor=0.5)
+        for _ in range(50):
+            self.assertTrue(0 <= jittered.backoff(3) <= 2.0)
+
+    def test_parse_retry_after(self):
+        policy = RetryPolicy()
+        self.assertEqual(policy.parse_retry_after('2'),2.0)
+        self.assertEqual(policy.parse_retry_after('-5'),0.0)
+        self.assertIsNone(policy.parse_retry_after('soon'))
+        self.assertIsNone(policy.parse_retry_after(None))
+        self.assertAlmostEqual(policy.parse_retry_after(formatdate(time.time() + 30,usegmt=True)),
+                               30,delta=1.5)
+
+    def test_statuses(self):
+        policy = RetryPolicy(max_attempts=2,jitter=False,backoff_factor=1.0,max_retry_after=10)
+        self.assertIsNone(policy.on_status('get',404,{},1))
+        self.assertEqual(policy.on_status('get',500,{'Retry-After':'5'},1),1.0)
+        self.assertEqual(policy.on_status('get',503,{'Retry-After':'5'},1),5.0)
+        self.assertIsNone(policy.on_status('get',429,{'Retry-After':'11'},1))
+        self.assertIsNone(policy.on_status('post',503,{},1))
+        self.assertIsNone(policy.on_status('get',503,{},2))
+        self.assertEqual(policy.stats(),{'retries':2,'exhausted':1,'reasons':{500:1,503:1}})
+
+        policy.reset_stats()
+        self.assertEqual(policy.stats(),{'retries':0,'exhausted':0,'reasons':{}})
+
+
+class ClientRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+    def test_retries_until_success(self):
+        self.server.route('GET','/api/v1/wallet',statuses((503,{}),(502,{})))
+        retry = RecordingPolicy(max_attempts=3,backoff_factor=0.1,jitter=False)
+        with BitGoClient(env=self.server.endpoint,retry=retry) as client:
+            self.assertEqual(client.get('wallet'),{'ok':True})
+
+        self.assertEqual(len(self.server.requests),3)
+        self.assertEqual(retry.slept,[0.1,0.2])
+        self.assertEqual(retry.stats()['reasons'],{503:1,502:1})
+
+    def test_last_response_once_exhausted(self):
+        self.server.route('GET','/api/v1/wallet',statuses(*[(500,{})] * 5))
+        retry = RecordingPolicy(max_attempts=3)
+        with BitGoClient(env=self.server.endpoint,retry=retry) as client:
+            with self.assertRaises(HttpError) as raised:
+                client.get('wallet')
+
+        self.assertEqual(raised.exception.status_code,500)
+        self.assertEqual(len(self.server.requests),3)
+        self.assertEqual(retry.stats()['exhausted'],1)
+
+    def test_retry_after_is_honored(self):
+        self.server.route('GET','/api/v1/wallet',statuses((429,{'Retry-After':'7'})))
+        retry = RecordingPolicy(backoff_factor=0.01)
+        with BitGoClient(env=self.server.endpoint,retry=retry) as client:
+            self.assertEqual(client.get('wallet'),{'ok':True})
+
+        self.assertEqual(retry.slept,[7.0])
+
+    def test_retry_after_past_the_deadline(self):
+        self.server.route('GET','/api/v1/wallet',statuses((503,{'Retry-After':'1'})))
+        retry = RetryPolicy()
+        with BitGoClient(env=self.server.endpoint,retry=retry) as client:
+            start = time.perf_counter()
+            with self.assertRaises(HttpError):
+                client.get('wallet',deadline=0.5)
+
+        #Not waited for, the 503 is raised right away
+        self.assertLess(time.perf_counter() - start,0.5)
+        self.assertEqual(len(self.server.requests),1)
+
+    def test_posts_are_not_retried(self):
+        self.server.route('POST','/api/v1/wallet',statuses((503,{})))
+        with BitGoClient(env=self.server.endpoint,retry=RecordingPolicy()) as client:
+            with self.assertRaises(HttpError):
+                client.post('wallet',{'label':'a'})
+        self.assertEqual(len(self.server.requests),1)
+
+        retry = RecordingPolicy(retry_non_idempotent=True)
+        with BitGoClient(env=self.server.endpoint,retry=retry) as client:
+            self.assertEqual(client.post('wallet',{'label':'a'}),{'ok':True})
+        self.assertEqual(len(self.server.requests),2)
+
+    def test_connection_errors_are_retried(self):
+        #A port nothing listens on
+        sock = socket.socket()
+        sock.bind(('127.0.0.1',0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        retry = RecordingPolicy(max_attempts=3)
+        endpoint = 'http://127.0.0.1:{port}/api/v1'.format(port=port)
+        with BitGoClient(env=endpoint,retry=retry) as client:
+            with self.assertRaises(BitGoException):
+                client.get('wallet')
+
+        self.assertEqual(len(retry.slept),2)
+        self.assertEqual(retry.stats()['reasons'],{'ConnectionError':2})
+
+
+if __name__ == '__main__':
+    unittest.main()
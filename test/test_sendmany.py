@@ -0,0 +1,221 @@
+import json
+import time
+import unittest
+
+from bitgo.breaker import CircuitBreaker
+from bitgo.client import BitGoClient
+from bitgo.deadline import Deadline
+from bitgo.errors import (BadRequest,BitGoException,BitGoResourceException,CircuitOpen,
+                          DeadlineExceeded,HttpError,InvalidTransaction)
+from bitgo.signing import TransactionSigner
+from bitgo.transaction import Transaction
+from bitgo.wallet.coinselection import CoinSelector
+from bitgo.wallet.transaction import SendManyBuilder
+from bitgo.wallet.unspents import UnspentIndex
+
+from test.server import LocalServer
+from test.test_signing import KEYS,FakeSigner,redeem_script
+from test.test_unspents import fake_hash
+
+ADDRESSES = ('3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy','1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2')
+
+
+def recipients(count):
+    return [{'address':ADDRESSES[i % 2],'amount':10000 + i} for i in range(count)]
+
+
+class SendManyBuilderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = UnspentIndex('w1')
+        for i in range(50):
+            self.index.add(fake_hash(i),0,100000,height=100)
+        self.builder = SendManyBuilder(self.index,CoinSelector(min_confirms=0),max_recipients=3)
+
+        #Every batch is answered with the status picked by self.status
+        #out of its first amount, and a hash naming that amount
+        self.status = lambda amount: 200
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+        def sendmany(request,body):
+            data = json.loads(body.decode('utf-8'))
+            first = data['recipients'][0]['amount']
+            status = self.status(first)
+            if status is None:
+                #Sent, but the client gives up before the answer
+                time.sleep(0.5)
+                status = 200
+            if status != 200:
+                return status,{},{'error':'rejected'}
+            return 200,{},{'hash':'tx-{a}'.format(a=first)}
+
+        self.server.route('POST','/api/v1/wallet/w1/sendmany',sendmany)
+
+    def send(self,count,client_params=None,**params):
+        with BitGoClient(env=self.server.endpoint,**(client_params or {})) as client:
+            return self.builder.send(client,'token',recipients(count),
+                                     wallet_passphrase='secret',**params)
+
+    def sent(self):
+        return [json.loads(request['body'].decode('utf-8')) for request in self.server.requests]
+
+    def test_batches(self):
+        outcomes = self.send(7)
+
+        sent = sorted(self.sent(),key=lambda data: data['recipients'][0]['amount'])
+        self.assertEqual([len(data['recipients']) for data in sent],[3,3,1])
+        self.assertEqual([recipient['amount'] for data in sent for recipient in data['recipients']],
+                         [10000 + i for i in range(7)])
+        self.assertTrue(all(data['walletPassphrase'] == 'secret' for data in sent))
+
+        #No two batches spend the same output, and none is left in the index
+        spent = [outpoint for data in sent for outpoint in data['unspents']]
+        self.assertEqual(len(spent),len(set(spent)))
+        self.assertEqual(len(self.index),50 - len(spent))
+
+        self.assertEqual([outcome.batch for outcome in outcomes],[0,0,0,1,1,1,2])
+        self.assertEqual([outcome.tx_hash for outcome in outcomes],
+                         ['tx-10000'] * 3 + ['tx-10003'] * 3 + ['tx-10006'])
+        self.assertTrue(all(outcome.ok for outcome in outcomes))
+
+    def test_rejected_batch_is_restored(self):
+        self.status = lambda amount: 400 if amount == 10003 else 200
+        outcomes = self.send(7,concurrency=1)
+
+        rejected = [data for data in self.sent() if data['recipients'][0]['amount'] == 10003][0]
+        for outpoint in rejected['unspents']:
+            tx_hash,tx_output_n = outpoint.split(':')
+            self.assertIn((tx_hash,int(tx_output_n)),self.index)
+
+        self.assertEqual([outcome.tx_hash for outcome in outcomes],
+                         ['tx-10000'] * 3 + [None] * 3 + ['tx-10006'])
+        for outcome in outcomes[3:6]:
+            self.assertIsInstance(outcome.error,BadRequest)
+            self.assertEqual(outcome.error.status_code,400)
+        self.assertTrue(all(outcome.ok for outcome in outcomes[:3] + outcomes[6:]))
+
+    def test_failed_batch_stays_spent(self):
+        self.status = lambda amount: 500
+        outcomes = self.send(4)
+
+        spent = [outpoint for data in self.sent() for outpoint in data['unspents']]
+        self.assertEqual(len(self.index),50 - len(spent))
+        for outcome in outcomes:
+            self.assertIsInstance(outcome.error,HttpError)
+            self.assertNotIsInstance(outcome.error,BadRequest)
+            self.assertEqual(outcome.error.status_code,500)
+
+    def test_unsent_batches_are_restored(self):
+        breaker = CircuitBreaker(min_calls=1)
+        breaker.record(breaker.before_call('SEND_MANY'),0.01,failed=True)
+        outcomes = self.send(4,client_params={'circuit_breaker':breaker})
+
+        self.assertEqual(self.server.requests,[])
+        self.assertEqual(len(self.index),50)
+        for outcome in outcomes:
+            self.assertIsInstance(outcome.error,CircuitOpen)
+            self.assertIs(outcome.error.sent,False)
+
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        outcomes = self.send(4,deadline=deadline)
+
+        self.assertEqual(self.server.requests,[])
+        self.assertEqual(len(self.index),50)
+        self.assertTrue(all(isinstance(outcome.error,DeadlineExceeded) for outcome in outcomes))
+
+    def test_timed_out_batch_stays_spent(self):
+        self.status = lambda amount: None
+        outcomes = self.send(2,client_params={'timeout':0.1})
+
+        spent = [outpoint for data in self.sent() for outpoint in data['unspents']]
+        self.assertTrue(spent)
+        self.assertEqual(len(self.index),50 - len(spent))
+        for outcome in outcomes:
+            self.assertIsInstance(outcome.error,BitGoException)
+            self.assertIsNone(outcome.error.sent)
+
+    def test_unfunded_recipient(self):
+        payments = recipients(2)
+        payments.insert(1,{'address':ADDRESSES[0],'amount':10 ** 9})
+        with BitGoClient(env=self.server.endpoint) as client:
+            outcomes = self.builder.send(client,'token',payments)
+
+        self.assertTrue(outcomes[0].ok)
+        self.assertIsNone(outcomes[1].batch)
+        self.assertIsNotNone(outcomes[1].error)
+        self.assertTrue(outcomes[2].ok)
+
+    def test_invalid_recipients(self):
+        invalid = [{'address':ADDRESSES[0],'amount':True},
+                   {'address':ADDRESSES[0],'amount':0},
+                   {'address':ADDRESSES[0],'amount':'1000'},
+                   {'address':ADDRESSES[0][:-1] + 'x','amount':1000},
+                   {'address':'not an address','amount':1000},
+                   {'address':None,'amount':1000},
+                   {'amount':1000}]
+        for recipient in invalid:
+            with self.assertRaises(BitGoResourceException):
+                self.builder.build([recipient])
+        self.assertEqual(len(self.index),50)
+
+
+class LocalSigningTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeSigner()
+        self.script = redeem_script(self.fake)
+        self.index = UnspentIndex('w1')
+        for i in range(20):
+            self.index.add(fake_hash(i),0,100000,height=100,
+                           details={'redeemScript':self.script.hex()})
+        self.builder = SendManyBuilder(self.index,CoinSelector(min_confirms=0),max_recipients=3)
+
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+        def send(request,body):
+            tx = Transaction.from_hex(json.loads(body.decode('utf-8'))['tx'])
+            return 200,{},{'transaction':tx.to_hex(),'transactionHash':tx.txid}
+
+        self.server.route('POST','/api/v1/tx/send',send)
+
+    def send(self,count,**params):
+        with BitGoClient(env=self.server.endpoint) as client:
+            return self.builder.send(client,'token',recipients(count),
+                                     signer=TransactionSigner(signer=self.fake),
+                                     change_address=ADDRESSES[1],**params)
+
+    def test_batches_are_signed_locally(self):
+        outcomes = self.send(4,keys=KEYS[0],wallet_passphrase='secret')
+
+        sent = [json.loads(request['body'].decode('utf-8')) for request in self.server.requests]
+        self.assertEqual(len(sent),2)
+        self.assertTrue(all('walletPassphrase' not in data for data in sent))
+
+        hashes = set()
+        for data in sent:
+            tx = Transaction.from_hex(data['tx'])
+            hashes.add(tx.txid)
+            for index,tx_input in enumerate(tx.inputs):
+                self.assertTrue(tx_input.script.endswith(self.script))
+                #Only the user key signed, BitGo signs the rest
+                signature = self.fake(tx.signature_hash(index,self.script),KEYS[0]) + b'\x01'
+                self.assertEqual(tx_input.script[2:2 + len(signature)],signature)
+        self.assertEqual({outcome.tx_hash for outcome in outcomes},hashes)
+
+    def test_unsigned_batches_are_restored(self):
+        self.index.clear()
+        self.index.add(fake_hash('no script'),0,10 ** 7,height=100)
+        outcomes = self.send(2,keys=KEYS[0])
+
+        self.assertEqual(self.server.requests,[])
+        self.assertEqual(len(self.index),1)
+        for outcome in outcomes:
+            self.assertIsInstance(outcome.error,InvalidTransaction)
+            self.assertIs(outcome.error.sent,False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+import hashlib
+import unittest
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoResourceException,InvalidTransaction
+from bitgo.pending_approval import BitGoPendingApprovals
+from bitgo.signing import ECDSASigner,TransactionSigner,ecdsa
+from bitgo.transaction import Transaction,multisig_pubkeys,push_data
+from bitgo.wallet.coinselection import CoinSelector
+from bitgo.wallet.unspents import UnspentIndex
+
+from test.test_unspents import fake_hash
+
+
+class FakeSigner(object):
+
+    """ Stands in for ECDSASigner: the 'signature' of a digest is a
+        hash of it and the key, the public key a hash of the key.
+    """
+
+    def __init__(self):
+        self.signed = []
+
+    def public_key(self,key):
+        return b'\x02' + hashlib.sha256(b'public' + key).digest()
+
+    def __call__(self,digest,key):
+        self.signed.append(digest)
+        return b'\x30' + hashlib.sha256(digest + key).digest()
+
+
+KEYS = [hashlib.sha256(name).digest() for name in (b'user',b'backup',b'bitgo')]
+
+
+def redeem_script(signer):
+    #OP_2 <user> <backup> <bitgo> OP_3 OP_CHECKMULTISIG
+    return b'\x52' + b''.join(b'\x21' + signer.public_key(key) for key in KEYS) + b'\x53\xae'
+
+
+def consolidation(inputs):
+    tx = Transaction()
+    for i in range(inputs):
+        tx.add_input(fake_hash(i),i % 4,value=100000)
+    tx.add_output(inputs * 100000 - 50000,'3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy')
+    return tx
+
+
+class TransactionSignerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeSigner()
+        self.signer = TransactionSigner(signer=self.fake)
+        self.script = redeem_script(self.fake)
+
+    def test_batched_hashes_match_one_by_one(self):
+        tx = consolidation(150)
+        scripts = [self.script[:-3] + bytes([0x51 + i % 3]) + b'\xae' for i in range(150)]
+
+        self.assertEqual(self.signer.signature_hashes(tx,scripts),
+                         [tx.signature_hash(i,script) for i,script in enumerate(scripts)])
+
+    def test_sign(self):
+        tx = consolidation(10)
+        signatures = self.signer.sign(tx,KEYS[0],self.script)
+
+        digests = [tx.signature_hash(i,self.script) for i in range(10)]
+        self.assertEqual(self.fake.signed,digests)
+        self.assertEqual(signatures,[self.fake(digest,KEYS[0]) + b'\x01' for digest in digests])
+        self.assertEqual(self.signer.sign(tx,[KEYS[0]] * 10,[self.script] * 10),signatures)
+
+        with self.assertRaises(InvalidTransaction):
+            self.signer.sign(tx,[KEYS[0]] * 9,self.script)
+        with self.assertRaises(InvalidTransaction):
+            self.signer.sign(tx,KEYS[0],[self.script] * 11)
+
+    def test_multisig_signatures_in_public_key_order(self):
+        tx = consolidation(3)
+        digests = [tx.signature_hash(i,self.script) for i in range(3)]
+        bitgo = [self.fake(digest,KEYS[2]) + b'\x01' for digest in digests]
+
+        #The user key signs after BitGo's, its signature still goes first
+        signed = self.signer.sign_multisig(tx,KEYS[0],self.script,
+                                           signatures=[{2:signature} for signature in bitgo])
+
+        for i,tx_input in enumerate(tx.inputs):
+            user = self.fake(digests[i],KEYS[0]) + b'\x01'
+            self.assertEqual(signed[i],{0:user,2:bitgo[i]})
+            self.assertEqual(tx_input.script,b'\x00' + push_data(user) + push_data(bitgo[i]) +
+                                             push_data(self.script))
+
+    def test_multisig_position(self):
+        tx = consolidation(2)
+        signed = self.signer.sign_multisig(tx,KEYS[1],self.script,
+                                           signatures=[{0:b'\x30user'},{2:b'\x30bitgo'}],
+                                           position=1)
+        self.assertEqual([sorted(signatures) for signatures in signed],[[0,1],[1,2]])
+        self.assertTrue(tx.inputs[0].script.startswith(b'\x00\x05\x30user'))
+        self.assertTrue(tx.inputs[1].script[:-len(self.script) - 2].endswith(b'\x06\x30bitgo'))
+
+    def test_multisig_unknown_key(self):
+        tx = consolidation(2)
+        with self.assertRaises(InvalidTransaction):
+            self.signer.sign_multisig(tx,hashlib.sha256(b'other').digest(),self.script)
+        with self.assertRaises(InvalidTransaction):
+            self.signer.sign_multisig(tx,KEYS[0],self.script,position=3)
+        with self.assertRaises(InvalidTransaction):
+            self.signer.sign_multisig(tx,KEYS[0],b'\x76\xa9\x14' + bytes(20) + b'\x88\xac')
+
+        self.assertEqual([tx_input.script for tx_input in tx.inputs],[b'',b''])
+        self.assertEqual(self.fake.signed,[])
+
+
+class ProcessPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeSigner()
+        self.script = redeem_script(self.fake)
+        self.pooled = TransactionSigner(signer=self.fake,processes=2,min_parallel_inputs=1)
+        self.addCleanup(self.pooled.close)
+
+    def test_pool_matches_in_process(self):
+        tx = consolidation(40)
+        keys = [KEYS[i % 3] for i in range(40)]
+        expected = TransactionSigner(signer=self.fake,processes=1).sign(tx,keys,self.script)
+
+        self.assertEqual(self.pooled.sign(tx,keys,self.script),expected)
+        #The pool signed them, not the parent
+        self.assertEqual(len(self.fake.signed),40)
+
+        self.pooled.chunk_size = 7
+        self.assertEqual(self.pooled.sign(tx,keys,self.script),expected)
+
+    def test_pool_restarts_for_other_keys(self):
+        tx = consolidation(8)
+        self.pooled.sign(tx,KEYS[0],self.script)
+        pool = self.pooled._pool
+        self.pooled.sign(tx,KEYS[0],self.script)
+        self.assertIs(self.pooled._pool,pool)
+
+        signatures = self.pooled.sign(tx,KEYS[1],self.script)
+        self.assertIsNot(self.pooled._pool,pool)
+        self.assertEqual(signatures,TransactionSigner(signer=self.fake).sign(tx,KEYS[1],self.script))
+
+        self.pooled.close()
+        self.assertIsNone(self.pooled._pool)
+
+    def test_small_transactions_stay_in_process(self):
+        self.pooled.min_parallel_inputs = 10
+        self.pooled.sign(consolidation(9),KEYS[0],self.script)
+        self.assertIsNone(self.pooled._pool)
+
+
+class PendingApprovalSigningTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeSigner()
+        self.script = redeem_script(self.fake)
+        self.index = UnspentIndex('w1')
+        for i in range(5):
+            self.index.add(fake_hash(i),0,100000,height=100,
+                           details={'redeemScript':self.script.hex()})
+        self.client = BitGoClient()
+        self.addCleanup(self.client.close)
+
+    def approval(self,info):
+        return BitGoPendingApprovals(self.client,'token',{'id':'a1','info':info})
+
+    def test_recreate_and_sign_transaction(self):
+        recipients = [{'address':'3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy','amount':150000}]
+        approval = self.approval({'type':'transactionRequest',
+                                  'transactionRequest':{'recipients':recipients}})
+
+        tx = approval.recreate_and_sign_transaction(self.index,KEYS[0],
+                                                    signer=TransactionSigner(signer=self.fake),
+                                                    selector=CoinSelector(fee_rate=1000,min_confirms=0),
+                                                    change_address='1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2')
+
+        self.assertEqual(len(tx.inputs),2)
+        self.assertEqual(tx.outputs[0].value,150000)
+        self.assertEqual(len(self.index),5)
+        for index,tx_input in enumerate(tx.inputs):
+            user = self.fake(tx.signature_hash(index,self.script),KEYS[0]) + b'\x01'
+            self.assertEqual(tx_input.script,b'\x00' + push_data(user) + push_data(self.script))
+
+    def test_not_a_transaction_request(self):
+        with self.assertRaises(BitGoResourceException):
+            self.approval({'type':'userChangeRequest'}).recreate_and_sign_transaction(self.index,KEYS[0])
+
+
+@unittest.skipIf(ecdsa is None,'ecdsa is not installed')
+class ECDSASignerTest(unittest.TestCase):
+
+    def test_deterministic_signatures(self):
+        signer = ECDSASigner()
+        digest = hashlib.sha256(b'digest').digest()
+        signature = signer(digest,KEYS[0])
+
+        self.assertEqual(signature,ECDSASigner()(digest,KEYS[0]))
+        verifying_key = signer.signing_key(KEYS[0]).get_verifying_key()
+        self.assertTrue(verifying_key.verify_digest(signature,digest,sigdecode=ecdsa.util.sigdecode_der))
+        public_key = verifying_key.to_string()
+        self.assertEqual(signer.public_key(KEYS[0])[1:],public_key[:32])
+
+    def test_pool_signatures_verify(self):
+        signer = ECDSASigner()
+        script = redeem_script(signer)
+        tx = consolidation(12)
+
+        with TransactionSigner(processes=2,min_parallel_inputs=1) as pooled:
+            signatures = pooled.sign(tx,KEYS[0],script)
+        self.assertEqual(signatures,TransactionSigner(processes=1).sign(tx,KEYS[0],script))
+
+        verifying_key = signer.signing_key(KEYS[0]).get_verifying_key()
+        self.assertEqual(multisig_pubkeys(script)[0],signer.public_key(KEYS[0]))
+        for index,signature in enumerate(signatures):
+            self.assertEqual(signature[-1],1)
+            self.assertTrue(verifying_key.verify_digest(signature[:-1],tx.signature_hash(index,script),
+                                                        sigdecode=ecdsa.util.sigdecode_der))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from bitgo.async_client import AsyncBitGoClient
+from bitgo.client import BitGoClient
+from bitgo.deadline import Deadline
+from bitgo.errors import DeadlineExceeded,HttpError
+from bitgo.singleflight import AsyncSingleFlight,SingleFlight
+
+from test.server import LocalServer
+
+
+def slow(status,content,seconds=0.3):
+    def handler(request,body):
+        time.sleep(seconds)
+        return status,{},content
+    return handler
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_make_key(self):
+        self.assertEqual(SingleFlight.make_key('token','wallet',{'a':1,'b':2}),
+                         SingleFlight.make_key('token','wallet',{'b':2,'a':1}))
+        self.assertNotEqual(SingleFlight.make_key('token','wallet'),
+                            SingleFlight.make_key('other','wallet'))
+
+    def test_key_is_released(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key',lambda: 1),1)
+        self.assertEqual(flight.do('key',lambda: 2),2)
+        with self.assertRaises(ValueError):
+            flight.do('key',lambda: int('x'))
+        self.assertEqual(flight.stats(),{'executed':3,'shared':0,'in_flight':0})
+
+
+class ClientSingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.server.route('GET','/api/v1/wallet',slow(200,{'wallets':[]}))
+        self.server.route('GET','/api/v1/down',slow(503,{'error':'down'}))
+        self.flight = SingleFlight()
+        self.client = BitGoClient(env=self.server.endpoint,single_flight=self.flight)
+        self.addCleanup(self.client.close)
+
+    def concurrently(self,func,count=8):
+        barrier = threading.Barrier(count)
+
+        def call(i):
+            barrier.wait()
+            try:
+                return func(i)
+            except Exception as exc:
+                return exc
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return list(executor.map(call,range(count)))
+
+    def test_identical_gets_share_one_request(self):
+        results = self.concurrently(lambda i: self.client.get('wallet',access_token='token'))
+
+        self.assertEqual(len(self.server.requests),1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.flight.stats(),{'executed':1,'shared':7,'in_flight':0})
+
+    def test_different_params_are_not_shared(self):
+        results = self.concurrently(lambda i: self.client.request('wallet',params={'limit':i % 2},
+                                                                  access_token='token'),count=4)
+        self.assertEqual(results,[{'wallets':[]}] * 4)
+        self.assertEqual(len(self.server.requests),2)
+
+    def test_errors_reach_every_caller(self):
+        results = self.concurrently(lambda i: self.client.get('down',access_token='token'))
+
+        self.assertEqual(len(self.server.requests),1)
+        self.assertTrue(all(isinstance(result,HttpError) for result in results))
+
+    def test_waiters_have_their_own_deadline(self):
+        def call(i):
+            if i:
+                time.sleep(0.05)
+                return self.client.get('wallet',access_token='token',deadline=0.1)
+            return self.client.get('wallet',access_token='token')
+
+        results = self.concurrently(call,count=2)
+        self.assertEqual(results[0],{'wallets':[]})
+        self.assertIsInstance(results[1],DeadlineExceeded)
+        self.assertEqual(len(self.server.requests),1)
+
+    def test_released_after_completion(self):
+        self.client.get('wallet',access_token='token')
+        self.client.get('wallet',access_token='token')
+        self.assertEqual(len(self.server.requests),2)
+        self.assertEqual(self.flight.stats()['in_flight'],0)
+
+    def test_posts_are_not_coalesced(self):
+        self.concurrently(lambda i: self.client.post('wallet',{},access_token='token'),count=3)
+        self.assertEqual(len(self.server.requests),3)
+
+
+class AsyncSingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.server.route('GET','/api/v1/wallet',slow(200,{'wallets':[]}))
+        self.server.route('GET','/api/v1/down',slow(503,{'error':'down'}))
+        self.flight = AsyncSingleFlight()
+        self.client = AsyncBitGoClient(env=self.server.endpoint,single_flight=self.flight)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_identical_gets_share_one_request(self):
+        results = await asyncio.gather(*[self.client.get('wallet',access_token='token')
+                                         for _ in range(8)])
+
+        self.assertEqual(len(self.server.requests),1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.flight.stats(),{'executed':1,'shared':7,'in_flight':0})
+
+    async def test_errors_reach_every_caller(self):
+        results = await asyncio.gather(*[self.client.get('down',access_token='token')
+                                         for _ in range(4)],return_exceptions=True)
+
+        self.assertEqual(len(self.server.requests),1)
+        self.assertTrue(all(isinstance(result,HttpError) for result in results))
+
+    async def test_waiters_have_their_own_deadline(self):
+        leader = asyncio.ensure_future(self.client.get('wallet',access_token='token'))
+        await asyncio.sleep(0.05)
+        with self.assertRaises(DeadlineExceeded):
+            await self.client.get('wallet',access_token='token',deadline=0.1)
+
+        self.assertEqual(await leader,{'wallets':[]})
+        self.assertEqual(len(self.server.requests),1)
+
+    async def test_request_outlives_a_cancelled_caller(self):
+        leader = asyncio.ensure_future(self.client.get('wallet',access_token='token'))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.ensure_future(self.client.get('wallet',access_token='token'))
+        await asyncio.sleep(0.05)
+
+        leader.cancel()
+        self.assertEqual(await waiter,{'wallets':[]})
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        self.assertEqual(len(self.server.requests),1)
+
+    async def test_released_after_completion(self):
+        await self.client.get('wallet',access_token='token')
+        self.assertEqual(self.flight.stats()['in_flight'],0)
+        await self.client.get('wallet',access_token='token')
+        self.assertEqual(len(self.server.requests),2)
+
+    async def test_deadline_of_the_flight_itself(self):
+        flight = AsyncSingleFlight()
+
+        async def never():
+            await asyncio.sleep(10)
+
+        with self.assertRaises(DeadlineExceeded):
+            await asyncio.gather(flight.do('key',never),
+                                 flight.do('key',never,deadline=Deadline(0.05)))
+
+
+if __name__ == '__main__':
+    unittest.main()
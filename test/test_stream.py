@@ -0,0 +1,87 @@
+import json
+import unittest
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoException,NotFound
+from bitgo.stream import JSONItemStream
+from bitgo.wallet.wallet import BitGoWalletTransaction
+
+from test.server import LocalServer
+
+TRANSACTIONS = [{'id':'tx{i}'.format(i=i),'fee':1000 + i,'label':'café ₿ {i}'.format(i=i),
+                 'entries':[{'account':'2N{i}'.format(i=i),'value':-12345.5 * i}],
+                 'pending':i % 2 == 0,'comment':None} for i in range(20)]
+BODY = json.dumps({'start':0,'transactions':TRANSACTIONS,'count':20,
+                   'nested':{'a':[1,2,{'b':'}]'}]}},ensure_ascii=False).encode('utf-8')
+
+
+def chunked(data,size):
+    return [data[start:start + size] for start in range(0,len(data),size)]
+
+
+class JSONItemStreamTest(unittest.TestCase):
+
+    def test_every_chunk_size(self):
+        #Covers every split, inside strings, numbers, literals and
+        #multibyte characters
+        expected = json.loads(BODY.decode('utf-8'))
+        for size in list(range(1,40)) + [len(BODY)]:
+            stream = JSONItemStream(chunked(BODY,size),'transactions')
+            self.assertEqual(list(stream),expected['transactions'],size)
+            self.assertEqual(stream.metadata,{'start':0,'count':20,'nested':expected['nested']})
+
+    def test_numbers_split_across_chunks(self):
+        stream = JSONItemStream([b'{"items":[12',b'345,6',b'.5e',b'2,tr',b'ue,nul',b'l]}'],'items')
+        self.assertEqual(list(stream),[12345,650.0,True,None])
+
+    def test_top_level_array(self):
+        self.assertEqual(list(JSONItemStream(chunked(b' [ {"a":1} , [2] , "x" ] ',3))),
+                         [{'a':1},[2],'x'])
+        self.assertEqual(list(JSONItemStream([b'[',b']'])),[])
+
+    def test_str_chunks_and_other_keys(self):
+        stream = JSONItemStream(['{"items":{"a":1},','"other":[1,2]}'],'other')
+        self.assertEqual(list(stream),[1,2])
+        self.assertEqual(stream.metadata,{'items':{'a':1}})
+
+        stream = JSONItemStream([b'{"total":0}'],'items')
+        self.assertEqual(list(stream),[])
+        self.assertEqual(stream.metadata,{'total':0})
+
+    def test_malformed(self):
+        for body in (b'{"items":[1,2',b'{"items":[1 2]}',b'["a"',b'{"items":[{"a":}]}',b'',b'3'):
+            with self.assertRaises(BitGoException):
+                list(JSONItemStream(chunked(body,2),'items' if body.startswith(b'{') else None))
+
+
+class ClientStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+        self.server.route('GET','/api/v1/wallet/w1/tx',lambda request,body: (200,{},BODY))
+        self.server.route('GET','/api/v1/wallet/w2/tx',lambda request,body: (404,{},{'error':'no'}))
+
+    def test_stream_across_chunk_boundaries(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            stream = client.stream('wallet/w1/tx',key='transactions',access_token='token',
+                                   chunk_size=7)
+            self.assertEqual(list(stream),TRANSACTIONS)
+            self.assertEqual(stream.metadata['count'],20)
+
+    def test_list_stream(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            transactions = list(BitGoWalletTransaction.list_stream(client,'token','w1'))
+
+        self.assertTrue(all(isinstance(tx,BitGoWalletTransaction) for tx in transactions))
+        self.assertEqual([tx.fee for tx in transactions],[tx['fee'] for tx in TRANSACTIONS])
+        self.assertEqual(transactions[3].entries[0].value,-12345.5 * 3)
+
+    def test_error_status(self):
+        with BitGoClient(env=self.server.endpoint) as client:
+            with self.assertRaises(NotFound):
+                list(BitGoWalletTransaction.list_stream(client,'token','w2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import hashlib
+import struct
+import unittest
+
+from bitgo.errors import InvalidTransaction
+from bitgo.transaction import SIGHASH_ALL,Transaction,TxInput,TxOutput,address_script
+
+from test.test_unspents import fake_hash
+
+#Native P2WPKH example of BIP 143: a P2PK input signed with a legacy
+#signature and a P2WPKH input signed with a witness
+BIP143_UNSIGNED = ('0100000002fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f'
+                   '0000000000eeffffffef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57'
+                   'b90ec68a0100000000ffffffff02202cb206000000001976a9148280b37df378db99f66f85'
+                   'c95a783a76ac7a6d5988ac9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2'
+                   'f0167faa815988ac11000000')
+BIP143_SIGNED = ('01000000000102fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad'
+                 '969f00000000494830450221008b9d1dc26ba6a9cb62127b02742fa9d754cd3bebf337f7a55d'
+                 '114c8e5cdd30be022040529b194ba3f9281a99f2b1c0a19c0489bc22ede944ccf4ecbab4cc61'
+                 '8ef3ed01eeffffffef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90e'
+                 'c68a0100000000ffffffff02202cb206000000001976a9148280b37df378db99f66f85c95a78'
+                 '3a76ac7a6d5988ac9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa'
+                 '815988ac000247304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366'
+                 'd7f01cc44a0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eeb'
+                 'ee0121025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee63571100'
+                 '0000')
+BIP143_P2PK_SCRIPT = bytes.fromhex('2103c9f4836b9a4f77fc0d81f7bcb01b7f1b35916864b9476c241ce9fc198bd25432ac')
+
+
+def naive_signature_hash(tx,index,script_code,hashtype=SIGHASH_ALL):
+
+    """ The legacy signature hash the plain way: a copy of the
+        transaction with every input script emptied but the one
+        signed, serialized whole with the hashtype.
+    """
+
+    inputs = [TxInput(tx_input.prev_hash,tx_input.tx_output_n,
+                      script_code if position == index else b'',tx_input.sequence)
+              for position,tx_input in enumerate(tx.inputs)]
+    outputs = [TxOutput(tx_output.value,tx_output.script) for tx_output in tx.outputs]
+    copy = Transaction(version=tx.version,inputs=inputs,outputs=outputs,locktime=tx.locktime)
+    data = copy.serialize(witness=False) + struct.pack('<I',hashtype)
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+class TransactionTest(unittest.TestCase):
+
+    def test_segwit_round_trip(self):
+        raw = bytes.fromhex(BIP143_SIGNED)
+        tx = Transaction.deserialize(raw)
+
+        self.assertTrue(tx.has_witness)
+        self.assertEqual(tx.serialize(),raw)
+        self.assertEqual(tx.to_hex(),BIP143_SIGNED)
+        self.assertEqual(tx.size(),len(raw))
+        self.assertEqual([len(tx_input.witness) for tx_input in tx.inputs],[0,2])
+        self.assertEqual([tx_output.value for tx_output in tx.outputs],[112340000,223450000])
+        self.assertEqual(tx.locktime,17)
+
+        #Without the witness it is the unsigned transaction with the
+        #legacy input signed
+        stripped = Transaction.deserialize(tx.serialize(witness=False))
+        self.assertFalse(stripped.has_witness)
+        self.assertEqual(stripped.txid,tx.txid)
+        self.assertNotEqual(tx.wtxid,tx.txid)
+        self.assertEqual(tx.base_size(),len(tx.serialize(witness=False)))
+        self.assertEqual(tx.weight(),tx.base_size() * 3 + len(raw))
+
+        unsigned = Transaction.from_hex(BIP143_UNSIGNED)
+        unsigned.inputs[0].script = tx.inputs[0].script
+        self.assertEqual(unsigned.txid,tx.txid)
+
+    def test_signature_hash_matches_naive(self):
+        tx = Transaction.from_hex(BIP143_UNSIGNED)
+        self.assertEqual(tx.signature_hash(0,BIP143_P2PK_SCRIPT),
+                         naive_signature_hash(tx,0,BIP143_P2PK_SCRIPT))
+
+        tx = Transaction(version=2,locktime=500000)
+        for i in range(20):
+            tx.add_input(fake_hash(i),i % 3,sequence=0xfffffffe - i,value=100000)
+        tx.add_output(1500000,'3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy')
+        tx.add_output(0,b'\x6a\x04test')
+        tx.add_output(400000,'1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2')
+
+        for i in range(len(tx.inputs)):
+            #Script codes of different lengths move every following byte
+            script = b'\x52' + b'\x21' * (i * 13) + b'\xae'
+            self.assertEqual(tx.signature_hash(i,script),naive_signature_hash(tx,i,script))
+
+    def test_add_output(self):
+        tx = Transaction()
+        tx_output = tx.add_output(0,'3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy')
+        self.assertEqual(tx_output.script,address_script('3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy'))
+
+        for value in (-1,True,False,1.5,'1000'):
+            with self.assertRaises(InvalidTransaction):
+                tx.add_output(value,b'\x6a')
+        self.assertEqual(len(tx.outputs),1)
+
+    def test_truncated(self):
+        raw = bytes.fromhex(BIP143_SIGNED)
+        with self.assertRaises(InvalidTransaction):
+            Transaction.deserialize(raw[:-10])
+        with self.assertRaises(InvalidTransaction):
+            Transaction.deserialize(raw + b'\x00')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bitgo.client import BitGoClient
+from bitgo.errors import BitGoException,NotFound
+from bitgo.transport import HTTP2Transport,RequestsTransport,Transport,httpx
+
+from test.server import LocalHTTP2Server,LocalServer
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+
+class TransportTest(unittest.TestCase):
+
+    def test_request_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Transport()
+
+        class Incomplete(Transport):
+            def close(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_requests_transport(self):
+        session = requests.Session()
+        with LocalServer() as server:
+            with BitGoClient(env=server.endpoint,transport=RequestsTransport(session)) as client:
+                self.assertEqual(client.get('wallet')['path'],'/api/v1/wallet')
+        session.close()
+
+
+@unittest.skipIf(httpx is None or h2 is None,'httpx and h2 are not installed')
+class HTTP2TransportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalHTTP2Server()
+        self.addCleanup(self.server.close)
+        self.transport = HTTP2Transport()
+        self.addCleanup(self.transport.close)
+
+    def test_negotiates_http2(self):
+        response = self.transport.request('get',self.server.endpoint + '/wallet',
+                                          headers={'Authorization':'Bearer token'},
+                                          timeout=(5.0,5.0))
+
+        self.assertEqual(response.raw.version,20)
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(response.json(),{'method':'GET','path':'/api/v1/wallet'})
+        self.assertEqual(self.server.requests[0]['headers']['authorization'],'Bearer token')
+
+    def test_round_trip_through_the_client(self):
+        self.server.route('POST','/api/v1/wallet',
+                          lambda headers,body: (200,{'received':body.decode('utf-8')}))
+        self.server.route('GET','/api/v1/wallet/missing',lambda headers,body: (404,{'error':'no'}))
+
+        with BitGoClient(env=self.server.endpoint,transport=self.transport) as client:
+            self.assertEqual(client.post('wallet',{'label':'hot'},access_token='token'),
+                             {'received':'{"label":"hot"}'})
+            self.assertEqual(client.get('wallet')['path'],'/api/v1/wallet')
+            with self.assertRaises(NotFound):
+                client.get('wallet/missing')
+
+        self.assertEqual(self.server.connections,1)
+
+    def test_concurrent_requests_share_one_connection(self):
+        self.server.delay = 0.2
+        with BitGoClient(env=self.server.endpoint,transport=self.transport) as client:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                results = list(executor.map(lambda i: client.get('wallet/{i}'.format(i=i)),range(10)))
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual([result['path'] for result in results],
+                         ['/api/v1/wallet/{i}'.format(i=i) for i in range(10)])
+        self.assertEqual(self.server.connections,1)
+        self.assertGreater(self.server.max_concurrent,1)
+        self.assertLess(elapsed,1.5)
+
+    def test_timeout(self):
+        self.server.delay = 0.5
+        with BitGoClient(env=self.server.endpoint,transport=self.transport,timeout=0.1) as client:
+            with self.assertRaises(BitGoException):
+                client.get('wallet')
+
+    def test_http1_is_opt_in(self):
+        with LocalServer() as server:
+            with BitGoClient(env=server.endpoint,transport=self.transport,timeout=2.0) as client:
+                with self.assertRaises(BitGoException):
+                    client.get('wallet')
+
+            transport = HTTP2Transport(http1=True)
+            self.addCleanup(transport.close)
+            response = transport.request('get',server.endpoint + '/wallet',timeout=(5.0,5.0))
+            self.assertEqual(response.raw.version,11)
+            self.assertEqual(response.json(),{'method':'GET','path':'/api/v1/wallet'})
+
+
+if __name__ == '__main__':
+    unittest.main()
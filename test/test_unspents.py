@@ -0,0 +1,171 @@
+import hashlib
+import random
+import threading
+import unittest
+from urllib.parse import parse_qs,urlparse
+
+from bitgo.client import BitGoClient
+from bitgo.wallet.unspents import UnspentIndex
+
+from test.server import LocalServer
+
+
+def fake_hash(seed):
+    return hashlib.sha256(str(seed).encode('utf-8')).hexdigest()
+
+
+def fake_unspents(count,seed=1):
+    rng = random.Random(seed)
+    return [{'tx_hash':fake_hash(i),
+             'tx_output_n':i % 3,
+             'value':rng.randint(546,10 ** 6),
+             'blockHeight':100 + i % 50 if i % 10 else None,
+             'confirmations':50 - i % 50 if i % 10 else 0}
+            for i in range(count)]
+
+
+def load(index,unspents):
+    index.load_unspents(unspents)
+    return index
+
+
+class UnspentIndexTest(unittest.TestCase):
+
+    def test_sorted_by_value_then_height(self):
+        index = UnspentIndex('w1')
+        index.add(fake_hash(1),0,500,height=None)
+        index.add(fake_hash(2),0,500,height=120)
+        index.add(fake_hash(3),0,500,height=110)
+        index.add(fake_hash(4),0,100,height=130)
+
+        self.assertEqual([(unspent.value,unspent.height) for unspent in index],
+                         [(100,130),(500,110),(500,120),(500,None)])
+
+    def test_bulk_and_single_adds_agree(self):
+        unspents = fake_unspents(300)
+        bulk = load(UnspentIndex('w1'),unspents)
+        single = UnspentIndex('w1')
+        for unspent in unspents:
+            single.add(unspent['tx_hash'],unspent['tx_output_n'],unspent['value'],
+                       unspent['blockHeight'])
+
+        self.assertEqual(list(bulk.values),list(single.values))
+        self.assertEqual(list(bulk.heights),list(single.heights))
+        self.assertEqual([unspent.outpoint for unspent in bulk],
+                         [unspent.outpoint for unspent in single])
+        self.assertEqual(bulk.balance(),sum(unspent['value'] for unspent in unspents))
+
+    def test_find(self):
+        unspents = fake_unspents(500)
+        index = load(UnspentIndex('w1'),unspents)
+
+        found = index.find(500000,min_confirms=1)
+        expected = min((unspent for unspent in unspents
+                        if unspent['value'] >= 500000 and unspent['blockHeight'] is not None),
+                       key=lambda unspent: (unspent['value'],unspent['blockHeight']))
+        self.assertEqual(found.tx_hash,expected['tx_hash'])
+
+    def test_spend_and_restore(self):
+        unspents = fake_unspents(10)
+        index = load(UnspentIndex('w1'),unspents)
+        taken = [index.unspent(0),index.unspent(1)]
+
+        index.spend([unspent.outpoint for unspent in taken])
+        self.assertEqual(len(index),8)
+        #A sync listing them again does not bring them back
+        index.load_unspents(unspents)
+        self.assertEqual(len(index),8)
+
+        index.restore(taken)
+        self.assertEqual(len(index),10)
+
+    def test_clear_forgets_spent_outputs(self):
+        unspents = fake_unspents(10)
+        index = load(UnspentIndex('w1'),unspents)
+        index.spend([index.unspent(0).outpoint])
+
+        index.clear()
+        self.assertEqual(len(index),0)
+        self.assertIsNone(index.height)
+        index.load_unspents(unspents)
+        self.assertEqual(len(index),10)
+
+    def test_iteration_is_a_snapshot(self):
+        index = load(UnspentIndex('w1'),fake_unspents(2000))
+        stop = threading.Event()
+
+        def churn():
+            rng = random.Random(2)
+            while not stop.is_set():
+                unspent = index.unspent(rng.randrange(len(index)))
+                #Moves the output to another position
+                index.add(unspent.tx_hash,unspent.tx_output_n,unspent.value + 1,unspent.height)
+
+        thread = threading.Thread(target=churn)
+        thread.start()
+        try:
+            for _ in range(20):
+                seen = list(index)
+                self.assertEqual(len(seen),2000)
+                self.assertEqual(len(set(unspent.outpoint for unspent in seen)),2000)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_apply_transactions_in_any_order(self):
+        index = load(UnspentIndex('w1'),fake_unspents(5))
+        first = {'id':fake_hash('a'),'height':150,
+                 'outputs':[{'vout':0,'value':1000,'isMine':True}],'inputs':[]}
+        second = {'id':fake_hash('b'),'height':151,
+                  'outputs':[{'vout':0,'value':900,'isMine':True},
+                             {'vout':1,'value':50,'isMine':False}],
+                  'inputs':[{'previousHash':fake_hash('a'),'previousOutputIndex':0}]}
+
+        index.apply_transactions([second,first])
+        self.assertNotIn((fake_hash('a'),0),index)
+        self.assertIn((fake_hash('b'),0),index)
+        self.assertNotIn((fake_hash('b'),1),index)
+        self.assertEqual(index.height,151)
+
+
+class UnspentIndexSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.unspents = fake_unspents(1234)
+        self.transactions = []
+        self.server = LocalServer()
+        self.addCleanup(self.server.close)
+
+        def page(key,items):
+            def handler(request,body):
+                query = parse_qs(urlparse(request.path).query)
+                skip,limit = int(query['skip'][0]),int(query['limit'][0])
+                return 200,{},{key:items[skip:skip + limit],'total':len(items)}
+            return handler
+
+        self.server.route('GET','/api/v1/wallet/w1/unspents',page('unspents',self.unspents))
+        self.server.route('GET','/api/v1/wallet/w1/tx',page('transactions',self.transactions))
+
+    def test_sync(self):
+        index = UnspentIndex('w1')
+        with BitGoClient(env=self.server.endpoint) as client:
+            self.assertEqual(index.sync(client,'token'),1234)
+            self.assertEqual(len(index),1234)
+            self.assertEqual(index.height,149)
+
+            spent = self.unspents[1]
+            self.transactions.append({'id':fake_hash('new'),'height':150,
+                                      'outputs':[{'vout':0,'value':777,'isMine':True}],
+                                      'inputs':[{'previousHash':spent['tx_hash'],
+                                                 'previousOutputIndex':spent['tx_output_n']}]})
+            self.assertEqual(index.sync(client,'token'),1)
+
+        last = self.server.requests[-1]['path']
+        self.assertIn('minHeight=143',last)
+        self.assertNotIn((spent['tx_hash'],spent['tx_output_n']),index)
+        self.assertIn((fake_hash('new'),0),index)
+        self.assertEqual(len(index),1234)
+
+
+if __name__ == '__main__':
+    unittest.main()